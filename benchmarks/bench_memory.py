@@ -0,0 +1,95 @@
+"""
+Measure the memory an inventory of devices keeps alive.
+
+Compares ``Device`` with a replica of its previous layout (a plain
+dataclass with a per-instance ``__dict__``, its own copy of every string
+and its own datetime objects), both loaded from the same devices.json.
+
+Usage: python benchmarks/bench_memory.py [--hosts 100000]
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable
+
+from simple_scanner.models import Device
+
+from synthetic import _hosts
+
+
+@dataclass
+class LegacyDevice:
+    """Device as it was before slots and interning."""
+    mac_address: str
+    ip_address: str
+    hostname: str | None = None
+    manufacturer: str | None = None
+    date_added: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+    last_seen: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+    network: str | None = None
+
+    def __post_init__(self):
+        self.mac_address = self.mac_address.lower()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LegacyDevice":
+        return cls(
+            mac_address=data['mac_address'],
+            ip_address=data['ip_address'],
+            hostname=data.get('hostname'),
+            manufacturer=data.get('manufacturer'),
+            date_added=datetime.datetime.fromisoformat(data['date_added']),
+            last_seen=datetime.datetime.fromisoformat(data['last_seen']),
+            network=data.get('network'),
+        )
+
+
+def snapshot_json(count: int) -> str:
+    """A devices.json for ``count`` hosts, seen over a handful of scans."""
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    return json.dumps([
+        {
+            'mac_address': mac.lower(),
+            'ip_address': ip,
+            'hostname': hostname,
+            'manufacturer': vendor,
+            'date_added': (start + datetime.timedelta(minutes=i % 7)).isoformat(),
+            'last_seen': (start + datetime.timedelta(days=1, minutes=i % 5)).isoformat(),
+            'network': "10.0.0.0/8",
+        }
+        for i, (ip, mac, hostname, vendor) in enumerate(_hosts(count))
+    ])
+
+
+def retained(raw: str, from_dict: Callable[[dict], object]) -> int:
+    """Bytes still allocated once the inventory is loaded and the parsed JSON dropped."""
+    gc.collect()
+    tracemalloc.start()
+    devices = {d.mac_address: d for d in map(from_dict, json.loads(raw))}
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del devices
+    return current
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--hosts", type=int, default=100_000)
+    args = ap.parse_args()
+
+    raw = snapshot_json(args.hosts)
+    legacy = retained(raw, LegacyDevice.from_dict)
+    compact = retained(raw, Device.from_dict)
+    for name, size in (("legacy", legacy), ("compact", compact)):
+        print(f"{name:<8} {args.hosts:>8} devices  {size / 2**20:8.1f} MiB  "
+              f"{size / args.hosts:7.0f} B/device")
+    print(f"reduction {1 - compact / legacy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
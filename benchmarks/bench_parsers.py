@@ -0,0 +1,45 @@
+"""
+Compare the text and XML nmap output parsers on synthetic output.
+
+Usage: python benchmarks/bench_parsers.py [--hosts 65536]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from simple_scanner.parsers import NmapTextParser, NmapXmlParser
+
+from synthetic import text_output_lines, xml_output_lines
+
+
+def run(name: str, parser_cls, lines: list[str]) -> None:
+    # Time and memory are measured in separate passes; tracemalloc
+    # slows allocation-heavy code down too much to time under it.
+    start = time.perf_counter()
+    count = sum(1 for _ in parser_cls().parse(lines))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in parser_cls().parse(lines):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<5} {count:>8} hosts  {elapsed:8.3f}s  "
+          f"{count / elapsed:>10.0f} hosts/s  peak {peak / 1024:>8.1f} KiB")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--hosts", type=int, default=65536)
+    args = ap.parse_args()
+
+    # Materialize inputs up front so only parsing is measured
+    text_lines = list(text_output_lines(args.hosts))
+    xml_lines = list(xml_output_lines(args.hosts))
+    run("text", NmapTextParser, text_lines)
+    run("xml", NmapXmlParser, xml_lines)
+
+
+if __name__ == "__main__":
+    main()
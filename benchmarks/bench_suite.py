@@ -0,0 +1,253 @@
+"""
+Benchmark the parse, persist and render hot paths on synthetic inventories.
+
+Usage: python bench_suite.py [--sizes 1000,10000,100000] [--repeat 5]
+                             [--output results.json] [--baseline baseline.json]
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+from unittest.mock import patch
+
+from simple_scanner import __version__
+from simple_scanner.scanner import NetworkMonitor
+
+from synthetic import text_output_lines
+
+# A stage prepares fresh state with setup() and returns the function to time.
+Stage = Callable[[int, str, Path], Callable[[], None]]
+
+
+def _monitor(data_dir: Path, use_persistence: bool = False) -> NetworkMonitor:
+    # Benchmarks run offline: pretend nmap is installed and keep data in data_dir
+    with patch("simple_scanner.scanner.shutil.which", return_value="/usr/bin/nmap"), \
+         patch("simple_scanner.scanner.get_core_data_file", return_value=data_dir / "devices.json"):
+        return NetworkMonitor(network="10.0.0.0/8", use_persistence=use_persistence)
+
+
+def _populated(hosts: int, raw: str, data_dir: Path) -> NetworkMonitor:
+    monitor = _monitor(data_dir)
+    monitor._parse(raw)
+    return monitor
+
+
+def _clear(data_dir: Path) -> None:
+    for path in data_dir.iterdir():
+        path.unlink()
+
+
+def stage_parse_new(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    """First scan: every host becomes a new device."""
+    monitor = _monitor(data_dir)
+    return lambda: monitor._parse(raw)
+
+
+def stage_parse_update(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    """Repeat scan: every host updates a known device."""
+    monitor = _populated(hosts, raw, data_dir)
+    return lambda: monitor._parse(raw)
+
+
+def stage_save(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    """Write the whole inventory as a fresh snapshot."""
+    monitor = _populated(hosts, raw, data_dir)
+    monitor.use_persistence = True
+    _clear(data_dir)
+
+    def run() -> None:
+        with patch("simple_scanner.scanner.get_core_data_file", return_value=data_dir / "devices.json"):
+            monitor._save_core_data()
+
+    monitor._dirty.update(monitor._devices)
+    return run
+
+
+def stage_load(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    """Start up with an existing inventory on disk."""
+    monitor = _populated(hosts, raw, data_dir)
+    monitor.use_persistence = True
+    _clear(data_dir)
+    with patch("simple_scanner.scanner.get_core_data_file", return_value=data_dir / "devices.json"):
+        monitor._save_core_data()
+    return lambda: _monitor(data_dir, use_persistence=True)
+
+
+def stage_first_scan(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    """Start up with an inventory on disk and merge one scan, as `lan-scan scan` does."""
+    stage_load(hosts, raw, data_dir)
+
+    def run() -> None:
+        monitor = _monitor(data_dir, use_persistence=True)
+        monitor.use_persistence = False
+        monitor._parse(raw)
+
+    return run
+
+
+def stage_to_json(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    monitor = _populated(hosts, raw, data_dir)
+    return lambda: monitor.to_json(str(data_dir / "export.json"))
+
+
+def stage_to_csv(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    monitor = _populated(hosts, raw, data_dir)
+    return lambda: monitor.to_csv(str(data_dir / "export.csv"))
+
+
+def stage_to_ndjson(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    monitor = _populated(hosts, raw, data_dir)
+    return lambda: monitor.to_ndjson(str(data_dir / "export.ndjson"))
+
+
+def stage_device_str(hosts: int, raw: str, data_dir: Path) -> Callable[[], None]:
+    """Format every device as a table row, as the CLI does."""
+    devices = _populated(hosts, raw, data_dir).devices()
+
+    def run() -> None:
+        for device in devices:
+            str(device)
+    return run
+
+
+STAGES: dict[str, Stage] = {
+    "parse_new": stage_parse_new,
+    "parse_update": stage_parse_update,
+    "save": stage_save,
+    "load": stage_load,
+    "first_scan": stage_first_scan,
+    "to_json": stage_to_json,
+    "to_csv": stage_to_csv,
+    "to_ndjson": stage_to_ndjson,
+    "device_str": stage_device_str,
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(name: str, stage: Stage, hosts: int, raw: str, repeat: int) -> dict:
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        for _ in range(repeat):
+            _clear(data_dir)
+            run = stage(hosts, raw, data_dir)
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        # Peak memory in a separate pass; tracemalloc distorts timings
+        _clear(data_dir)
+        run = stage(hosts, raw, data_dir)
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "stage": name,
+        "hosts": hosts,
+        "repeat": repeat,
+        "hosts_per_s": hosts / median if median else None,
+        "seconds": {
+            "min": min(timings),
+            "p50": median,
+            "p90": percentile(timings, 90),
+            "p99": percentile(timings, 99),
+            "max": max(timings),
+        },
+        "peak_bytes": peak - base,
+    }
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """Return a line for every stage whose median got slower than ``threshold``."""
+    previous = {(r["stage"], r["hosts"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["stage"], result["hosts"]))
+        if old is None:
+            continue
+        ratio = result["seconds"]["p50"] / old["seconds"]["p50"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{result['stage']} @ {result['hosts']} hosts: "
+                f"{old['seconds']['p50']:.4f}s -> {result['seconds']['p50']:.4f}s ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000,100000",
+                    help="comma-separated host counts (up to 1000000)")
+    ap.add_argument("--stages", default=",".join(STAGES), help="comma-separated stages to run")
+    ap.add_argument("--repeat", type=int, default=5, help="timed runs per stage and size")
+    ap.add_argument("--output", help="write results to this JSON file")
+    ap.add_argument("--baseline", help="compare against a previous --output file")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="slowdown of the median that counts as a regression (default 0.10)")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    stages = args.stages.split(",")
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        ap.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = []
+    print(f"{'stage':<13} {'hosts':>8} {'p50 s':>9} {'p90 s':>9} {'p99 s':>9} {'hosts/s':>11} {'peak MiB':>9}")
+    for hosts in sizes:
+        raw = "\n".join(text_output_lines(hosts))
+        for name in stages:
+            result = measure(name, STAGES[name], hosts, raw, args.repeat)
+            results.append(result)
+            seconds = result["seconds"]
+            print(f"{name:<13} {hosts:>8} {seconds['p50']:>9.4f} {seconds['p90']:>9.4f} "
+                  f"{seconds['p99']:>9.4f} {result['hosts_per_s']:>11.0f} "
+                  f"{result['peak_bytes'] / 2**20:>9.1f}")
+
+    report = {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
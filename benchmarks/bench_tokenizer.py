@@ -0,0 +1,59 @@
+"""
+Microbenchmark of the nmap text tokenizers on million-line outputs.
+
+Compares, on the same complete output, NmapTextParser.parse() over
+``text.splitlines()`` (a Python step and up to three regex matches per
+line) with NmapTextParser.parse_text() (one regex search per host block),
+which NetworkMonitor uses for complete scan output.
+
+Usage: python benchmarks/bench_tokenizer.py [--lines 1000000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import time
+
+from simple_scanner.parsers import NmapTextParser
+
+from synthetic import text_output_lines
+
+
+def best_of(repeat: int, func) -> float:
+    # CPU time of the least disturbed run; the work is CPU-bound
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.process_time()
+            func()
+            timings.append(time.process_time() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--lines", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    # Three lines per host plus a header and a footer
+    text = "\n".join(text_output_lines(max(1, (args.lines - 2) // 3)))
+    lines = text.count("\n") + 1
+    assert list(NmapTextParser().parse_text(text)) == list(NmapTextParser().parse(text.splitlines()))
+
+    cases = {
+        "lines": lambda: list(NmapTextParser().parse(text.splitlines())),
+        "text": lambda: list(NmapTextParser().parse_text(text)),
+    }
+    baseline = None
+    for name, func in cases.items():
+        elapsed = best_of(args.repeat, func)
+        baseline = baseline or elapsed
+        print(f"{name:<6} {lines:>9} lines  {elapsed:8.3f}s  {lines / elapsed:>12,.0f} lines/s  "
+              f"x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
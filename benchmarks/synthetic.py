@@ -0,0 +1,49 @@
+"""Synthetic nmap output generators for benchmarks."""
+
+import ipaddress
+from typing import Iterator
+
+VENDORS = [
+    "Apple, Inc.", "Cisco Systems", "Dell Inc.", "Intel Corporate",
+    "TP-LINK TECHNOLOGIES CO.,LTD.", "Samsung Electronics Co.,Ltd", "Raspberry Pi Trading",
+]
+
+
+def _hosts(count: int, base: str = "10.0.0.0") -> Iterator[tuple[str, str, str | None, str]]:
+    """Yield (ip, mac, hostname, vendor) tuples for ``count`` synthetic hosts."""
+    first = int(ipaddress.IPv4Address(base))
+    for i in range(count):
+        ip = str(ipaddress.IPv4Address(first + i + 1))
+        mac = ":".join(f"{b:02X}" for b in (i + 1).to_bytes(6, "big"))
+        hostname = f"host-{i}.lan" if i % 3 == 0 else None
+        yield ip, mac, hostname, VENDORS[i % len(VENDORS)]
+
+
+def text_output_lines(count: int) -> Iterator[str]:
+    """Yield lines of ``nmap -sn`` text output for ``count`` hosts."""
+    yield "Starting Nmap 7.94 ( https://nmap.org ) at 2025-01-01 12:00 UTC"
+    for ip, mac, hostname, vendor in _hosts(count):
+        target = f"{hostname} ({ip})" if hostname else ip
+        yield f"Nmap scan report for {target}"
+        yield "Host is up (0.00042s latency)."
+        yield f"MAC Address: {mac} ({vendor})"
+    yield f"Nmap done: {count} IP addresses ({count} hosts up) scanned in 12.34 seconds"
+
+
+def xml_output_lines(count: int) -> Iterator[str]:
+    """Yield lines of ``nmap -sn -oX -`` XML output for ``count`` hosts."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield '<nmaprun scanner="nmap" args="nmap -sn -oX - 10.0.0.0/16" version="7.94">'
+    for ip, mac, hostname, vendor in _hosts(count):
+        vendor = vendor.replace("&", "&amp;")
+        yield '<host><status state="up" reason="arp-response" reason_ttl="0"/>'
+        yield f'<address addr="{ip}" addrtype="ipv4"/>'
+        yield f'<address addr="{mac}" addrtype="mac" vendor="{vendor}"/>'
+        if hostname:
+            yield f'<hostnames><hostname name="{hostname}" type="PTR"/></hostnames>'
+        else:
+            yield '<hostnames></hostnames>'
+        yield '<times srtt="420" rttvar="5000" to="100000"/>'
+        yield '</host>'
+    yield f'<runstats><hosts up="{count}" down="0" total="{count}"/></runstats>'
+    yield '</nmaprun>'
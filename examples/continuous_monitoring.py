@@ -3,20 +3,21 @@
 Continuous monitoring example for Simple LAN Scanner.
 
 This example shows how to continuously monitor your network
-and get notifications when devices come online or go offline.
+and get notifications when devices come online or go offline,
+using the change events published by NetworkMonitor.
 """
 
 import time
 import signal
 import sys
 from datetime import datetime, timezone
-from simple_scanner import NetworkMonitor
+from simple_scanner import NetworkMonitor, DeviceJoined, DeviceLeft, IpChanged, HostnameChanged
 
 
 class NetworkWatcher:
     def __init__(self):
         self.monitor = NetworkMonitor()
-        self.previous_devices = {}
+        self.monitor.subscribe(self.on_event)
         self.running = True
         
     def signal_handler(self, sig, frame):
@@ -25,31 +26,22 @@ class NetworkWatcher:
         self.running = False
         sys.exit(0)
         
-    def check_device_changes(self, current_devices):
-        """Check for new devices or status changes."""
-        current_macs = {d.mac_address: d for d in current_devices}
-        
-        # Check for new devices
-        for mac, device in current_macs.items():
-            if mac not in self.previous_devices:
-                print(f"🆕 NEW DEVICE: {device.mac_address} ({device.ip_address}) "
-                      f"- {device.manufacturer or 'Unknown'}")
-                
-        # Check for devices that went offline
-        for mac, device in self.previous_devices.items():
-            if mac not in current_macs:
-                print(f"❌ DEVICE OFFLINE: {device.mac_address} ({device.ip_address}) "
-                      f"- {device.manufacturer or 'Unknown'}")
-                
-        # Check for IP changes
-        for mac, device in current_macs.items():
-            if mac in self.previous_devices:
-                old_device = self.previous_devices[mac]
-                if old_device.ip_address != device.ip_address:
-                    print(f"🔄 IP CHANGED: {device.mac_address} "
-                          f"from {old_device.ip_address} to {device.ip_address}")
-                    
-        self.previous_devices = current_macs
+    def on_event(self, event):
+        """Print each change the monitor reports, as the scan detects it."""
+        device = event.device
+        if isinstance(event, DeviceJoined):
+            label = "🆕 NEW DEVICE" if event.first_seen else "✅ DEVICE ONLINE"
+            print(f"{label}: {device.mac_address} ({device.ip_address}) "
+                  f"- {device.manufacturer or 'Unknown'}")
+        elif isinstance(event, DeviceLeft):
+            print(f"❌ DEVICE OFFLINE: {device.mac_address} ({device.ip_address}) "
+                  f"- {device.manufacturer or 'Unknown'}")
+        elif isinstance(event, IpChanged):
+            print(f"🔄 IP CHANGED: {device.mac_address} "
+                  f"from {event.old_ip} to {event.new_ip}")
+        elif isinstance(event, HostnameChanged):
+            print(f"🏷️  HOSTNAME CHANGED: {device.mac_address} "
+                  f"from {event.old_hostname or '-'} to {event.new_hostname or '-'}")
         
     def run(self, interval=30):
         """Run continuous monitoring."""
@@ -60,7 +52,7 @@ class NetworkWatcher:
         print("Press Ctrl+C to stop\n")
         
         while self.running:
-            # Perform scan
+            # Perform scan; changes are printed by on_event as they are found
             self.monitor.scan()
             devices = self.monitor.devices()
             
@@ -74,9 +66,6 @@ class NetworkWatcher:
             print(f"\n[{timestamp}] Network Status: "
                   f"{len(online_devices)} devices online (Total: {len(devices)})")
             
-            # Check for changes
-            self.check_device_changes(online_devices)
-            
             # Display current online devices
             if online_devices:
                 print("\nCurrently online:")
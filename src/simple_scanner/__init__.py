@@ -1,7 +1,39 @@
 """Simple LAN Scanner - Network device discovery tool using nmap."""
 
-from .scanner import NetworkMonitor, autodetect_network
+from .scanner import NetworkMonitor, autodetect_network, autodetect_networks
+from .async_monitor import AsyncNetworkMonitor
+from .multi import MultiNetworkMonitor, NetworkTarget
 from .models import Device
+from .diff import DeviceDiff, diff_snapshots
+from .oui import OuiDatabase
+from .resolver import HostnameCache, HostnameResolver
+from .events import (
+    DeviceEvent,
+    DeviceJoined,
+    DeviceLeft,
+    HostnameChanged,
+    IpChanged,
+    VendorChanged,
+)
 
 __version__ = "1.0.0"
-__all__ = ["NetworkMonitor", "Device", "autodetect_network"]
\ No newline at end of file
+__all__ = [
+    "NetworkMonitor",
+    "AsyncNetworkMonitor",
+    "MultiNetworkMonitor",
+    "NetworkTarget",
+    "Device",
+    "OuiDatabase",
+    "DeviceDiff",
+    "diff_snapshots",
+    "HostnameResolver",
+    "HostnameCache",
+    "autodetect_network",
+    "autodetect_networks",
+    "DeviceEvent",
+    "DeviceJoined",
+    "DeviceLeft",
+    "IpChanged",
+    "HostnameChanged",
+    "VendorChanged",
+]
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""asyncio front end to NetworkMonitor: nmap runs as an asyncio subprocess."""
+
+import asyncio
+import datetime
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from .events import DeviceEvent
+from .models import Device
+from .parsers import HostRecord, NmapTextParser
+from .scanner import NetworkMonitor, shard_network, split_targets
+
+_DONE = object()  # Ends the queue of records from concurrent shards
+
+
+class AsyncNetworkMonitor(NetworkMonitor):
+    """
+    NetworkMonitor whose scans are coroutines.
+
+    nmap is started with ``asyncio.create_subprocess_exec`` and its output
+    parsed as it arrives, so one event loop can scan many networks at once
+    without a thread per scan::
+
+        monitors = [AsyncNetworkMonitor(network=n, use_persistence=False) for n in networks]
+        await asyncio.gather(*(m.ascan() for m in monitors))
+
+    The coroutines are named ``ascan()``/``ascan_stream()`` so the inherited
+    synchronous ``scan()``/``scan_stream()`` keep working. Scans on one
+    monitor are serialised; cancelling a scan kills its nmap processes.
+    Devices, events and persistence behave exactly as with ``scan()``. Monitors with persistence share one data file,
+    so only one of several concurrent monitors should enable it.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._scan_lock = asyncio.Lock()
+
+    async def ascan(
+        self, network: str | None = None, max_workers: int | None = None, timeout: float | None = None
+    ) -> None:
+        """Scan the network and update devices; raises RuntimeError on timeout."""
+        async for _ in self.ascan_stream(network, max_workers, timeout):
+            pass
+
+    async def ascan_stream(
+        self, network: str | None = None, max_workers: int | None = None, timeout: float | None = None
+    ) -> AsyncIterator[Device]:
+        """
+        Scan the network, yielding each device as soon as nmap reports it.
+
+        ``network`` and ``max_workers`` work as for ``scan()``: with a
+        network, only devices on it can be reported as departed or pruned.
+        Departures, stale pruning and persistence happen once the scan
+        completes. To stop early, iterate inside ``contextlib.aclosing()``
+        so nmap is killed at once; an abandoned scan is not finished and
+        leaves the previous scan's presence state untouched.
+        """
+        target = network or self.network
+        workers = self.max_workers if max_workers is None else max_workers
+        timeout = self.NMAP_TIMEOUT_SECONDS if timeout is None else timeout
+        async with self._scan_lock:
+            deadline = asyncio.get_running_loop().time() + timeout
+            now = datetime.datetime.now(datetime.timezone.utc)
+            events = self._start_scan()
+            try:
+                seen_macs = set()
+                sightings = [] if self.history is not None else None
+                unnamed = []
+                async with aclosing(self._records(target, workers, deadline, timeout)) as records:
+                    async for record in records:
+                        seen_macs.add(record.mac_address)
+                        with self._scan_events(events):
+                            device = self._upsert(record, now, network)
+                        if sightings is not None:
+                            sightings.append(record)
+                        if self._unnamed(record):
+                            unnamed.append((record.ip_address, record.mac_address))
+                        yield device
+                hostnames = await self.resolver.resolve_async(unnamed) if unnamed else {}
+
+                def finish() -> None:
+                    with self._scan_events(events):
+                        self._apply_hostnames(hostnames, now)
+                        self._finish_scan(seen_macs, now, network)
+                        if sightings is not None:
+                            self._record_history(datetime.datetime.now(datetime.timezone.utc), sightings)
+
+                # Saving may write the whole inventory; keep it off the event loop
+                await asyncio.to_thread(finish)
+            finally:
+                self._end_scan(events)
+
+    async def watch(self, interval: float) -> AsyncIterator[DeviceEvent]:
+        """Scan every ``interval`` seconds forever, yielding each scan's change events."""
+        while True:
+            await self.ascan()
+            for event in self.last_events:
+                yield event
+            await asyncio.sleep(interval)
+
+    async def _records(
+        self, target: str, workers: int, deadline: float, timeout: float
+    ) -> AsyncIterator[HostRecord]:
+        """Yield host records from the configured engine, shards running concurrently."""
+        if self.engine == "sweep":
+            try:
+                records = await asyncio.wait_for(
+                    self.sweeper.sweep_async(split_targets(target)), timeout
+                )
+            except asyncio.TimeoutError as e:
+                raise RuntimeError(f"Sweep timed out after {timeout} seconds") from e
+            for record in records:
+                yield record
+            return
+
+        shards = shard_network(target, self.shard_prefix) if workers > 1 else [target]
+        if len(shards) == 1:
+            async with aclosing(self._nmap_records(target, deadline, timeout)) as records:
+                async for record in records:
+                    yield record
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(workers)
+
+        async def run(shard: str) -> None:
+            async with semaphore, aclosing(self._nmap_records(shard, deadline, timeout)) as records:
+                async for record in records:
+                    await queue.put(record)
+
+        tasks = [asyncio.create_task(run(shard)) for shard in shards]
+
+        async def run_all() -> None:
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # Stop the other shards once one fails (no-op when all succeeded)
+                for task in tasks:
+                    task.cancel()
+                await queue.put(_DONE)
+
+        runner = asyncio.create_task(run_all())
+        try:
+            while (item := await queue.get()) is not _DONE:
+                yield item
+            await runner  # Re-raise a shard's failure
+        finally:
+            runner.cancel()
+            for task in tasks:
+                task.cancel()
+
+    async def _nmap_records(self, target: str, deadline: float, timeout: float) -> AsyncIterator[HostRecord]:
+        """Run nmap on ``target`` and yield records while it is still scanning."""
+        cmd = [self._nmap_path, *self._nmap_args(), *split_targets(target)]
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError(f"Nmap executable not found: {self._nmap_path}") from e
+        except PermissionError as e:
+            raise RuntimeError(f"Permission denied running nmap: {self._nmap_path}") from e
+
+        loop = asyncio.get_running_loop()
+        parser = self._make_parser()
+        # Drain stderr concurrently so a chatty nmap can't block on a full pipe
+        stderr_task = asyncio.create_task(proc.stderr.read())
+        try:
+            while True:
+                try:
+                    raw = await asyncio.wait_for(proc.stdout.readline(), deadline - loop.time())
+                except asyncio.TimeoutError as e:
+                    raise RuntimeError(f"Nmap scan timed out after {timeout} seconds") from e
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+                if self.verbose:
+                    print(line)
+                if isinstance(parser, NmapTextParser):
+                    record = parser.feed(line)
+                    if record is not None:
+                        yield record
+                else:
+                    for record in parser.feed(line + "\n"):
+                        yield record
+            if not isinstance(parser, NmapTextParser):
+                for record in parser.close():
+                    yield record
+            returncode = await proc.wait()
+            stderr = (await stderr_task).decode("utf-8", errors="replace")
+        finally:
+            if proc.returncode is None:
+                # Cancelled, timed out or abandoned: don't leave nmap running
+                proc.kill()
+                await proc.wait()
+            stderr_task.cancel()
+
+        if returncode != 0:
+            error_msg = stderr.strip() if stderr else "Unknown error"
+            raise RuntimeError(f"Nmap scan failed (exit code {returncode}): {error_msg}")
@@ -1,9 +1,17 @@
+import json
 import time
 from pathlib import Path
 from datetime import datetime
 
 import click
-from .scanner import NetworkMonitor
+from .diff import DIFF_FIELDS, diff_snapshots
+from .export import FORMATS as EXPORT_FORMATS
+from .multi import MultiNetworkMonitor, NetworkTarget
+from .oui import DEFAULT_SOURCES, compile_database
+from .scanner import NetworkMonitor, get_oui_file
+from .scheduler import AdaptiveScheduler
+
+ADAPTIVE_TICK_SECONDS = 1  # How often the adaptive scheduler hands out probes
 
 
 @click.group()
@@ -11,6 +19,28 @@ def app() -> None:
     """simple-lan-scanner."""
 
 
+def _backend_kwargs(backend: str, engine: str = "nmap", fsync: str = "snapshot") -> dict[str, str]:
+    """NetworkMonitor keyword arguments for a non-default storage backend, fsync policy or discovery engine."""
+    kwargs = {}
+    if backend != "json":
+        kwargs["backend"] = backend
+    if engine != "nmap":
+        kwargs["engine"] = engine
+    if fsync != "snapshot":
+        kwargs["fsync"] = fsync
+    return kwargs
+
+
+def _wait_passively(nm: NetworkMonitor, interval: int, every: int, verbose: bool) -> None:
+    """Sleep until the next scan, refreshing devices from the kernel neighbor table."""
+    deadline = time.monotonic() + interval
+    while (remaining := deadline - time.monotonic()) > 0:
+        time.sleep(min(every, remaining))
+        refreshed = nm.refresh_neighbors()
+        if verbose and refreshed:
+            click.echo(f"Passive: refreshed {len(refreshed)} device(s) from the neighbor table")
+
+
 # ------------------------------------------------------------------ #
 # one‑off scan (JSON / CSV snapshot)
 # ------------------------------------------------------------------ #
@@ -19,17 +49,58 @@ def app() -> None:
     "--out",
     "-o",
     type=click.Path(dir_okay=False, writable=True),
-    help="Output path (.json or .csv). Defaults to timestamped file.",
+    help="Output path (.json, .csv, .ndjson/.jsonl, or with pyarrow .parquet/.arrow). "
+         "Defaults to timestamped file.",
 )
-@click.option("--network", help="CIDR to scan (skip autodetect)")
+@click.option("--network", help="CIDR(s) to scan, comma-separated (skip autodetect)")
 @click.option("--verbose", is_flag=True, help="Print raw nmap output")
 @click.option("--remove-stale", is_flag=True, help="Prune devices missing in scan")
-def scan(out: str | None, network: str | None, verbose: bool, remove_stale: bool) -> None:
+@click.option("--parser", "parser_name", type=click.Choice(["text", "xml"]), default="text",
+              show_default=True, help="Parse nmap's text output or its XML output (-oX -)")
+@click.option("--backend", type=click.Choice(["json", "sqlite"]), default="json", show_default=True,
+              help="Device store: JSON file or indexed SQLite database")
+@click.option("--engine", type=click.Choice(["nmap", "sweep"]), default="nmap", show_default=True,
+              help="Discover hosts with nmap or the built-in ARP/ICMP/TCP sweep")
+@click.option("--mac-lookup", is_flag=True,
+              help="Fill in vendors nmap doesn't report from the offline OUI table (see oui-update)")
+@click.option("--resolve", is_flag=True,
+              help="Skip nmap's serial reverse DNS (-n) and resolve hostnames concurrently "
+                   "by reverse DNS, mDNS and NetBIOS, caching the results")
+@click.option("--stream", is_flag=True, help="Print devices as soon as nmap reports them")
+@click.option("--workers", type=click.IntRange(1, 64), default=1, show_default=True,
+              help="Concurrent nmap processes; large networks are split into /24 shards")
+def scan(
+    out: str | None,
+    network: str | None,
+    verbose: bool,
+    remove_stale: bool,
+    parser_name: str,
+    backend: str,
+    engine: str,
+    mac_lookup: bool,
+    resolve: bool,
+    stream: bool,
+    workers: int,
+) -> None:
+    if out is not None and Path(out).suffix.lower() not in EXPORT_FORMATS:
+        # Checked up front so a long scan isn't thrown away
+        click.echo("❌  --out must end with .json or .csv "
+                   f"(or {', '.join(s for s in EXPORT_FORMATS if s not in ('.json', '.csv'))})", err=True)
+        raise SystemExit(1)
+
     # For scan command: use persistence to get date_added, but don't save back to core
-    nm = NetworkMonitor(network=network, verbose=verbose, remove_stale=remove_stale, use_persistence=True)
+    nm = NetworkMonitor(network=network, verbose=verbose, remove_stale=remove_stale, use_persistence=True,
+                        **_backend_kwargs(backend, engine))
     # Override use_persistence after loading to prevent saving during scan
     nm.use_persistence = False
-    nm.scan()
+    nm.max_workers = workers
+    nm.parser = parser_name
+    nm.mac_lookup = mac_lookup
+    nm.resolve_hostnames = resolve
+    if stream:
+        nm.scan_stream(on_device=click.echo)
+    else:
+        nm.scan()
 
     if out is None:
         stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -41,8 +112,11 @@ def scan(out: str | None, network: str | None, verbose: bool, remove_stale: bool
     elif path.suffix == ".csv":
         nm.to_csv(path)
     else:
-        click.echo("❌  --out must end with .json or .csv", err=True)
-        raise SystemExit(1)
+        try:
+            nm.export(path)
+        except RuntimeError as e:
+            click.secho(f"❌  {e}", fg="red", err=True)
+            raise SystemExit(1)
 
     click.echo(f"✔  wrote {path.resolve()}")
 
@@ -52,7 +126,39 @@ def scan(out: str | None, network: str | None, verbose: bool, remove_stale: bool
 # ------------------------------------------------------------------ #
 @app.command(help="Continuous scan every N seconds")
 @click.option("--interval", type=click.IntRange(5, 3600), default=30, show_default=True)
-@click.option("--network", help="CIDR to scan (skip autodetect)")
+@click.option("--network", help="CIDR(s) to scan, comma-separated (skip autodetect)")
+@click.option("--workers", type=click.IntRange(1, 64), default=1, show_default=True,
+              help="Concurrent nmap processes; large networks are split into /24 shards")
+@click.option("--parser", "parser_name", type=click.Choice(["text", "xml"]), default="text",
+              show_default=True, help="Parse nmap's text output or its XML output (-oX -)")
+@click.option("--backend", type=click.Choice(["json", "sqlite"]), default="json", show_default=True,
+              help="Device store: JSON file or indexed SQLite database")
+@click.option("--engine", type=click.Choice(["nmap", "sweep"]), default="nmap", show_default=True,
+              help="Discover hosts with nmap or the built-in ARP/ICMP/TCP sweep")
+@click.option("--passive", type=click.IntRange(1, 3600), metavar="SECONDS",
+              help="Between scans, refresh last-seen times from the kernel ARP table every SECONDS")
+@click.option("--probe-budget", type=click.FloatRange(min=0.1), metavar="PROBES_PER_S",
+              help="After the first full scan, probe only the addresses most likely to have "
+                   "changed, at most this many per second")
+@click.option("--dhcp-range", "dhcp_ranges", multiple=True, metavar="RANGE",
+              help="Address range (a.b.c.d-w.x.y.z or CIDR) handed out by DHCP; probed more "
+                   "often with --probe-budget. Repeatable")
+@click.option("--target", "targets", multiple=True, metavar="CIDR[:INTERVAL[:WORKERS]]",
+              help="Network to monitor on its own schedule (defaults: --interval, 1 worker). "
+                   "Repeatable; all networks share one device store")
+@click.option("--all-interfaces", is_flag=True,
+              help="Monitor the subnet of every local interface, each every --interval seconds")
+@click.option("--mac-lookup", is_flag=True,
+              help="Fill in vendors nmap doesn't report from the offline OUI table (see oui-update)")
+@click.option("--resolve", is_flag=True,
+              help="Skip nmap's serial reverse DNS (-n) and resolve hostnames concurrently "
+                   "by reverse DNS, mDNS and NetBIOS, caching the results")
+@click.option("--save-interval", type=click.FloatRange(min=0), default=5, show_default=True, metavar="SECONDS",
+              help="Save the device store from a background thread at most every SECONDS; "
+                   "pending changes are saved on exit")
+@click.option("--fsync", type=click.Choice(["never", "snapshot", "always"]), default="snapshot",
+              show_default=True, help="Flush saves to disk: never, when a file is replaced, "
+                                      "or also on every journal append")
 @click.option("--json", "json_path", type=click.Path(dir_okay=False))
 @click.option("--csv",  "csv_path",  type=click.Path(dir_okay=False))
 @click.option("--verbose", is_flag=True)
@@ -62,6 +168,19 @@ def scan(out: str | None, network: str | None, verbose: bool, remove_stale: bool
 def monitor(
     interval: int,
     network: str | None,
+    workers: int,
+    parser_name: str,
+    backend: str,
+    engine: str,
+    passive: int | None,
+    probe_budget: float | None,
+    dhcp_ranges: tuple[str, ...],
+    targets: tuple[str, ...],
+    all_interfaces: bool,
+    mac_lookup: bool,
+    resolve: bool,
+    save_interval: float,
+    fsync: str,
     json_path: str | None,
     csv_path: str | None,
     verbose: bool,
@@ -71,34 +190,58 @@ def monitor(
 ) -> None:
     # Only create output files if explicitly requested (no defaults)
 
-    # For monitor mode, always use persistence
-    nm = NetworkMonitor(network=network, verbose=verbose, remove_stale=remove_stale, use_persistence=True)
-    click.echo(f"Scanning {nm.network} every {interval}s – Ctrl‑C to stop")
+    multi = None
+    if targets or all_interfaces:
+        if network or passive or probe_budget:
+            raise click.UsageError(
+                "--target/--all-interfaces can't be combined with --network, --passive or --probe-budget"
+            )
+        try:
+            parsed = [NetworkTarget.parse(t, default_interval=interval) for t in targets]
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--target")
+        # For monitor mode, always use persistence
+        multi = MultiNetworkMonitor(parsed or None, interval=interval, verbose=verbose,
+                                    remove_stale=remove_stale, use_persistence=True,
+                                    **_backend_kwargs(backend, engine, fsync))
+        nm = multi.monitor
+        nm.parser = parser_name
+        for target in multi.targets:
+            click.echo(f"Scanning {target.network} every {target.interval:g}s")
+        click.echo("Ctrl‑C to stop")
+    else:
+        # For monitor mode, always use persistence
+        nm = NetworkMonitor(network=network, verbose=verbose, remove_stale=remove_stale, use_persistence=True,
+                            **_backend_kwargs(backend, engine, fsync))
+        nm.max_workers = workers
+        nm.parser = parser_name
+        click.echo(f"Scanning {nm.network} every {interval}s – Ctrl‑C to stop")
+    nm.mac_lookup = mac_lookup
+    nm.resolve_hostnames = resolve
+    # Scans only mark changes; a background thread writes them
+    nm.save_interval = save_interval
 
     try:
+        scheduler = AdaptiveScheduler(nm.network, probe_budget, dhcp_ranges) if probe_budget else None
+        full_scan = True
         while True:
-            nm.scan()  # This automatically saves to core data file
-            
-            # Display devices in a formatted table
-            devices = nm.devices()
+            if multi is not None:
+                multi.run_due()
+            elif full_scan:
+                nm.scan()  # This automatically saves to core data file
+                if scheduler is not None:
+                    # From here on, only probe what is likely to have changed
+                    scheduler.seed(nm.devices())
+                    full_scan = False
             
-            # Filter by search term if provided
-            if search:
-                search_lower = search.lower()
-                devices = [d for d in devices if any(
-                    search_lower in str(getattr(d, attr, "") or "").lower() 
-                    for attr in ["mac_address", "ip_address", "hostname", "manufacturer"]
-                )]
-            
-            # Filter online-only if requested
-            if online_only:
-                from datetime import datetime, timezone
-                now = datetime.now(timezone.utc)
-                devices = [d for d in devices if (now - d.last_seen).total_seconds() < 120]
+            # Display devices in a formatted table; find_devices filters in the
+            # database (SQLite) or through the search index (JSON)
+            from datetime import datetime, timedelta, timezone
+            seen_since = datetime.now(timezone.utc) - timedelta(seconds=120) if online_only else None
+            devices = nm.find_devices(search=search, seen_since=seen_since)
             
             if devices:
                 # Count online devices
-                from datetime import datetime, timezone
                 now = datetime.now(timezone.utc)
                 online_count = sum(1 for d in devices if (now - d.last_seen).total_seconds() < 120)
                 
@@ -129,12 +272,116 @@ def monitor(
                 nm.to_csv(csv_path)
                 if verbose:
                     click.echo(f"Saved CSV  → {csv_path}")
-            time.sleep(interval)
+            if multi is not None:
+                time.sleep(multi.seconds_until_due())
+            elif scheduler is not None:
+                _wait_adaptively(nm, scheduler, interval, passive, verbose)
+            elif passive:
+                _wait_passively(nm, interval, passive, verbose)
+            else:
+                time.sleep(interval)
     except KeyboardInterrupt:
         click.secho("\nStopped by user.", fg="yellow")
     except Exception as exc:
         click.secho(f"Error: {exc}", fg="red", err=True)
         raise SystemExit(1)
+    finally:
+        nm.close()
+
+
+def _wait_adaptively(
+    nm: NetworkMonitor,
+    scheduler: AdaptiveScheduler,
+    interval: int,
+    passive: int | None,
+    verbose: bool,
+) -> None:
+    """Until the next display, probe the addresses the scheduler picks each tick."""
+    deadline = time.monotonic() + interval
+    next_passive = time.monotonic() + passive if passive else None
+    while (remaining := deadline - time.monotonic()) > 0:
+        time.sleep(min(ADAPTIVE_TICK_SECONDS, remaining))
+        if next_passive is not None and time.monotonic() >= next_passive:
+            next_passive += passive
+            # Passive sightings postpone probes of hosts the kernel already heard from
+            scheduler.record((), [d.ip_address for d in nm.refresh_neighbors()])
+        batch = scheduler.next_batch()
+        if not batch:
+            continue
+        try:
+            answered = nm.probe(batch)
+        except RuntimeError as e:
+            scheduler.requeue(batch)
+            if verbose:
+                click.echo(f"Warning: probe failed: {e}")
+            continue
+        scheduler.record(batch, answered)
+        if verbose:
+            click.echo(f"Probed {len(batch)} address(es), {len(answered)} answered")
+
+
+# ------------------------------------------------------------------ #
+# compare snapshots
+# ------------------------------------------------------------------ #
+@app.command(help="Compare device exports: devices added, removed or changed")
+@click.argument("snapshots", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--fields", default=",".join(DIFF_FIELDS), show_default=True,
+              help="Comma-separated device fields to compare")
+@click.option("--method", type=click.Choice(["auto", "hash", "merge"]), default="auto", show_default=True,
+              help="In-memory MAC index, or on-disk sorted merge for exports larger than memory")
+@click.option("--format", "output_format", type=click.Choice(["text", "json"]), default="text",
+              show_default=True, help="Readable lines, or one JSON object per change")
+@click.option("--exit-code", is_flag=True, help="Exit with status 1 if any snapshots differ")
+def diff(snapshots: tuple[str, ...], fields: str, method: str, output_format: str, exit_code: bool) -> None:
+    """
+    Compare JSON or CSV exports (as written by scan) by MAC address. With
+    more than two, each is compared with the one before it, e.g.
+    lan-scan diff archive/devices_*.json
+    """
+    if len(snapshots) < 2:
+        raise click.UsageError("Need at least two snapshots to compare")
+    fields = tuple(f.strip() for f in fields.split(",") if f.strip())
+    differ = False
+    for old, new in zip(snapshots, snapshots[1:]):
+        counts = {"added": 0, "removed": 0, "changed": 0}
+        if output_format == "text" and len(snapshots) > 2:
+            click.echo(f"--- {old}\n+++ {new}")
+        try:
+            for change in diff_snapshots(Path(old), Path(new), fields, method):
+                counts[change.kind] += 1
+                if output_format == "json":
+                    click.echo(json.dumps({"old_snapshot": old, "new_snapshot": new, **change.to_dict()}))
+                else:
+                    click.echo(str(change))
+        except ValueError as e:
+            raise click.ClickException(f"Could not compare {old} and {new}: {e}")
+        differ = differ or any(counts.values())
+        if output_format == "text":
+            click.echo(f"{counts['added']} added, {counts['removed']} removed, {counts['changed']} changed")
+    if exit_code and differ:
+        raise SystemExit(1)
+
+
+# ------------------------------------------------------------------ #
+# offline MAC vendor table
+# ------------------------------------------------------------------ #
+@app.command("oui-update", help="Rebuild the offline MAC vendor (OUI) table from local files")
+@click.argument("sources", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+def oui_update(sources: tuple[str, ...]) -> None:
+    """
+    Compile IEEE registry CSVs (oui.csv, mam.csv, oui36.csv), nmap-mac-prefixes,
+    Wireshark manuf or oui.txt files; without SOURCES, whichever of the usual
+    system copies are installed. Earlier files win where they disagree.
+    """
+    paths = [Path(s) for s in sources] or [p for p in DEFAULT_SOURCES if p.exists()]
+    if not paths:
+        raise click.UsageError("No vendor database found; pass one, e.g. "
+                               "lan-scan oui-update oui.csv (https://standards-oui.ieee.org/oui/oui.csv)")
+    try:
+        count = compile_database(paths, get_oui_file())
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"✔  {count} prefixes from {len(paths)} file(s) → {get_oui_file()}")
 
 
 @app.command(help="Launch the GUI application")
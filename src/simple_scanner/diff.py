@@ -0,0 +1,210 @@
+"""Compare device exports (JSON or CSV snapshots) by MAC address."""
+
+import csv
+import heapq
+import itertools
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# Device fields compared by default; timestamps change on every scan
+DIFF_FIELDS = ("ip_address", "hostname", "manufacturer", "network")
+HASH_LIMIT_BYTES = 64 * 2**20  # Larger exports are diffed by sorted merge on disk
+
+
+def read_export(path: Path, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Yield the device records of a ``to_json()`` or ``to_csv()`` export one at a time.
+
+    CSV files are recognised by their suffix. Anything else is read as JSON:
+    an array of objects, or one object per line (NDJSON), decoded chunk by
+    chunk so the file is never held in memory as a whole.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield {key: value or None for key, value in row.items()}  # CSV writes None as ""
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+        while True:
+            # Skip array punctuation and whitespace between objects
+            while pos < len(buffer) and buffer[pos] in "[], \t\r\n":
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    return
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"Invalid device export {path}") from None
+                chunk = f.read(chunk_size)  # Object spans the chunk boundary
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            if not isinstance(record, dict):
+                raise ValueError(f"Invalid device export {path}: expected device objects")
+            yield record
+            pos = end
+
+
+def _export_fields(path: Path) -> set[str] | None:
+    """Return the columns of a CSV export, or None for JSON, whose records carry every field."""
+    path = Path(path)
+    if path.suffix.lower() != ".csv":
+        return None
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return set(next(csv.reader(f), []))
+
+
+@dataclass(frozen=True)
+class DeviceDiff:
+    """One device that differs between two snapshots."""
+    kind: str  # "added", "removed" or "changed"
+    mac_address: str
+    old: dict | None  # Compared fields in the old snapshot, None if added
+    new: dict | None  # Compared fields in the new snapshot, None if removed
+
+    def changes(self) -> dict[str, tuple]:
+        """Return ``{field: (old, new)}`` for every compared field that differs."""
+        old, new = self.old or {}, self.new or {}
+        return {f: (old.get(f), new.get(f)) for f in dict.fromkeys([*old, *new]) if old.get(f) != new.get(f)}
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "mac_address": self.mac_address, "old": self.old, "new": self.new}
+
+    def __str__(self) -> str:
+        device = self.new or self.old
+        if self.kind == "changed":
+            changes = ", ".join(f"{f}: {a or '-'} → {b or '-'}" for f, (a, b) in self.changes().items())
+            return f"~ {self.mac_address}  {changes}"
+        sign = "+" if self.kind == "added" else "-"
+        return f"{sign} {self.mac_address}  " + "  ".join(str(v) for v in device.values() if v)
+
+
+def _keyed(records: Iterable[dict], fields: tuple[str, ...]) -> Iterator[tuple[str, tuple]]:
+    """Reduce records to ``(mac, compared values)``."""
+    for record in records:
+        mac = record.get("mac_address")
+        if not mac:
+            raise ValueError(f"Device record without a MAC address: {record}")
+        yield mac.lower(), tuple(record.get(f) for f in fields)
+
+
+def _diff(mac: str, old: tuple | None, new: tuple | None, fields: tuple[str, ...]) -> DeviceDiff | None:
+    if old == new:
+        return None
+    kind = "added" if old is None else "removed" if new is None else "changed"
+    return DeviceDiff(
+        kind, mac,
+        None if old is None else dict(zip(fields, old)),
+        None if new is None else dict(zip(fields, new)),
+    )
+
+
+def _hash_diff(old: Iterable[dict], new: Iterable[dict], fields: tuple[str, ...]) -> Iterator[DeviceDiff]:
+    """Index the new snapshot by MAC and stream the old one past it."""
+    index = dict(_keyed(new, fields))
+    diffs = []
+    seen = set()
+    for mac, values in _keyed(old, fields):
+        seen.add(mac)
+        if (diff := _diff(mac, values, index.get(mac), fields)) is not None:
+            diffs.append(diff)
+    diffs.extend(_diff(mac, None, values, fields) for mac, values in index.items() if mac not in seen)
+    diffs.sort(key=lambda d: d.mac_address)
+    yield from diffs
+
+
+def _sorted_run_files(keyed: Iterator[tuple[str, tuple]], run_size: int, tmpdir: str) -> list[Path]:
+    """Sort ``keyed`` in runs of ``run_size`` records, each written to its own file."""
+    paths = []
+    while run := list(itertools.islice(keyed, run_size)):
+        # Stable sort: a MAC repeated in one export keeps its last record last
+        run.sort(key=lambda item: item[0])
+        fd, name = tempfile.mkstemp(suffix=".ndjson", dir=tmpdir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps([mac, *values], separators=(",", ":")) + "\n" for mac, values in run)
+        paths.append(Path(name))
+    return paths
+
+
+def _read_run(path: Path) -> Iterator[tuple[str, tuple]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            mac, *values = json.loads(line)
+            yield mac, tuple(values)
+
+
+def _sorted_by_mac(records: Iterable[dict], fields: tuple[str, ...], run_size: int, tmpdir: str) -> Iterator[tuple[str, tuple]]:
+    """Yield ``(mac, values)`` in MAC order, one per MAC (the last), via an external merge sort."""
+    runs = [_read_run(path) for path in _sorted_run_files(_keyed(records, fields), run_size, tmpdir)]
+    merged = heapq.merge(*runs, key=lambda item: item[0])
+    for _, group in itertools.groupby(merged, key=lambda item: item[0]):
+        *_, last = group
+        yield last
+
+
+def _merge_diff(
+    old: Iterable[dict], new: Iterable[dict], fields: tuple[str, ...], run_size: int
+) -> Iterator[DeviceDiff]:
+    """Sort both snapshots by MAC on disk and walk them side by side."""
+    with tempfile.TemporaryDirectory(prefix="lan-scan-diff-") as tmpdir:
+        old_items = _sorted_by_mac(old, fields, run_size, tmpdir)
+        new_items = _sorted_by_mac(new, fields, run_size, tmpdir)
+        a, b = next(old_items, None), next(new_items, None)
+        while a is not None or b is not None:
+            if b is None or (a is not None and a[0] < b[0]):
+                diff = _diff(a[0], a[1], None, fields)
+                a = next(old_items, None)
+            elif a is None or b[0] < a[0]:
+                diff = _diff(b[0], None, b[1], fields)
+                b = next(new_items, None)
+            else:
+                diff = _diff(a[0], a[1], b[1], fields)
+                a, b = next(old_items, None), next(new_items, None)
+            if diff is not None:
+                yield diff
+
+
+def diff_snapshots(
+    old: Path,
+    new: Path,
+    fields: Iterable[str] = DIFF_FIELDS,
+    method: str = "auto",
+    run_size: int = 200_000,
+) -> Iterator[DeviceDiff]:
+    """
+    Yield the devices added, removed or changed from export ``old`` to ``new``, in MAC order.
+
+    ``method="hash"`` indexes ``new`` by MAC in memory and streams ``old``
+    against it. ``method="merge"`` sorts both exports on disk in runs of
+    ``run_size`` records and merges them, so memory stays bounded however
+    large the files are. ``"auto"`` merges once either file is larger than
+    HASH_LIMIT_BYTES. Only ``fields`` are compared, and only those both
+    exports have: a CSV export has no ``network`` column, so a CSV and a
+    JSON snapshot are compared without it.
+    """
+    columns = [c for c in (_export_fields(old), _export_fields(new)) if c is not None]
+    fields = tuple(f for f in fields if all(f in c for c in columns))
+    if method == "auto":
+        large = max(os.path.getsize(old), os.path.getsize(new)) > HASH_LIMIT_BYTES
+        method = "merge" if large else "hash"
+    if method == "hash":
+        return _hash_diff(read_export(old), read_export(new), fields)
+    if method == "merge":
+        return _merge_diff(read_export(old), read_export(new), fields, run_size)
+    raise ValueError(f"Unknown diff method {method!r}; expected auto, hash or merge")
+
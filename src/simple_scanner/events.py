@@ -0,0 +1,45 @@
+"""Typed change events published by NetworkMonitor after each scan."""
+
+import datetime
+from dataclasses import dataclass
+
+from .models import Device
+
+
+@dataclass(frozen=True)
+class DeviceEvent:
+    """Base class for all device change events."""
+    device: Device
+    timestamp: datetime.datetime
+
+
+@dataclass(frozen=True)
+class DeviceJoined(DeviceEvent):
+    """A device was seen that was not present in the previous scan."""
+    first_seen: bool = False  # True if the device was never seen before
+
+
+@dataclass(frozen=True)
+class DeviceLeft(DeviceEvent):
+    """A device present in the previous scan was not seen in this one."""
+
+
+@dataclass(frozen=True)
+class IpChanged(DeviceEvent):
+    """A known device answered from a different IP address."""
+    old_ip: str = ""
+    new_ip: str = ""
+
+
+@dataclass(frozen=True)
+class HostnameChanged(DeviceEvent):
+    """A known device reported a different hostname."""
+    old_hostname: str | None = None
+    new_hostname: str | None = None
+
+
+@dataclass(frozen=True)
+class VendorChanged(DeviceEvent):
+    """A known device reported a different manufacturer."""
+    old_manufacturer: str | None = None
+    new_manufacturer: str | None = None
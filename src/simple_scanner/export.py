@@ -0,0 +1,180 @@
+"""Streaming device exporters: JSON, NDJSON, CSV and (with pyarrow) Parquet or Arrow IPC."""
+
+import csv
+import datetime
+import itertools
+from json.encoder import encode_basestring_ascii
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, TextIO
+
+from .models import Device
+from .storage import atomic_write
+
+FIELDS = ('mac_address', 'ip_address', 'hostname', 'manufacturer', 'date_added', 'last_seen', 'network')
+# The CSV header predates Device.network and is kept as it was for existing readers
+CSV_FIELDS = FIELDS[:-1]
+
+# Export format by file suffix
+FORMATS = {
+    ".json": "json",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+
+COLUMNAR_BATCH_SIZE = 65536  # Devices per Parquet row group / Arrow record batch
+
+
+def _json_value(value: str | None) -> str:
+    return "null" if value is None else encode_basestring_ascii(value)
+
+
+class _Timestamps(dict):
+    """
+    isoformat() once per distinct timestamp: a scan stamps every device it
+    saw with the same datetime, and loading shares equal ones.
+    """
+
+    def __call__(self, stamp: datetime.datetime) -> str:
+        entry = self.get(stamp)
+        # Equal instants in different time zones are equal keys but print differently
+        if entry is None or (entry[0] is not stamp and entry[0].utcoffset() != stamp.utcoffset()):
+            entry = self[stamp] = (stamp, stamp.isoformat())
+        return entry[1]
+
+
+def iter_json_objects(devices: Iterable[Device]) -> Iterator[tuple[Device, str]]:
+    """
+    Yield each device with its JSON object as ``json.dump(..., indent=2)``
+    prints it inside an array: two-space indented, closing brace included.
+    """
+    iso = _Timestamps()
+    for d in devices:
+        fields = [
+            '"mac_address": ' + _json_value(d.mac_address),
+            '"ip_address": ' + _json_value(d.ip_address),
+            '"hostname": ' + _json_value(d.hostname),
+            '"manufacturer": ' + _json_value(d.manufacturer),
+            '"date_added": ' + _json_value(iso(d.date_added)),
+            '"last_seen": ' + _json_value(iso(d.last_seen)),
+        ]
+        if d.network is not None:
+            fields.append('"network": ' + _json_value(d.network))
+        yield d, "{\n    " + ",\n    ".join(fields) + "\n  }"
+
+
+def write_json(devices: Iterable[Device], f: TextIO) -> None:
+    """
+    Write devices as an indented JSON array, one device at a time.
+
+    The output is byte-for-byte what ``json.dump([d.to_dict() ...], f,
+    indent=2)`` produces, without building the list or running the pure
+    Python encoder that ``indent`` selects.
+    """
+    first = True
+    f.write("[")
+    for _, text in iter_json_objects(devices):
+        f.write(("\n  " if first else ",\n  ") + text)
+        first = False
+    f.write("]" if first else "\n]")
+
+
+def write_ndjson(devices: Iterable[Device], f: TextIO) -> None:
+    """Write one compact JSON object per device and line (NDJSON / JSON Lines)."""
+    iso = _Timestamps()
+    for d in devices:
+        f.write(
+            '{"mac_address":' + _json_value(d.mac_address)
+            + ',"ip_address":' + _json_value(d.ip_address)
+            + ',"hostname":' + _json_value(d.hostname)
+            + ',"manufacturer":' + _json_value(d.manufacturer)
+            + ',"date_added":' + _json_value(iso(d.date_added))
+            + ',"last_seen":' + _json_value(iso(d.last_seen))
+            + ',"network":' + _json_value(d.network)
+            + '}\n'
+        )
+
+
+def write_csv(devices: Iterable[Device], f: TextIO) -> None:
+    """
+    Write a header and one CSV row per device; missing values are empty cells.
+
+    The columns are CSV_FIELDS, without ``network``: use JSON, NDJSON or a
+    columnar format to export the network each device was seen on.
+    """
+    iso = _Timestamps()
+    writer = csv.writer(f)
+    writer.writerow(CSV_FIELDS)
+    writer.writerows(
+        (d.mac_address, d.ip_address, d.hostname, d.manufacturer, iso(d.date_added), iso(d.last_seen))
+        for d in devices
+    )
+
+
+def write_columnar(devices: Iterable[Device], sink: Path | BinaryIO, fmt: str = "parquet",
+                   batch_size: int = COLUMNAR_BATCH_SIZE) -> None:
+    """
+    Write devices as Parquet (``fmt="parquet"``) or an Arrow IPC file (``"arrow"``)
+    to ``sink``, a path or a binary file object.
+
+    Timestamps are stored as UTC microsecond timestamps rather than text.
+    Devices are converted ``batch_size`` at a time, so memory stays flat.
+    Needs pyarrow; raises RuntimeError without it.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError(
+            "Parquet and Arrow export need pyarrow: pip install 'simple_lan_scanner[parquet]'"
+        ) from e
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    schema = pa.schema([
+        ("mac_address", pa.string()),
+        ("ip_address", pa.string()),
+        ("hostname", pa.string()),
+        ("manufacturer", pa.string()),
+        ("date_added", timestamp),
+        ("last_seen", timestamp),
+        ("network", pa.string()),
+    ])
+    if isinstance(sink, (str, Path)):
+        sink = str(sink)
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    elif fmt == "arrow":
+        writer = pa.ipc.new_file(sink, schema)
+    else:
+        raise ValueError(f"Unknown columnar format {fmt!r}; expected parquet or arrow")
+
+    devices = iter(devices)
+    with writer:
+        while batch := list(itertools.islice(devices, batch_size)):
+            columns = [[getattr(d, name) for d in batch] for name in FIELDS]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+
+
+def export_devices(devices: Iterable[Device], path: Path, fmt: str | None = None) -> None:
+    """
+    Write ``devices`` to ``path`` in ``fmt``, or the format its suffix names.
+
+    The file is written under a temporary name and renamed into place, so
+    readers never see a half-written export. Raises ValueError for an
+    unknown format and RuntimeError if a columnar format is asked for
+    without pyarrow installed.
+    """
+    path = Path(path)
+    fmt = fmt or FORMATS.get(path.suffix.lower())
+    if fmt in ("parquet", "arrow"):
+        with atomic_write(path, 'wb') as f:
+            write_columnar(devices, f, fmt)
+        return
+    writers = {"json": write_json, "ndjson": write_ndjson, "csv": write_csv}
+    if fmt not in writers:
+        raise ValueError(f"Unknown export format for {path.name}; expected one of {', '.join(FORMATS)}")
+    with atomic_write(path, 'w', newline='' if fmt == "csv" else None, encoding='utf-8') as f:
+        writers[fmt](devices, f)
@@ -4,13 +4,17 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import datetime
 import threading
-from typing import Any
+import time
+from typing import Any, Callable, Iterable
 import os
 import json
 from pathlib import Path
 
 from .scanner import NetworkMonitor, autodetect_network, get_user_data_dir
+from .scheduler import AdaptiveScheduler
+from .storage import BackgroundWriter
 from .models import Device
+from .events import DeviceEvent, DeviceJoined, IpChanged
 
 
 class ModernSettingsDialog(tk.Toplevel):
@@ -248,6 +252,13 @@ class ModernSettingsDialog(tk.Toplevel):
         ttk.Label(persist_frame, text="Device history is stored in your user data directory", 
                  font=("", 9)).pack(anchor="w", pady=2)
         
+        backend_frame = ttk.Frame(persist_frame)
+        backend_frame.pack(anchor="w", pady=2)
+        ttk.Label(backend_frame, text="Storage backend:").pack(side="left")
+        self.backend_var = tk.StringVar(value=self.temp_settings.get("backend", "json"))
+        ttk.Combobox(backend_frame, textvariable=self.backend_var, values=("json", "sqlite"),
+                     state="readonly", width=10).pack(side="left", padx=5)
+        
         # Performance
         perf_frame = ttk.LabelFrame(parent, text="Performance", padding=10)
         perf_frame.grid(row=4, column=0, columnspan=2, sticky="ew", pady=10)
@@ -257,6 +268,20 @@ class ModernSettingsDialog(tk.Toplevel):
         threads_spin = ttk.Spinbox(perf_frame, from_=1, to=10, textvariable=self.max_threads_var, width=10)
         threads_spin.grid(row=0, column=1, sticky="w", pady=5)
         
+        ttk.Label(perf_frame, text="Discovery engine:").grid(row=1, column=0, sticky="w", pady=5)
+        self.engine_var = tk.StringVar(value=self.temp_settings.get("engine", "nmap"))
+        ttk.Combobox(perf_frame, textvariable=self.engine_var, values=("nmap", "sweep"),
+                     state="readonly", width=10).grid(row=1, column=1, sticky="w", pady=5)
+        
+        ttk.Label(perf_frame, text="Adaptive probes/s (0 = full scans):").grid(row=2, column=0, sticky="w", pady=5)
+        self.probe_budget_var = tk.DoubleVar(value=self.temp_settings.get("probe_budget", 0))
+        ttk.Spinbox(perf_frame, from_=0, to=1000, increment=1, textvariable=self.probe_budget_var,
+                    width=10).grid(row=2, column=1, sticky="w", pady=5)
+        
+        ttk.Label(perf_frame, text="DHCP pool ranges:").grid(row=3, column=0, sticky="w", pady=5)
+        self.dhcp_ranges_var = tk.StringVar(value=", ".join(self.temp_settings.get("dhcp_ranges", [])))
+        ttk.Entry(perf_frame, textvariable=self.dhcp_ranges_var, width=30).grid(row=3, column=1, sticky="w", pady=5)
+        
     def _detect_networks(self) -> None:
         """Detect available networks."""
         try:
@@ -328,13 +353,327 @@ class ModernSettingsDialog(tk.Toplevel):
         self.settings["verbose"] = self.verbose_var.get()
         self.settings["mac_lookup"] = self.mac_lookup_var.get()
         self.settings["use_persistence"] = self.persist_var.get()
+        self.settings["backend"] = self.backend_var.get()
         self.settings["max_threads"] = self.max_threads_var.get()
+        self.settings["engine"] = self.engine_var.get()
+        self.settings["probe_budget"] = self.probe_budget_var.get()
+        self.settings["dhcp_ranges"] = [r.strip() for r in self.dhcp_ranges_var.get().split(",") if r.strip()]
         
         # Notify parent window to save settings to disk
         if hasattr(self.master, '_save_settings_to_disk'):
             self.master._save_settings_to_disk()
 
 
+DEVICE_COLUMNS = ("MAC Address", "IP Address", "Hostname", "Manufacturer", "First Seen", "Last Seen", "Status")
+ONLINE_SECONDS = 120  # A device seen within this window counts as online
+NEW_DEVICE_SECONDS = 300  # A device added within this window is highlighted as new
+VIRTUAL_LIST_THRESHOLD = 5000  # Device count at which the list switches to virtual mode
+SEARCH_DEBOUNCE_MS = 200  # Wait for typing to pause before filtering
+ADAPTIVE_TICK_MS = 1000  # Pause between adaptive probe batches
+
+
+class ScanExecutor:
+    """
+    Runs scan jobs one at a time on a background thread.
+
+    A job submitted while another runs waits in a queue that holds each job
+    at most once: a timer tick that arrives while the previous scan is still
+    running queues one catch-up scan, and further ticks coalesce into it
+    instead of piling up nmap processes. ``on_done(job, seconds, error)`` is
+    called on the worker thread after every job.
+    """
+
+    def __init__(self, on_done: Callable[[Callable[[], None], float, Exception | None], None] | None = None) -> None:
+        self._lock = threading.Lock()
+        self._active: Callable[[], None] | None = None
+        self._queue: list[Callable[[], None]] = []
+        self.on_done = on_done
+        self.coalesced = 0  # Submissions merged into an already queued job
+        self.last_duration: float | None = None
+
+    @property
+    def depth(self) -> int:
+        """Jobs running or waiting."""
+        with self._lock:
+            return len(self._queue) + (self._active is not None)
+
+    @property
+    def busy(self) -> bool:
+        with self._lock:
+            return self._active is not None
+
+    def submit(self, job: Callable[[], None]) -> bool:
+        """Run ``job`` now or after the current one; False if it was already queued."""
+        with self._lock:
+            if self._active is None:
+                self._active = job
+                threading.Thread(target=self._run, daemon=True).start()
+                return True
+            if job in self._queue:
+                self.coalesced += 1
+                return False
+            self._queue.append(job)
+            return True
+
+    def cancel_pending(self) -> None:
+        """Drop queued jobs; the running one finishes."""
+        with self._lock:
+            self._queue.clear()
+
+    def _run(self) -> None:
+        job = self._active
+        while job is not None:
+            error = None
+            started = time.perf_counter()
+            try:
+                job()
+            except Exception as e:
+                error = e
+            self.last_duration = time.perf_counter() - started
+            with self._lock:
+                next_job = self._active = self._queue.pop(0) if self._queue else None
+            if self.on_done is not None:
+                self.on_done(job, self.last_duration, error)
+            job = next_job
+
+
+def _format_local(timestamp: datetime.datetime) -> str:
+    """Format a UTC timestamp in local time for display."""
+    return timestamp.replace(tzinfo=datetime.timezone.utc).astimezone().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class DeviceTreeRows:
+    """
+    Keeps a Treeview in step with the device list by diffing, not rebuilding.
+
+    Rows use the MAC address as their item id. Each sync inserts new devices,
+    rewrites only rows whose cells changed, detaches rows the filter hides and
+    moves only rows whose position changed, so a scan that changes five
+    devices touches five rows. Formatted timestamps are cached per device.
+    """
+
+    def __init__(self, tree: ttk.Treeview, sort_column: int = 1) -> None:
+        self.tree = tree
+        self.sort_column = sort_column  # Index into DEVICE_COLUMNS
+        # mac -> (values, tags) last written to the tree, attached or not
+        self._rows: dict[str, tuple[tuple, tuple]] = {}
+        # mac -> (device fields, formatted cells) to skip re-formatting
+        self._cells: dict[str, tuple[tuple, tuple]] = {}
+        self._order: list[str] = []  # Attached items, top to bottom
+
+    def row(self, device: Device, now: datetime.datetime) -> tuple[tuple, tuple]:
+        """Return the (values, tags) a device should be displayed with."""
+        mac = device.mac_address
+        fields = (device.ip_address, device.hostname, device.manufacturer, device.date_added, device.last_seen)
+        cached = self._cells.get(mac)
+        if cached is None or cached[0] != fields:
+            cells = (
+                mac,
+                device.ip_address,
+                device.hostname or "-",
+                device.manufacturer or "-",
+                _format_local(device.date_added),
+                _format_local(device.last_seen),
+            )
+            self._cells[mac] = (fields, cells)
+        else:
+            cells = cached[1]
+
+        online = (now - device.last_seen).total_seconds() < ONLINE_SECONDS
+        tags = ("online",) if online else ()
+        if (now - device.date_added).total_seconds() < NEW_DEVICE_SECONDS:
+            tags = tags + ("new",)
+        return cells + ("Online" if online else "Offline",), tags
+
+    def _key(self, mac: str, values: tuple) -> tuple:
+        return (values[self.sort_column], mac)
+
+    def sort_by(self, column: int) -> None:
+        """Change the sort column; the next sync re-places every row."""
+        self.sort_column = column
+        for mac in self._order:
+            self.tree.detach(mac)
+        self._order = []
+
+    def sync(
+        self,
+        devices: Iterable[Device],
+        now: datetime.datetime,
+        visible: Callable[[Device], bool],
+    ) -> int:
+        """Bring the tree up to date with ``devices``; return the number shown."""
+        tree = self.tree
+        known = set()
+        shown: dict[str, tuple[tuple, tuple]] = {}
+        for device in devices:
+            known.add(device.mac_address)
+            if visible(device):
+                shown[device.mac_address] = self.row(device, now)
+
+        # Forget devices the monitor no longer tracks
+        for mac in [m for m in self._rows if m not in known]:
+            tree.delete(mac)
+            del self._rows[mac]
+            self._cells.pop(mac, None)
+
+        # Hide rows that are filtered out, or whose sort position may have moved
+        kept = set()
+        for mac in self._order:
+            if mac not in self._rows:
+                continue  # Deleted above
+            new = shown.get(mac)
+            if new is None or self._key(mac, new[0]) != self._key(mac, self._rows[mac][0]):
+                tree.detach(mac)
+            else:
+                kept.add(mac)
+
+        # Rewrite changed cells of rows that already exist
+        for mac, row in shown.items():
+            old = self._rows.get(mac)
+            if old is not None and old != row:
+                tree.item(mac, values=row[0], tags=row[1])
+
+        # Kept rows are still in relative order; slot every other row in place
+        order = sorted(shown, key=lambda m: self._key(m, shown[m][0]))
+        for index, mac in enumerate(order):
+            if mac in kept:
+                continue
+            if mac in self._rows:
+                tree.move(mac, "", index)
+            else:
+                values, tags = shown[mac]
+                tree.insert("", index, iid=mac, values=values, tags=tags)
+            self._rows[mac] = shown[mac]
+        for mac in kept:
+            self._rows[mac] = shown[mac]
+        self._order = order
+        return len(order)
+
+    def clear(self) -> None:
+        """Remove every row this object added to the tree."""
+        for mac in self._rows:
+            self.tree.delete(mac)
+        self._rows = {}
+        self._order = []
+
+
+class VirtualDeviceRows(DeviceTreeRows):
+    """
+    Shows a window of the device list in a small, fixed pool of Treeview rows.
+
+    The full list is only a sorted, filtered list of MACs; tree items exist
+    for the rows in the viewport plus a small buffer and are refilled as the
+    list scrolls. The scrollbar is driven from the full count, so memory and
+    redraw cost stay flat for inventories of tens of thousands of devices.
+    """
+
+    BUFFER_ROWS = 4
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, sort_column: int = 1) -> None:
+        super().__init__(tree, sort_column)
+        self.scrollbar = scrollbar
+        self.top = 0  # Index in the full list of the first row shown
+        self.viewport_rows = int(tree.cget("height"))
+        self.selected_mac: str | None = None
+        self._devices: dict[str, Device] = {}
+        self._slots: list[str] = []  # Pooled item ids, top to bottom
+        self._now = datetime.datetime.now(datetime.timezone.utc)
+
+    def _device_key(self, device: Device) -> tuple:
+        column = self.sort_column
+        if column == 4:
+            value = device.date_added
+        elif column == 5:
+            value = device.last_seen
+        elif column == 6:
+            value = "Online" if (self._now - device.last_seen).total_seconds() < ONLINE_SECONDS else "Offline"
+        else:
+            value = (device.mac_address, device.ip_address, device.hostname or "-", device.manufacturer or "-")[column]
+        return (value, device.mac_address)
+
+    def sort_by(self, column: int) -> None:
+        self.sort_column = column
+
+    def sync(
+        self,
+        devices: Iterable[Device],
+        now: datetime.datetime,
+        visible: Callable[[Device], bool],
+    ) -> int:
+        """Rebuild the sorted index and refill the rows in view; return the number shown."""
+        self._now = now
+        known = set()
+        self._devices = {}
+        for device in devices:
+            known.add(device.mac_address)
+            if visible(device):
+                self._devices[device.mac_address] = device
+        for mac in [m for m in self._cells if m not in known]:
+            del self._cells[mac]
+
+        self._order = sorted(self._devices, key=lambda m: self._device_key(self._devices[m]))
+        self.render()
+        return len(self._order)
+
+    def render(self) -> None:
+        """Fill the pooled rows from the current scroll position."""
+        tree = self.tree
+        total = len(self._order)
+        self.top = max(0, min(self.top, total - self.viewport_rows))
+        window = self._order[self.top:self.top + self.viewport_rows + self.BUFFER_ROWS]
+
+        while len(self._slots) < len(window):
+            self._slots.append(tree.insert("", "end", values=()))
+        while len(self._slots) > len(window):
+            slot = self._slots.pop()
+            tree.delete(slot)
+            self._rows.pop(slot, None)
+
+        selected = ()
+        for slot, mac in zip(self._slots, window):
+            row = self.row(self._devices[mac], self._now)
+            if self._rows.get(slot) != row:
+                tree.item(slot, values=row[0], tags=row[1])
+                self._rows[slot] = row
+            if mac == self.selected_mac:
+                selected = (slot,)
+        # Keep the selection on the device, not on the pooled row
+        if tuple(tree.selection()) != selected:
+            tree.selection_set(selected)
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.viewport_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args: str) -> None:
+        """Scrollbar command: handle ``moveto`` and ``scroll`` requests."""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self._order))
+        elif args[0] == "scroll":
+            step = self.viewport_rows if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.render()
+
+    def resize(self, viewport_rows: int) -> None:
+        """Adapt the pool to a new number of visible rows."""
+        self.viewport_rows = max(1, viewport_rows)
+        self.render()
+
+    def note_selection(self) -> None:
+        """Remember which device the selected pooled row is showing."""
+        selection = self.tree.selection()
+        if selection and selection[0] in self._rows:
+            self.selected_mac = self._rows[selection[0]][0][0]
+
+    def clear(self) -> None:
+        """Remove the pooled rows from the tree."""
+        for slot in self._slots:
+            self.tree.delete(slot)
+        self._slots = []
+        self._rows = {}
+
+
 class ModernNetworkMonitorGUI(tk.Tk):
     """Modern main window with improved UI/UX."""
     
@@ -371,9 +710,15 @@ class ModernNetworkMonitorGUI(tk.Tk):
         self.settings = self._load_settings()
         
         self._running = False
+        self._scheduler: AdaptiveScheduler | None = None
+        self._probing = False  # Adaptive probes have replaced full scans
+        self._scan_generation = 0  # Bumped by Start and Stop; ticks of an earlier run are dropped
+        self._outputs_saved_at = 0.0
+        self._executor = ScanExecutor(on_done=self._on_scan_done)
         self._devices_cache: list[Device] = []
-        self._last_device_count = 0
+        self._filter_job: str | None = None  # Pending debounced search
         self.monitor: NetworkMonitor | None = None
+        self._output_writer: BackgroundWriter | None = None  # Writes output files off the Tk thread
         self.online_only_var = tk.BooleanVar(value=False)
         
         self._create_menu()
@@ -443,7 +788,7 @@ class ModernNetworkMonitorGUI(tk.Tk):
         # Search
         ttk.Label(toolbar, text="Search:").pack(side="left", padx=5)
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", lambda *args: self._filter_devices())
+        self.search_var.trace("w", lambda *args: self._schedule_filter())
         search_entry = ttk.Entry(toolbar, textvariable=self.search_var, width=30)
         search_entry.pack(side="left", padx=2)
         
@@ -467,7 +812,7 @@ class ModernNetworkMonitorGUI(tk.Tk):
         self.paned.add(list_frame, weight=3)
         
         # Configure treeview
-        columns = ("MAC Address", "IP Address", "Hostname", "Manufacturer", "First Seen", "Last Seen", "Status")
+        columns = DEVICE_COLUMNS
         self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=20)
         
         # Column configuration
@@ -477,13 +822,13 @@ class ModernNetworkMonitorGUI(tk.Tk):
             self.tree.column(col, width=width)
             
         # Scrollbars
-        vsb = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.vsb = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
         hsb = ttk.Scrollbar(list_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.tree.configure(yscrollcommand=self.vsb.set, xscrollcommand=hsb.set)
         
         # Grid layout
         self.tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
+        self.vsb.grid(row=0, column=1, sticky="ns")
         hsb.grid(row=1, column=0, sticky="ew")
         
         list_frame.grid_rowconfigure(0, weight=1)
@@ -493,6 +838,13 @@ class ModernNetworkMonitorGUI(tk.Tk):
         self.tree.tag_configure("online", foreground="green")
         self.tree.tag_configure("new", background="#e6ffe6")
         self.tree.tag_configure("changed", background="#fff0e6")
+        self._tree_rows: DeviceTreeRows = DeviceTreeRows(self.tree)
+        
+        # Virtual list mode scrolls the pooled rows itself
+        self.tree.bind("<Configure>", self._on_tree_resize)
+        self.tree.bind("<MouseWheel>", self._on_tree_wheel)
+        self.tree.bind("<Button-4>", self._on_tree_wheel)
+        self.tree.bind("<Button-5>", self._on_tree_wheel)
         
         # Right-click context menu
         self.tree.bind("<Button-3>", self._show_context_menu)
@@ -520,15 +872,28 @@ class ModernNetworkMonitorGUI(tk.Tk):
         self.last_scan_label = ttk.Label(status_frame, text="", style="Status.TLabel")
         self.last_scan_label.pack(side="right", padx=10, pady=2)
         
+        # Scan queue depth and duration
+        self.queue_label = ttk.Label(status_frame, text="", style="Status.TLabel")
+        self.queue_label.pack(side="right", padx=10, pady=2)
+        
     def _init_monitor(self) -> None:
         """Initialize network monitor."""
+        if self.monitor is not None:
+            # Let the old monitor write what it hasn't saved yet
+            self.monitor.close()
         try:
             network = None if self.settings["network"] == "auto" else self.settings["network"]
             self.monitor = NetworkMonitor(
                 network=network,
                 remove_stale=self.settings["remove_stale"],
                 verbose=self.settings["verbose"],
-                use_persistence=self.settings["use_persistence"]
+                use_persistence=self.settings["use_persistence"],
+                max_workers=self.settings.get("max_threads", 1),
+                backend=self.settings.get("backend", "json"),
+                engine=self.settings.get("engine", "nmap"),
+                mac_lookup=self.settings.get("mac_lookup", True),
+                save_interval=self.settings.get("save_interval", 5),
+                fsync=self.settings.get("fsync", "snapshot"),
             )
             self._manual_refresh()
         except Exception as e:
@@ -538,74 +903,168 @@ class ModernNetworkMonitorGUI(tk.Tk):
     def _start_scanning(self) -> None:
         """Start continuous scanning."""
         self._running = True
+        self._scheduler = self._make_scheduler()
+        self._probing = False
         self.start_btn.state(["disabled"])
         self.stop_btn.state(["!disabled"])
         self.status_label.config(text="Scanning...", style="Success.TLabel")
         self.progress.pack(side="left", padx=10, pady=2)
         self.progress.start(10)
-        self._schedule_scan()
+        self._scan_generation += 1
+        self._schedule_scan(self._scan_generation)
         
     def _stop_scanning(self) -> None:
         """Stop continuous scanning."""
         self._running = False
+        self._scan_generation += 1
+        self._executor.cancel_pending()
         self.start_btn.state(["!disabled"])
         self.stop_btn.state(["disabled"])
         self.status_label.config(text="Stopped", style="Status.TLabel")
         self.progress.stop()
         self.progress.pack_forget()
         
-    def _schedule_scan(self) -> None:
+    def _make_scheduler(self) -> AdaptiveScheduler | None:
+        """Create the adaptive scheduler if enabled, falling back to full scans if it can't be."""
+        budget = self.settings.get("probe_budget", 0)
+        if not budget or not self.monitor:
+            return None
+        try:
+            return AdaptiveScheduler(self.monitor.network, budget, self.settings.get("dhcp_ranges", []))
+        except ValueError as e:
+            messagebox.showwarning("Adaptive Scanning", f"{e}\n\nFalling back to full scans.")
+            return None
+        
+    def _schedule_scan(self, generation: int) -> None:
         """Schedule next scan."""
-        if not self._running:
+        if not self._running or generation != self._scan_generation:
+            return  # Stopped, or a tick left over from before Stop and Start
+        if self._probing:
+            # The probe schedules the next tick once it finishes
+            self._executor.submit(self._perform_probe)
             return
-        threading.Thread(target=self._perform_scan, daemon=True).start()
-        self.after(self.settings["interval"] * 1000, self._schedule_scan)
+        # A tick while the previous scan still runs queues one catch-up scan
+        self._executor.submit(self._perform_scan)
+        self._update_scan_status()
+        self.after(self.settings["interval"] * 1000, lambda: self._schedule_scan(generation))
+        
+    def _on_scan_done(self, job: Callable[[], None], seconds: float, error: Exception | None) -> None:
+        """Called on the scan thread after each job."""
+        self.after(0, self._update_scan_status)
+        if error is not None:
+            message = str(error)
+            self.after(0, lambda: self._show_scan_error(message))
+        
+    def _show_scan_error(self, message: str) -> None:
+        if not self._running:
+            self.progress.stop()
+            self.progress.pack_forget()
+        messagebox.showerror("Scan Error", message)
+        self.status_label.config(text=f"Error: {message}", style="Error.TLabel")
+        
+    def _update_scan_status(self) -> None:
+        """Show the scan queue depth and how long the last scan took."""
+        parts = [f"Queue: {self._executor.depth}"]
+        if self._executor.last_duration is not None:
+            parts.append(f"Last scan took {self._executor.last_duration:.1f}s")
+        if self._executor.coalesced:
+            parts.append(f"{self._executor.coalesced} ticks coalesced")
+        self.queue_label.config(text=" | ".join(parts))
         
     def _perform_scan(self) -> None:
-        """Perform network scan in background."""
+        """Perform network scan in background; errors are reported by _on_scan_done."""
+        self.monitor.scan()
+        if self._scheduler is not None:
+            # From here on, only probe what is likely to have changed
+            self._scheduler.seed(self.monitor.devices())
+            self._probing = True
+        events = list(self.monitor.events())
+        self.after(0, self._update_device_list)
+        self.after(0, lambda: self._notify_changes(events))
+        self.after(0, lambda: self.last_scan_label.config(
+            text=f"Last scan: {datetime.datetime.now().strftime('%H:%M:%S')}"
+        ))
+        
+        # Save to configured output files if enabled
+        self.after(0, self._save_output_files)
+    
+    def _perform_probe(self) -> None:
+        """Probe the addresses the adaptive scheduler picks, in background."""
+        generation = self._scan_generation
+        scheduler = self._scheduler  # Start replaces it while a probe may still run
+        batch: list[str] = []
         try:
-            self.monitor.scan()
-            self.after(0, self._update_device_list)
-            self.after(0, lambda: self.last_scan_label.config(
-                text=f"Last scan: {datetime.datetime.now().strftime('%H:%M:%S')}"
-            ))
-            
-            # Save to configured output files if enabled
-            self.after(0, self._save_output_files)
-            
+            batch = scheduler.next_batch()
+            if batch:
+                answered = self.monitor.probe(batch)
+                scheduler.record(batch, answered)
+                events = list(self.monitor.events())
+                self.after(0, self._update_device_list)
+                self.after(0, lambda: self._notify_changes(events))
+                self.after(0, lambda: self.last_scan_label.config(
+                    text=f"Last probe: {datetime.datetime.now().strftime('%H:%M:%S')} "
+                         f"({len(answered)}/{len(batch)} answered)"
+                ))
+                # Output files at most once per scan interval
+                now = time.monotonic()
+                if now - self._outputs_saved_at >= self.settings["interval"]:
+                    self._outputs_saved_at = now
+                    self.after(0, self._save_output_files)
         except Exception as e:
-            self.after(0, lambda: messagebox.showerror("Scan Error", str(e)))
-            self.after(0, lambda: self.status_label.config(text=f"Error: {e}", style="Error.TLabel"))
-    
+            if batch:
+                scheduler.requeue(batch)
+            message = f"Error: {e}"  # e is unbound once the except block ends
+            self.after(0, lambda: self.status_label.config(text=message, style="Error.TLabel"))
+        finally:
+            # Keep the probe chain going unless Stop (and maybe Start) ended this run
+            if self._running and generation == self._scan_generation:
+                self.after(ADAPTIVE_TICK_MS, lambda: self._schedule_scan(generation))
+
+    def _notify_changes(self, events: list[DeviceEvent]) -> None:
+        """Show one notification per scan for new devices and IP changes."""
+        lines = []
+        if self.settings.get("notify_new", True):
+            lines += [
+                f"New device discovered: {e.device.mac_address} ({e.device.ip_address})"
+                for e in events if isinstance(e, DeviceJoined) and e.first_seen
+            ]
+        if self.settings.get("notify_change", False):
+            lines += [
+                f"IP changed: {e.device.mac_address} from {e.old_ip} to {e.new_ip}"
+                for e in events if isinstance(e, IpChanged)
+            ]
+        if lines:
+            messagebox.showinfo("Network Changes", "\n".join(lines))
+
     def _save_output_files(self) -> None:
-        """Save scan results to configured output files."""
+        """Have the configured output files written in the background."""
         if not self.monitor:
             return
-            
-        # Handle JSON output
-        json_path = self.settings.get("json_path", "")
-        if json_path:
-            try:
-                if self.settings.get("timestamp_files", False):
-                    base, ext = os.path.splitext(json_path)
-                    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                    json_path = f"{base}_{timestamp}{ext}"
-                self.monitor.to_json(json_path)
-            except Exception as e:
-                messagebox.showerror("JSON Export Error", f"Failed to save JSON: {e}")
-        
-        # Handle CSV output
-        csv_path = self.settings.get("csv_path", "")
-        if csv_path:
+        if self._output_writer is None:
+            self._output_writer = BackgroundWriter(self._write_output_files, interval=0,
+                                                   name="gui-output-writer")
+        self._output_writer.request()
+
+    def _write_output_files(self) -> None:
+        """Save scan results to configured output files; runs on the output writer's thread."""
+        monitor = self.monitor
+        if not monitor:
+            return
+
+        for key, label, export in (("json_path", "JSON", monitor.to_json), ("csv_path", "CSV", monitor.to_csv)):
+            path = self.settings.get(key, "")
+            if not path:
+                continue
             try:
                 if self.settings.get("timestamp_files", False):
-                    base, ext = os.path.splitext(csv_path)
+                    base, ext = os.path.splitext(path)
                     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                    csv_path = f"{base}_{timestamp}{ext}"
-                self.monitor.to_csv(csv_path)
+                    path = f"{base}_{timestamp}{ext}"
+                export(path)
             except Exception as e:
-                messagebox.showerror("CSV Export Error", f"Failed to save CSV: {e}")
-            
+                title, message = f"{label} Export Error", f"Failed to save {label}: {e}"
+                self.after(0, lambda t=title, m=message: messagebox.showerror(t, m))
+
     def _manual_refresh(self) -> None:
         """Manually refresh device list."""
         if self.monitor:
@@ -613,104 +1072,92 @@ class ModernNetworkMonitorGUI(tk.Tk):
             
     def _update_device_list(self) -> None:
         """Update the device list display."""
-        devices = self.monitor.devices() if self.monitor else []
+        # Copies, so a scan thread can't change devices while they are drawn
+        devices = self.monitor.snapshot() if self.monitor else []
         self._devices_cache = devices
         self._filter_devices()
         
+    def _schedule_filter(self) -> None:
+        """Re-filter once typing in the search box pauses."""
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(SEARCH_DEBOUNCE_MS, self._filter_devices)
+
     def _filter_devices(self) -> None:
-        """Filter devices based on search."""
-        # Clear tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Get search term
+        """Filter devices based on search, updating only the rows that changed."""
+        self._filter_job = None
+        # Get search term; the monitor's index answers it without touching every device
         search = self.search_var.get().lower()
+        matches = self.monitor.search_macs(search) if search and self.monitor else None
+        online_only = self.online_only_var.get()
         
         # Get current time for online status
         now = datetime.datetime.now(datetime.timezone.utc)
         
-        # Filter and display devices
-        displayed = 0
-        for device in sorted(self._devices_cache, key=lambda d: d.ip_address):
+        def visible(device: Device) -> bool:
             # Check if device matches search
-            if search and not any(search in str(val).lower() if val else "" for val in [
-                device.mac_address, device.ip_address, device.hostname, device.manufacturer
-            ]):
-                continue
-            
+            if matches is not None and device.mac_address not in matches:
+                return False
             # Filter online-only if requested
-            if self.online_only_var.get() and (now - device.last_seen).seconds >= 120:
-                continue
-                
-            # Format timestamps - convert from UTC to local time
-            first_seen_local = device.date_added.replace(tzinfo=datetime.timezone.utc).astimezone()
-            last_seen_local = device.last_seen.replace(tzinfo=datetime.timezone.utc).astimezone()
-            first_seen = first_seen_local.strftime("%Y-%m-%d %H:%M:%S")
-            last_seen = last_seen_local.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Handle None values for display
-            hostname = device.hostname or "-"
-            manufacturer = device.manufacturer or "-"
-            
-            # Determine status and tags
-            if (now - device.last_seen).seconds < 120:
-                status = "Online"
-                tags = ("online",)
-            else:
-                status = "Offline"
-                tags = ()
-                
-            # Check if new device
-            if (now - device.date_added).seconds < 300:
-                tags = tags + ("new",)
-                # Show notification if enabled
-                if self.settings.get("notify_new", True) and hasattr(self, '_last_device_count'):
-                    if displayed > self._last_device_count:
-                        self.after(0, lambda: messagebox.showinfo(
-                            "New Device Found", 
-                            f"New device discovered: {device.mac_address} ({device.ip_address})"
-                        ))
-                
-            # Insert into tree
-            self.tree.insert("", "end", values=(
-                device.mac_address,
-                device.ip_address,
-                hostname,
-                manufacturer,
-                first_seen,
-                last_seen,
-                status
-            ), tags=tags)
-            displayed += 1
+            return not online_only or (now - device.last_seen).total_seconds() < ONLINE_SECONDS
+        
+        virtual = len(self._devices_cache) >= self.settings.get("virtual_list_threshold", VIRTUAL_LIST_THRESHOLD)
+        if virtual != isinstance(self._tree_rows, VirtualDeviceRows):
+            self._set_list_mode(virtual)
+        displayed = self._tree_rows.sync(self._devices_cache, now, visible)
             
         # Update count with online status
         total = len(self._devices_cache)
-        online_total = sum(1 for d in self._devices_cache if (now - d.last_seen).seconds < 120)
+        online_total = sum(1 for d in self._devices_cache if (now - d.last_seen).total_seconds() < ONLINE_SECONDS)
         
-        if self.online_only_var.get():
+        if online_only:
             self.device_count_label.config(text=f"{displayed} online devices")
         elif displayed < total:
             self.device_count_label.config(text=f"{displayed} of {total} devices ({online_total} online)")
         else:
             self.device_count_label.config(text=f"{total} devices ({online_total} online)")
-        
-        # Store count for new device notifications
-        self._last_device_count = displayed
             
+    def _set_list_mode(self, virtual: bool) -> None:
+        """Switch the device list between one item per device and a virtual window."""
+        sort_column = self._tree_rows.sort_column
+        self._tree_rows.clear()
+        if virtual:
+            self._tree_rows = VirtualDeviceRows(self.tree, self.vsb, sort_column)
+            self._tree_rows.resize(self._viewport_rows(self.tree.winfo_height()))
+            self.tree.configure(yscrollcommand="")
+            self.vsb.configure(command=self._tree_rows.yview)
+        else:
+            self._tree_rows = DeviceTreeRows(self.tree, sort_column)
+            self.tree.configure(yscrollcommand=self.vsb.set)
+            self.vsb.configure(command=self.tree.yview)
+
+    def _viewport_rows(self, height: int) -> int:
+        """Estimate how many rows fit in a tree of ``height`` pixels."""
+        row_height = int(ttk.Style(self).lookup("Treeview", "rowheight") or 20)
+        return (height - row_height) // row_height  # Less one row for the headings
+
+    def _on_tree_resize(self, event: tk.Event) -> None:
+        if isinstance(self._tree_rows, VirtualDeviceRows):
+            self._tree_rows.resize(self._viewport_rows(event.height))
+
+    def _on_tree_wheel(self, event: tk.Event) -> str | None:
+        if not isinstance(self._tree_rows, VirtualDeviceRows):
+            return None
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._tree_rows.yview("scroll", "-3", "units")
+        else:
+            self._tree_rows.yview("scroll", "3", "units")
+        return "break"
+
     def _sort_tree(self, column: str) -> None:
         """Sort treeview by column."""
-        # Get all items
-        items = [(self.tree.set(item, column), item) for item in self.tree.get_children()]
-        
-        # Sort
-        items.sort()
-        
-        # Rearrange
-        for index, (_, item) in enumerate(items):
-            self.tree.move(item, "", index)
+        self._tree_rows.sort_by(DEVICE_COLUMNS.index(column))
+        self._filter_devices()
             
     def _on_device_select(self, event: tk.Event) -> None:
         """Handle device selection."""
+        if isinstance(self._tree_rows, VirtualDeviceRows):
+            self._tree_rows.note_selection()
         selection = self.tree.selection()
         if selection and self.details_visible:
             # Update details panel
@@ -778,7 +1225,14 @@ class ModernNetworkMonitorGUI(tk.Tk):
             "verbose": False,
             "mac_lookup": True,
             "use_persistence": True,
+            "save_interval": 5,
+            "fsync": "snapshot",
+            "backend": "json",
             "max_threads": 1,
+            "engine": "nmap",
+            "probe_budget": 0,
+            "dhcp_ranges": [],
+            "virtual_list_threshold": VIRTUAL_LIST_THRESHOLD,
         }
         
         if settings_file.exists():
@@ -834,7 +1288,8 @@ class ModernNetworkMonitorGUI(tk.Tk):
                     f"One-shot scan completed.\nResults saved to: {json_file}"
                 ))
                 
-            threading.Thread(target=do_scan, daemon=True).start()
+            self._executor.submit(do_scan)
+            self._update_scan_status()
             
         except Exception as e:
             self.progress.stop()
@@ -873,9 +1328,8 @@ class ModernNetworkMonitorGUI(tk.Tk):
         values = item['values']
         
         # Map column name to index
-        columns = ("MAC Address", "IP Address", "Hostname", "Manufacturer", "First Seen", "Last Seen", "Status")
         try:
-            idx = columns.index(column)
+            idx = DEVICE_COLUMNS.index(column)
             value = values[idx]
             
             # Copy to clipboard
@@ -917,6 +1371,11 @@ Status: {values[6]}"""
         if self._running:
             self._stop_scanning()
         self._save_settings_to_disk()
+        # Finish pending writes before the process exits
+        if self._output_writer is not None:
+            self._output_writer.close()
+        if self.monitor is not None:
+            self.monitor.close()
         self.destroy()
 
 
@@ -0,0 +1,383 @@
+"""Per-scan sighting history kept in compact columnar arrays."""
+
+import array
+import bisect
+import datetime
+import json
+import math
+import socket
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .parsers import HostRecord
+from .storage import atomic_write
+
+
+@dataclass(frozen=True)
+class Sighting:
+    """Where a device was seen at a point in time."""
+    mac_address: str
+    ip_address: str
+    hostname: str | None
+    seen_at: datetime.datetime
+    latency: float | None = None
+
+
+def _ip_to_int(ip: str) -> int:
+    try:
+        return struct.unpack('!I', socket.inet_aton(ip))[0]
+    except OSError:
+        return 0  # Not an IPv4 address
+
+
+def _int_to_ip(value: int) -> str:
+    return socket.inet_ntoa(struct.pack('!I', value))
+
+
+def _epoch(when: datetime.datetime) -> float:
+    return when.timestamp()
+
+
+class _Table:
+    """
+    Parallel typed arrays holding one row per (time, device).
+
+    Raw sightings and rolled-up buckets share the layout: a raw row is a
+    bucket of one scan in which the device was seen once. Rows are appended
+    in time order, so time windows can be located with bisect.
+    """
+
+    COLUMNS = (
+        ("t", "d"),         # Scan time, or bucket start, in epoch seconds
+        ("mac", "I"),       # Interned MAC id
+        ("seen", "I"),      # Scans in which the device was seen
+        ("first_ip", "I"),  # IPv4 as int at the start of the row...
+        ("last_ip", "I"),   # ...and at its end
+        ("changes", "I"),   # IP changes within the row
+        ("host", "I"),      # Interned hostname id (0 = none)
+        ("rtt", "f"),       # Mean latency in seconds, NaN if unknown
+    )
+
+    def __init__(self) -> None:
+        for name, code in self.COLUMNS:
+            setattr(self, name, array.array(code))
+        # Number of scans per time slot, for uptime denominators
+        self.scan_t = array.array("d")
+        self.scan_n = array.array("I")
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def arrays(self) -> list[array.array]:
+        return [getattr(self, name) for name, _ in self.COLUMNS] + [self.scan_t, self.scan_n]
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in self.arrays())
+
+    def append(self, t: float, mac: int, seen: int, first_ip: int, last_ip: int,
+               changes: int, host: int, rtt: float) -> None:
+        self.t.append(t)
+        self.mac.append(mac)
+        self.seen.append(seen)
+        self.first_ip.append(first_ip)
+        self.last_ip.append(last_ip)
+        self.changes.append(changes)
+        self.host.append(host)
+        self.rtt.append(rtt)
+
+    def add_scans(self, t: float, count: int) -> None:
+        if self.scan_t and self.scan_t[-1] == t:
+            self.scan_n[-1] += count
+        else:
+            self.scan_t.append(t)
+            self.scan_n.append(count)
+
+    def split_before(self, cutoff: float) -> tuple[int, int]:
+        """Return how many rows and scan slots lie before ``cutoff``."""
+        return bisect.bisect_left(self.t, cutoff), bisect.bisect_left(self.scan_t, cutoff)
+
+    def drop_before(self, rows: int, scans: int) -> None:
+        for name, _ in self.COLUMNS:
+            del getattr(self, name)[:rows]
+        del self.scan_t[:scans]
+        del self.scan_n[:scans]
+
+    def rows_for(self, mac: int, start: float = -math.inf, end: float = math.inf) -> Iterator[int]:
+        """Yield indexes of rows for ``mac`` with start <= t < end, oldest first."""
+        lo = bisect.bisect_left(self.t, start) if start != -math.inf else 0
+        hi = bisect.bisect_left(self.t, end) if end != math.inf else len(self.t)
+        macs = self.mac
+        for i in range(lo, hi):
+            if macs[i] == mac:
+                yield i
+
+    def scans_between(self, start: float, end: float) -> int:
+        lo = bisect.bisect_left(self.scan_t, start)
+        hi = bisect.bisect_left(self.scan_t, end)
+        return sum(self.scan_n[lo:hi])
+
+
+class SightingHistory:
+    """
+    Time series of which device was seen where, scan by scan.
+
+    Each scan's sightings are appended in bulk to columnar arrays with MACs
+    and hostnames interned and IPv4 addresses packed into integers. Raw rows
+    older than ``raw_retention`` are rolled up into coarser tiers (hourly,
+    then daily by default) and the coarsest tier drops data past its
+    retention, together with MACs and hostnames no longer referenced, so
+    memory stays bounded however long monitoring runs.
+    """
+
+    RAW_RETENTION = 3600  # Seconds of per-scan rows to keep
+    # (bucket size, retention) in seconds, finest first
+    TIERS = ((3600, 7 * 86400), (86400, 400 * 86400))
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        raw_retention: float = RAW_RETENTION,
+        tiers: Iterable[tuple[int, float]] = TIERS,
+    ) -> None:
+        self.raw_retention = raw_retention
+        self.tiers = [tuple(tier) for tier in tiers]
+        # Newest data first: raw rows, then each rollup tier
+        self._tables = [_Table() for _ in range(len(self.tiers) + 1)]
+        self._macs: list[str] = []
+        self._mac_ids: dict[str, int] = {}
+        self._hostnames: list[str | None] = [None]
+        self._host_ids: dict[str | None, int] = {None: 0}
+
+    # -------------------------------------------------------------- #
+    # recording
+    # -------------------------------------------------------------- #
+    def _mac_id(self, mac: str) -> int:
+        mac_id = self._mac_ids.get(mac)
+        if mac_id is None:
+            mac_id = self._mac_ids[mac] = len(self._macs)
+            self._macs.append(mac)
+        return mac_id
+
+    def _host_id(self, hostname: str | None) -> int:
+        host_id = self._host_ids.get(hostname)
+        if host_id is None:
+            host_id = self._host_ids[hostname] = len(self._hostnames)
+            self._hostnames.append(hostname)
+        return host_id
+
+    def record_scan(self, when: datetime.datetime, records: Iterable[HostRecord]) -> None:
+        """Append the sightings of one complete scan and roll up old rows."""
+        t = _epoch(when)
+        raw = self._tables[0]
+        if raw.scan_t and t < raw.scan_t[-1]:
+            raise ValueError("Scans must be recorded in time order")
+
+        for record in records:
+            ip = _ip_to_int(record.ip_address)
+            raw.append(
+                t,
+                self._mac_id(record.mac_address),
+                1,
+                ip,
+                ip,
+                0,
+                self._host_id(record.hostname),
+                record.latency if record.latency is not None else math.nan,
+            )
+        raw.add_scans(t, 1)
+        self._roll_up(t)
+
+    def _roll_up(self, now: float) -> None:
+        retentions = [self.raw_retention] + [retention for _, retention in self.tiers]
+        for level, source in enumerate(self._tables):
+            if level == len(self.tiers):
+                # Coarsest tier: old rows are simply forgotten
+                rows, scans = source.split_before(now - retentions[level])
+                if rows or scans:
+                    source.drop_before(rows, scans)
+                if rows:
+                    self._reintern()
+                continue
+
+            bucket = self.tiers[level][0]
+            # Only move whole buckets of the next tier
+            cutoff = math.floor((now - retentions[level]) / bucket) * bucket
+            if not (source.t and source.t[0] < cutoff) and not (source.scan_t and source.scan_t[0] < cutoff):
+                continue
+            rows, scans = source.split_before(cutoff)
+            self._aggregate(source, rows, scans, self._tables[level + 1], bucket)
+            source.drop_before(rows, scans)
+
+    def _reintern(self) -> None:
+        """Drop MACs and hostnames no row refers to any more, renumbering the rest."""
+        used_macs = set()
+        used_hosts = {0}
+        for table in self._tables:
+            used_macs.update(table.mac)
+            used_hosts.update(table.host)
+        if len(used_macs) == len(self._macs) and len(used_hosts) == len(self._hostnames):
+            return
+
+        # Keep ids in their old order so rows within a bucket stay sorted by MAC id
+        mac_map = {old: new for new, old in enumerate(sorted(used_macs))}
+        host_map = {old: new for new, old in enumerate(sorted(used_hosts))}
+        for table in self._tables:
+            table.mac = array.array("I", (mac_map[m] for m in table.mac))
+            table.host = array.array("I", (host_map[h] for h in table.host))
+        self._macs = [self._macs[old] for old in sorted(used_macs)]
+        self._mac_ids = {mac: i for i, mac in enumerate(self._macs)}
+        self._hostnames = [self._hostnames[old] for old in sorted(used_hosts)]
+        self._host_ids = {name: i for i, name in enumerate(self._hostnames)}
+
+    @staticmethod
+    def _aggregate(source: _Table, rows: int, scans: int, target: _Table, bucket: int) -> None:
+        """Merge the first ``rows`` rows of ``source`` into ``bucket``-sized rows of ``target``."""
+        groups: dict[tuple[float, int], list] = {}
+        order: list[tuple[float, int]] = []
+        for i in range(rows):
+            key = (math.floor(source.t[i] / bucket) * bucket, source.mac[i])
+            rtt = source.rtt[i]
+            group = groups.get(key)
+            if group is None:
+                # seen, first_ip, last_ip, changes, host, rtt_sum, rtt_weight
+                groups[key] = [
+                    source.seen[i], source.first_ip[i], source.last_ip[i], source.changes[i],
+                    source.host[i], 0.0 if math.isnan(rtt) else rtt * source.seen[i],
+                    0 if math.isnan(rtt) else source.seen[i],
+                ]
+                order.append(key)
+                continue
+            group[3] += source.changes[i] + (source.first_ip[i] != group[2])
+            group[0] += source.seen[i]
+            group[2] = source.last_ip[i]
+            group[4] = source.host[i]
+            if not math.isnan(rtt):
+                group[5] += rtt * source.seen[i]
+                group[6] += source.seen[i]
+
+        # Source rows are time ordered, so buckets are too; sort MACs within a bucket
+        for key in sorted(order):
+            seen, first_ip, last_ip, changes, host, rtt_sum, rtt_weight = groups[key]
+            rtt = rtt_sum / rtt_weight if rtt_weight else math.nan
+            target.append(key[0], key[1], seen, first_ip, last_ip, changes, host, rtt)
+        for j in range(scans):
+            target.add_scans(math.floor(source.scan_t[j] / bucket) * bucket, source.scan_n[j])
+
+    # -------------------------------------------------------------- #
+    # queries
+    # -------------------------------------------------------------- #
+    def _rows_oldest_first(self, mac_id: int, start: float = -math.inf,
+                           end: float = math.inf) -> Iterator[tuple[_Table, int]]:
+        for table in reversed(self._tables):
+            for i in table.rows_for(mac_id, start, end):
+                yield table, i
+
+    def where_was(self, mac: str, when: datetime.datetime) -> Sighting | None:
+        """
+        Return the latest sighting of ``mac`` at or before ``when``.
+
+        For rolled-up history the sighting is the device's last address within
+        the bucket, timestamped with the bucket start.
+        """
+        mac_id = self._mac_ids.get(mac.lower())
+        if mac_id is None:
+            return None
+        end = math.nextafter(_epoch(when), math.inf)
+        for table in self._tables:
+            last = None
+            for i in table.rows_for(mac_id, end=end):
+                last = i
+            if last is not None:
+                rtt = table.rtt[last]
+                return Sighting(
+                    mac_address=self._macs[mac_id],
+                    ip_address=_int_to_ip(table.last_ip[last]),
+                    hostname=self._hostnames[table.host[last]],
+                    seen_at=datetime.datetime.fromtimestamp(table.t[last], datetime.timezone.utc),
+                    latency=None if math.isnan(rtt) else rtt,
+                )
+        return None
+
+    def uptime(self, mac: str, days: float = 7, now: datetime.datetime | None = None) -> float:
+        """Return the fraction (0-1) of scans in the last ``days`` that saw ``mac``."""
+        end = _epoch(now or datetime.datetime.now(datetime.timezone.utc))
+        start = end - days * 86400
+        end = math.nextafter(end, math.inf)
+        scans = sum(table.scans_between(start, end) for table in self._tables)
+        mac_id = self._mac_ids.get(mac.lower())
+        if not scans or mac_id is None:
+            return 0.0
+        seen = sum(table.seen[i] for table, i in self._rows_oldest_first(mac_id, start, end))
+        return min(seen / scans, 1.0)
+
+    def ip_churn(self, mac: str, days: float = 7, now: datetime.datetime | None = None) -> int:
+        """Return how many times ``mac`` changed IP address in the last ``days``."""
+        mac_id = self._mac_ids.get(mac.lower())
+        if mac_id is None:
+            return 0
+        end = _epoch(now or datetime.datetime.now(datetime.timezone.utc))
+        start = end - days * 86400
+        churn = 0
+        previous_ip = None
+        for table, i in self._rows_oldest_first(mac_id, start, math.nextafter(end, math.inf)):
+            churn += table.changes[i]
+            if previous_ip is not None and table.first_ip[i] != previous_ip:
+                churn += 1
+            previous_ip = table.last_ip[i]
+        return churn
+
+    def __len__(self) -> int:
+        """Total rows held across the raw table and all rollup tiers."""
+        return sum(len(table) for table in self._tables)
+
+    def nbytes(self) -> int:
+        """Approximate bytes used by the row arrays."""
+        return sum(table.nbytes() for table in self._tables)
+
+    # -------------------------------------------------------------- #
+    # persistence
+    # -------------------------------------------------------------- #
+    def save(self, path: Path, fsync: bool = False) -> None:
+        """Write the history to ``path`` in one pass (temp file, then rename; see atomic_write)."""
+        path = Path(path)
+        header = json.dumps({
+            "version": self.FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "raw_retention": self.raw_retention,
+            "tiers": self.tiers,
+            "macs": self._macs,
+            "hostnames": self._hostnames,
+            "lengths": [[len(a) for a in table.arrays()] for table in self._tables],
+        }).encode("utf-8")
+        with atomic_write(path, "wb", fsync=fsync) as f:
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for table in self._tables:
+                for column in table.arrays():
+                    column.tofile(f)
+
+    @classmethod
+    def load(cls, path: Path) -> "SightingHistory":
+        """Read a history written by save()."""
+        with open(path, "rb") as f:
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            if header["version"] != cls.FORMAT_VERSION:
+                raise ValueError(f"Unsupported history format version {header['version']}")
+            history = cls(raw_retention=header["raw_retention"], tiers=header["tiers"])
+            if len(header["lengths"]) != len(history._tables):
+                raise ValueError("History file does not match its tier configuration")
+            for table, lengths in zip(history._tables, header["lengths"]):
+                for column, length in zip(table.arrays(), lengths):
+                    column.fromfile(f, length)
+                    if header["byteorder"] != sys.byteorder:
+                        column.byteswap()
+
+        history._macs = header["macs"]
+        history._mac_ids = {mac: i for i, mac in enumerate(history._macs)}
+        history._hostnames = header["hostnames"]
+        history._host_ids = {name: i for i, name in enumerate(history._hostnames)}
+        return history
@@ -1,19 +1,45 @@
 import datetime
+import sys
 from dataclasses import dataclass, field
+from functools import lru_cache
 
-@dataclass
+
+def _intern(value: str | None) -> str | None:
+    """Share one copy of repeated strings (vendors, domains) across devices."""
+    return None if value is None else sys.intern(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(text: str) -> datetime.datetime:
+    # Devices seen in the same scan share a timestamp; datetimes are immutable,
+    # so one object can serve all of them
+    return datetime.datetime.fromisoformat(text)
+
+
+@dataclass(slots=True)
 class Device:
-    """Represents a network device discovered via nmap ping scan."""
+    """
+    Represents a network device discovered via nmap ping scan.
+
+    Devices use ``__slots__`` and intern their hostname, manufacturer and
+    network, so large inventories don't pay for a per-device ``__dict__``
+    or one copy of the vendor name per device.
+    """
     mac_address: str
     ip_address: str
     hostname: str | None = None
     manufacturer: str | None = None
     date_added: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
     last_seen: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+    network: str | None = None  # Monitored network the device was last seen on
 
     def __post_init__(self):
-        """Normalize MAC address to lowercase."""
-        self.mac_address = self.mac_address.lower()
+        """Normalize MAC address to lowercase and intern shared strings."""
+        if not self.mac_address.islower():  # Parsers already hand over lowercase MACs
+            self.mac_address = self.mac_address.lower()
+        self.hostname = _intern(self.hostname)
+        self.manufacturer = _intern(self.manufacturer)
+        self.network = _intern(self.network)
 
     def update_last_seen(self, timestamp: datetime.datetime | None = None) -> None:
         self.last_seen = timestamp or datetime.datetime.now(datetime.timezone.utc)
@@ -24,14 +50,14 @@ class Device:
     
     def update_hostname(self, hostname: str | None) -> None:
         """Update the hostname."""
-        self.hostname = hostname
+        self.hostname = _intern(hostname)
     
     def update_manufacturer(self, manufacturer: str | None) -> None:
         """Update the manufacturer."""
-        self.manufacturer = manufacturer
+        self.manufacturer = _intern(manufacturer)
 
     def to_dict(self) -> dict:
-        return {
+        data = {
             'mac_address': self.mac_address,
             'ip_address': self.ip_address,
             'hostname': self.hostname,
@@ -39,6 +65,22 @@ class Device:
             'date_added': self.date_added.isoformat(),
             'last_seen': self.last_seen.isoformat(),
         }
+        if self.network is not None:
+            data['network'] = self.network
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Device":
+        """Build a Device from a to_dict() mapping (hostname/manufacturer optional)."""
+        return cls(
+            mac_address=data['mac_address'],
+            ip_address=data['ip_address'],
+            hostname=data.get('hostname'),  # May not exist in old data
+            manufacturer=data.get('manufacturer'),  # May not exist in old data
+            date_added=_parse_timestamp(data['date_added']),
+            last_seen=_parse_timestamp(data['last_seen']),
+            network=data.get('network'),  # Not recorded before multi-network monitoring
+        )
 
     def __str__(self) -> str:
         # Create a formatted table-like string with fixed widths
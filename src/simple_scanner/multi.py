@@ -0,0 +1,119 @@
+"""Monitor several networks from one process, each on its own schedule."""
+
+import ipaddress
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from .models import Device
+from .scanner import NetworkMonitor, autodetect_networks, split_targets
+
+
+@dataclass
+class NetworkTarget:
+    """One monitored network with its scan interval (seconds) and nmap concurrency."""
+    network: str
+    interval: float = 30
+    max_workers: int = 1
+
+    @classmethod
+    def parse(cls, text: str, default_interval: float | None = None) -> "NetworkTarget":
+        """
+        Parse ``CIDR[:INTERVAL[:WORKERS]]``, e.g. ``10.0.0.0/22:60:4``.
+
+        IPv6 networks contain colons themselves, so they take options only
+        in CIDR form (``fd00::/64:60``); a bare IPv6 address has none.
+        """
+        try:
+            ipaddress.ip_network(text, strict=False)
+            network, rest = text, []
+        except ValueError:
+            network, *rest = text.rsplit(":", 2)
+            # Rejoin colons that belong to an IPv6 address rather than the options
+            while rest and ":" in network and "/" not in network:
+                network = f"{network}:{rest.pop(0)}"
+        if not network or ":" in network.partition("/")[2] or len(split_targets(network)) != 1:
+            raise ValueError(f"Invalid target {text!r}; expected CIDR[:INTERVAL[:WORKERS]]")
+        try:
+            interval = float(rest[0]) if rest else (default_interval or cls.interval)
+            max_workers = int(rest[1]) if len(rest) > 1 else cls.max_workers
+        except ValueError as e:
+            raise ValueError(f"Invalid target {text!r}; expected CIDR[:INTERVAL[:WORKERS]]") from e
+        if interval <= 0 or max_workers < 1:
+            raise ValueError(f"Invalid target {text!r}; interval and workers must be positive")
+        return cls(network, interval, max_workers)
+
+
+class MultiNetworkMonitor:
+    """
+    Scans several networks on independent schedules into one device inventory.
+
+    All targets share a single NetworkMonitor, so there is one store, one
+    persistence writer and one event stream; every device is tagged with
+    the network it was seen on (``Device.network``). Each target is scanned
+    every ``interval`` seconds with its own ``max_workers``, and a scan of
+    one network only reports departures from (and prunes) that network::
+
+        multi = MultiNetworkMonitor([NetworkTarget("10.0.0.0/24", 30),
+                                     NetworkTarget("10.8.0.0/22", 300, 4)])
+        while True:
+            multi.run_due()
+            time.sleep(multi.seconds_until_due())
+
+    Without targets, every local interface subnet is monitored every
+    ``interval`` seconds. Other keyword arguments go to NetworkMonitor.
+    """
+
+    def __init__(
+        self,
+        targets: list[NetworkTarget] | None = None,
+        max_concurrent: int = 4,
+        interval: float = NetworkTarget.interval,
+        **monitor_kwargs,
+    ) -> None:
+        if targets is None:
+            targets = [NetworkTarget(network, interval) for network in autodetect_networks()]
+        if not targets:
+            raise ValueError("At least one network target is required")
+        self.targets = list(targets)
+        self.max_concurrent = max_concurrent
+        self.monitor = NetworkMonitor(network=",".join(t.network for t in self.targets), **monitor_kwargs)
+        self._next_due = {t.network: 0.0 for t in self.targets}
+
+    def run_due(self, now: float | None = None) -> list[NetworkTarget]:
+        """
+        Scan every target whose interval has elapsed, concurrently, and return them.
+
+        A failing network (a scan error, or a target the sweep engine
+        rejects) doesn't stop the others; it is retried at its next interval
+        and reported when verbose.
+        """
+        now = time.monotonic() if now is None else now
+        due = [t for t in self.targets if self._next_due[t.network] <= now]
+        if not due:
+            return []
+        for target in due:
+            self._next_due[target.network] = now + target.interval
+
+        def run(target: NetworkTarget) -> None:
+            try:
+                self.monitor.scan(network=target.network, max_workers=target.max_workers)
+            except (RuntimeError, ValueError) as e:
+                if self.monitor.verbose:
+                    print(f"Warning: Scan of {target.network} failed: {e}")
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent, len(due))) as pool:
+            list(pool.map(run, due))
+        return due
+
+    def seconds_until_due(self, now: float | None = None) -> float:
+        """Seconds until the next target is due (0 if one already is)."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(self._next_due.values()) - now)
+
+    def devices(self, network: str | None = None) -> list[Device]:
+        """Return all tracked devices, or only those seen on ``network``."""
+        devices = self.monitor.devices()
+        if network is None:
+            return devices
+        return [d for d in devices if d.network == network]
@@ -0,0 +1,172 @@
+"""Passive discovery from the kernel neighbor (ARP) table, without sending probes."""
+
+import select
+import socket
+import struct
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from .sweep import ARP_TABLE, read_arp_table
+
+NETLINK_ROUTE = 0
+RTMGRP_NEIGH = 0x4  # Multicast group for neighbor table changes
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWNEIGH = 28
+RTM_GETNEIGH = 30
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NDA_DST = 1
+NDA_LLADDR = 2
+
+# Neighbor states (NUD_*). Only REACHABLE means the kernel heard from the
+# host recently; STALE entries can linger for hours after it has left.
+NUD_REACHABLE = 0x02
+NUD_STALE = 0x04
+
+NLMSG_HEADER = struct.Struct("=IHHII")  # len, type, flags, seq, pid
+NDMSG = struct.Struct("=BxxxiHBB")  # family, ifindex, state, flags, type
+RTATTR = struct.Struct("=HH")  # len, type
+
+
+class Neighbor(NamedTuple):
+    """One IPv4 entry of the kernel neighbor table."""
+    ip_address: str
+    mac_address: str
+    interface: str
+    state: int | None  # NUD_* state; None when read from /proc/net/arp
+
+    @property
+    def fresh(self) -> bool:
+        """True if the entry proves the host answered recently."""
+        # /proc/net/arp has no state: every complete entry counts
+        return self.state is None or bool(self.state & NUD_REACHABLE)
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def _interface_name(index: int) -> str:
+    try:
+        return socket.if_indextoname(index)
+    except OSError:
+        return str(index)
+
+
+def parse_messages(data: bytes) -> Iterator[tuple[int, Neighbor | None]]:
+    """
+    Yield ``(message type, neighbor)`` for each netlink message in ``data``.
+
+    ``neighbor`` is None for messages that are not IPv4 neighbor entries
+    with a link-layer address, such as NLMSG_DONE.
+    """
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size:
+            break
+        body = data[offset + NLMSG_HEADER.size:offset + length]
+        offset += _align(length)
+        if msg_type != RTM_NEWNEIGH or len(body) < NDMSG.size:
+            yield msg_type, None
+            continue
+
+        family, ifindex, state, _, _ = NDMSG.unpack_from(body)
+        attrs = {}
+        pos = NDMSG.size
+        while pos + RTATTR.size <= len(body):
+            attr_len, attr_type = RTATTR.unpack_from(body, pos)
+            if attr_len < RTATTR.size:
+                break
+            attrs[attr_type] = body[pos + RTATTR.size:pos + attr_len]
+            pos += _align(attr_len)
+
+        dst, lladdr = attrs.get(NDA_DST), attrs.get(NDA_LLADDR)
+        if family != socket.AF_INET or dst is None or lladdr is None or len(lladdr) != 6 \
+                or lladdr == b"\x00" * 6:
+            yield msg_type, None
+            continue
+        yield msg_type, Neighbor(
+            socket.inet_ntoa(dst),
+            ":".join(f"{b:02x}" for b in lladdr),
+            _interface_name(ifindex),
+            state,
+        )
+
+
+def _netlink_socket(groups: int = 0) -> socket.socket:
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+    sock.bind((0, groups))
+    return sock
+
+
+def dump_neighbors() -> list[Neighbor]:
+    """
+    Return the IPv4 neighbor table with entry states, via rtnetlink.
+
+    Raises OSError where netlink is unavailable (non-Linux systems).
+    """
+    request = NLMSG_HEADER.pack(
+        NLMSG_HEADER.size + NDMSG.size, RTM_GETNEIGH, NLM_F_REQUEST | NLM_F_DUMP, 1, 0
+    ) + NDMSG.pack(socket.AF_INET, 0, 0, 0, 0)
+    neighbors = []
+    with _netlink_socket() as sock:
+        sock.send(request)
+        while True:
+            for msg_type, neighbor in parse_messages(sock.recv(65536)):
+                if msg_type == NLMSG_DONE:
+                    return neighbors
+                if msg_type == NLMSG_ERROR:
+                    raise OSError("Neighbor table dump was rejected by the kernel")
+                if neighbor is not None:
+                    neighbors.append(neighbor)
+
+
+def read_neighbors(path: Path = ARP_TABLE) -> list[Neighbor]:
+    """Return the current neighbor table, from netlink or else ``/proc/net/arp``."""
+    try:
+        return dump_neighbors()
+    except (OSError, AttributeError):  # AttributeError: no AF_NETLINK on this platform
+        return [Neighbor(ip, mac, iface, None) for ip, (mac, iface) in read_arp_table(path).items()]
+
+
+class NeighborWatcher:
+    """
+    Subscription to rtnetlink neighbor events.
+
+    The kernel sends a message whenever a neighbor entry is created or
+    changes state, e.g. when a host's ARP reply confirms it is reachable.
+    ``poll()`` returns the entries received since the last call without
+    blocking (or waits up to ``timeout`` seconds for the first one), so a
+    monitor loop can pick up sightings between scans. Linux only.
+    """
+
+    def __init__(self) -> None:
+        self._sock = _netlink_socket(RTMGRP_NEIGH)
+        self._sock.setblocking(False)
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    def poll(self, timeout: float = 0.0) -> list[Neighbor]:
+        """Return the neighbor entries announced since the previous poll."""
+        neighbors = []
+        ready, _, _ = select.select([self._sock], [], [], timeout)
+        while ready:
+            try:
+                data = self._sock.recv(65536)
+            except BlockingIOError:
+                break
+            neighbors.extend(n for t, n in parse_messages(data) if n is not None and t == RTM_NEWNEIGH)
+        return neighbors
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def __enter__(self) -> "NeighborWatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,260 @@
+"""Offline MAC vendor lookup from a compiled IEEE OUI (MA-L/MA-M/MA-S) table."""
+
+import array
+import bisect
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .storage import atomic_write
+
+# Vendor databases commonly installed alongside other tools; used when no
+# sources are given. IEEE's CSV registries come first so they win ties.
+DEFAULT_SOURCES = (
+    Path("/usr/share/ieee-data/oui36.csv"),
+    Path("/usr/share/ieee-data/mam.csv"),
+    Path("/usr/share/ieee-data/oui.csv"),
+    Path("/usr/share/nmap/nmap-mac-prefixes"),
+    Path("/usr/share/wireshark/manuf"),
+)
+
+PREFIX_BITS = (36, 28, 24)  # MA-S, MA-M, MA-L; looked up longest first
+
+
+def _prefix(text: str, bits: int | None = None) -> tuple[int, int] | None:
+    """Parse ``00:1B:C5``, ``00-1B-C5``, ``001BC5`` or ``00:1B:C5:00:00:00/36`` into (bits, value)."""
+    digits = text.replace(":", "").replace("-", "").replace(".", "")
+    if bits is None:
+        bits = len(digits) * 4
+    elif bits % 4 == 0:
+        digits = digits[:bits // 4]
+    if bits not in PREFIX_BITS or len(digits) * 4 != bits:
+        return None
+    try:
+        return bits, int(digits, 16)
+    except ValueError:
+        return None
+
+
+def parse_source(path: Path) -> Iterator[tuple[int, int, str]]:
+    """
+    Yield ``(prefix bits, prefix value, vendor)`` for every assignment in ``path``.
+
+    Understands IEEE's registry CSVs (oui.csv, mam.csv, oui36.csv), nmap's
+    nmap-mac-prefixes, Wireshark's manuf and the ``(hex)`` lines of IEEE's
+    oui.txt. Lines in none of these shapes are skipped.
+    """
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        first = f.readline()
+        if first.startswith("Registry,Assignment"):
+            for row in csv.reader(f):
+                if len(row) >= 3 and (entry := _prefix(row[1])) and row[2].strip():
+                    yield *entry, row[2].strip()
+            return
+
+        for line in [first, *f]:
+            line = line.split("#", 1)[0].rstrip()
+            if not line or line[0].isspace():
+                continue  # Comment, or an address continuation line in oui.txt
+            fields = [field for field in line.split("\t") if field.strip()]
+            if len(fields) < 2:
+                fields = line.split(None, 1)  # nmap-mac-prefixes: "001BC5 Vendor"
+            if len(fields) < 2:
+                continue
+            text, _, bits = fields[0].split()[0].partition("/")
+            entry = _prefix(text, int(bits) if bits.isdigit() else None)
+            if entry:
+                # manuf has a short and a long name; the long one comes last
+                yield *entry, fields[-1].strip()
+
+
+def compile_database(sources: Iterable[Path], path: Path) -> int:
+    """
+    Compile vendor sources into the lookup table at ``path``; return its entry count.
+
+    Where sources disagree about a prefix the earlier source wins. The
+    file is written with ``atomic_write``, so readers never map a partial table.
+    Raises ValueError if the sources contain no usable assignments.
+    """
+    tables: dict[int, dict[int, str]] = {bits: {} for bits in PREFIX_BITS}
+    names = []
+    for source in sources:
+        for bits, value, vendor in parse_source(Path(source)):
+            tables[bits].setdefault(value, vendor)
+        names.append(str(source))
+    count = sum(len(table) for table in tables.values())
+    if not count:
+        raise ValueError(f"No OUI assignments found in {', '.join(names) or 'any source'}")
+
+    vendor_ids: dict[str, int] = {}
+    offsets = array.array("I", [0])
+    blob = bytearray()
+    keys, ids = [], []
+    for bits in PREFIX_BITS:
+        table = tables[bits]
+        bits_keys = array.array("Q", sorted(table))
+        bits_ids = array.array("I")
+        for value in bits_keys:
+            vendor = table[value]
+            if vendor not in vendor_ids:
+                vendor_ids[vendor] = len(vendor_ids)
+                blob += vendor.encode("utf-8")
+                offsets.append(len(blob))
+            bits_ids.append(vendor_ids[vendor])
+        keys.append(bits_keys)
+        ids.append(bits_ids)
+
+    header = json.dumps({
+        "version": OuiDatabase.FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "counts": [len(k) for k in keys],
+        "vendors": len(vendor_ids),
+        "blob": len(blob),
+        "sources": names,
+    }).encode("utf-8")
+    header += b" " * (-(4 + len(header)) % 8)  # Keep the arrays 8-byte aligned
+
+    with atomic_write(Path(path), "wb") as f:
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for column in (*keys, *ids, offsets):
+            column.tofile(f)
+        f.write(blob)
+    return count
+
+
+class OuiDatabase:
+    """
+    Vendor lookup by MAC prefix from a table written by ``compile_database()``.
+
+    The file is opened on the first lookup and memory-mapped: each prefix
+    length (MA-S /36, MA-M /28, MA-L /24) has a sorted array of prefixes
+    searched with bisect, longest first, and vendor names are decoded from
+    a shared string blob only when looked up. If the file is missing, or
+    truncated or corrupt, but one of the ``sources`` exists, it is compiled
+    from them first. Without a database every lookup returns None.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: Path, sources: Iterable[Path] = DEFAULT_SOURCES) -> None:
+        self.path = Path(path)
+        self.sources = tuple(sources)
+        self._loaded = False
+        self._mmap: mmap.mmap | None = None
+        self._views: list[memoryview] = []
+        self._keys: list = []  # Per PREFIX_BITS: sorted prefixes (memoryview or array)
+        self._ids: list = []  # Per PREFIX_BITS: vendor index of each prefix
+        self._offsets = None
+        self._blob = b""
+        self._names: dict[int, str] = {}  # Decoded vendor names
+
+    def _load(self) -> None:
+        self._loaded = True
+        available = [source for source in self.sources if source.exists()]
+        if not self.path.exists():
+            if not available:
+                return
+            compile_database(available, self.path)
+        try:
+            self._map()
+        except ValueError:
+            if not available:
+                raise
+            # e.g. a table cut short by a full disk: rebuild it from the sources
+            self.close()
+            self._loaded = True
+            compile_database(available, self.path)
+            self._map()
+
+    def _map(self) -> None:
+        """Memory-map the table, checking that it is as long as its header says."""
+        with open(self.path, "rb") as f:
+            try:
+                (header_len,) = struct.unpack("<I", f.read(4))
+                header = json.loads(f.read(header_len).decode("utf-8"))
+                version = header["version"]
+            except (struct.error, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Corrupt OUI database {self.path}") from e
+            if version != self.FORMAT_VERSION:
+                raise ValueError(f"Unsupported OUI database version {version}")
+            try:
+                counts = [int(n) for n in header["counts"]]
+                size = (4 + header_len + 12 * sum(counts)
+                        + 4 * (int(header["vendors"]) + 1) + int(header["blob"]))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Corrupt OUI database {self.path}") from e
+            if len(counts) != len(PREFIX_BITS) or os.fstat(f.fileno()).st_size < size:
+                raise ValueError(f"Corrupt OUI database {self.path}: truncated")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data = memoryview(self._mmap)
+        self._views.append(data)
+        pos = 4 + header_len
+        columns = []
+        for code, size, length in (
+            *(("Q", 8, n) for n in header["counts"]),
+            *(("I", 4, n) for n in header["counts"]),
+            ("I", 4, header["vendors"] + 1),
+        ):
+            view = data[pos:pos + size * length]
+            pos += size * length
+            if header["byteorder"] == sys.byteorder:
+                column = view.cast(code)
+                self._views.extend((view, column))
+            else:
+                column = array.array(code, view.tobytes())
+                column.byteswap()
+            columns.append(column)
+        n = len(header["counts"])
+        self._keys, self._ids, self._offsets = columns[:n], columns[n:2 * n], columns[2 * n]
+        self._blob = data[pos:pos + header["blob"]]
+        self._views.append(self._blob)
+
+    def lookup(self, mac: str) -> str | None:
+        """Return the vendor registered for ``mac``'s prefix, or None."""
+        if not self._loaded:
+            self._load()
+        if not self._keys:
+            return None
+        try:
+            value = int(mac.replace(":", "").replace("-", ""), 16)
+        except ValueError:
+            return None
+        if value >> 41 & 1:
+            return None  # Locally administered (e.g. randomized): not registered to anyone
+        for bits, keys, ids in zip(PREFIX_BITS, self._keys, self._ids):
+            key = value >> (48 - bits)
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                return self._vendor(ids[i])
+        return None
+
+    def _vendor(self, index: int) -> str:
+        name = self._names.get(index)
+        if name is None:
+            raw = self._blob[self._offsets[index]:self._offsets[index + 1]]
+            name = self._names[index] = sys.intern(bytes(raw).decode("utf-8"))
+        return name
+
+    def __len__(self) -> int:
+        if not self._loaded:
+            self._load()
+        return sum(len(keys) for keys in self._keys)
+
+    def close(self) -> None:
+        """Unmap the table; the next lookup maps it again."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._keys, self._ids, self._offsets, self._blob = [], [], None, b""
+        self._names = {}
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._loaded = False
@@ -0,0 +1,218 @@
+"""Parsers that turn nmap output into host records."""
+
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+
+@dataclass
+class HostRecord:
+    """A single host reported by nmap, before it is merged into a Device."""
+    ip_address: str
+    mac_address: str
+    hostname: str | None = None
+    manufacturer: str | None = None
+    latency: float | None = None  # Round-trip time in seconds, if reported
+
+
+class NmapTextParser:
+    """
+    Incremental state-machine parser for nmap's human-readable ``-sn`` output.
+
+    Lines are fed one at a time and a HostRecord is returned as soon as the
+    ``MAC Address`` line that completes a ``Nmap scan report`` block is seen,
+    so callers can act on a host while nmap is still scanning the rest.
+    Complete output is better handed to ``parse_text()``, which finds the
+    same hosts with one regex search per host instead of a Python step
+    per line.
+    """
+
+    # Capture hostname if present
+    HOST_REGEX = re.compile(
+        r"^Nmap scan report for (?:(?P<hostname>[\w.-]+) \()?(?P<ip>\d+\.\d+\.\d+\.\d+)\)?"
+    )
+    # Capture MAC and manufacturer
+    MAC_REGEX = re.compile(
+        r"^MAC Address: (?P<mac>(?:[0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2})(?: \((?P<manufacturer>[^)]+)\))?"
+    )
+    LATENCY_REGEX = re.compile(r"^Host is up \((?P<latency>[\d.]+)s latency\)")
+    # Literal prefixes of the report and MAC lines
+    HOST_PREFIX = "Nmap scan report for "
+    MAC_PREFIX = "MAC Address: "
+
+    def __init__(self, lookahead: int = 4) -> None:
+        self.lookahead = lookahead
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ip: str | None = None
+        self._hostname: str | None = None
+        self._latency: float | None = None
+        self._remaining = 0  # Lines left in which a MAC line may still appear
+
+    def feed(self, line: str) -> HostRecord | None:
+        """Consume one line of output; return a record if it completed a host."""
+        # A prefix test rejects most lines far more cheaply than the regex
+        host_match = self.HOST_REGEX.match(line) if line.startswith(self.HOST_PREFIX) else None
+        if host_match:
+            # A new report always starts a new block, dropping any host
+            # (usually the scanning machine itself) that never got a MAC line.
+            self._ip = host_match.group('ip')
+            self._hostname = host_match.group('hostname')
+            self._latency = None
+            self._remaining = self.lookahead
+            return None
+
+        if self._ip is None:
+            return None
+
+        mac_match = self.MAC_REGEX.match(line) if line.startswith(self.MAC_PREFIX) else None
+        if mac_match:
+            record = HostRecord(
+                ip_address=self._ip,
+                # Lowercased once here; Device keeps canonical MACs as they are
+                mac_address=mac_match.group('mac').lower(),
+                hostname=self._hostname,
+                manufacturer=mac_match.group('manufacturer'),
+                latency=self._latency,
+            )
+            self._reset()
+            return record
+
+        latency_match = self.LATENCY_REGEX.match(line)
+        if latency_match:
+            self._latency = float(latency_match.group('latency'))
+
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self._reset()
+        return None
+
+    def parse(self, lines: Iterable[str]) -> Iterator[HostRecord]:
+        """Yield a record for every completed host in ``lines``."""
+        for line in lines:
+            record = self.feed(line)
+            if record is not None:
+                yield record
+
+    def parse_text(self, text: str) -> Iterator[HostRecord]:
+        """
+        Yield a record for every completed host in the complete output ``text``.
+
+        Finds the same hosts as ``parse(text.splitlines())``: each host block
+        (report line, up to ``lookahead - 1`` other lines, MAC line) is
+        matched by a single regex search, so the lines in between never
+        reach Python code.
+        """
+        for match in _host_block_regex(self.lookahead).finditer(text):
+            ip, hostname, latency, mac, manufacturer = match.group(
+                'ip', 'hostname', 'latency', 'mac', 'manufacturer'
+            )
+            yield HostRecord(ip, mac.lower(), hostname, manufacturer, float(latency) if latency else None)
+
+
+@lru_cache(maxsize=8)
+def _host_block_regex(lookahead: int) -> re.Pattern:
+    """One regex for a whole host block of nmap text output, built from the line regexes."""
+    host, mac, latency = (r.pattern.removeprefix("^") for r in (
+        NmapTextParser.HOST_REGEX, NmapTextParser.MAC_REGEX, NmapTextParser.LATENCY_REGEX
+    ))
+    # A line in between may be anything except another report or a MAC
+    # line, either of which ends the block in feed(). Lines with neither
+    # prefix are let through before trying the full patterns.
+    named_group = re.compile(r"\(\?P<\w+>")
+    prefixes = "|".join(re.escape(p) for p in (NmapTextParser.HOST_PREFIX, NmapTextParser.MAC_PREFIX))
+    other = rf"(?!{prefixes}).*|(?!{named_group.sub('(?:', host)})(?!{named_group.sub('(?:', mac)}).*"
+    return re.compile(
+        rf"^{host}.*\n(?:(?:{latency}.*|{other})\n){{0,{max(lookahead - 1, 0)}}}?{mac}",
+        re.MULTILINE,
+    )
+
+
+class NmapXmlParser:
+    """
+    Incremental parser for nmap's XML output (``-oX -``).
+
+    Uses a pull parser so output can be fed in arbitrary chunks as nmap
+    writes it; each ``<host>`` element is turned into a HostRecord and then
+    discarded, keeping memory constant regardless of the number of hosts.
+    """
+
+    def __init__(self) -> None:
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: ET.Element | None = None
+
+    def feed(self, data: str) -> list[HostRecord]:
+        """Consume a chunk of XML; return records for hosts it completed."""
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> list[HostRecord]:
+        """Signal end of input and return any remaining records."""
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> list[HostRecord]:
+        records = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+            if elem.tag != "host":
+                continue
+            record = self._host_record(elem)
+            if record is not None:
+                records.append(record)
+            elem.clear()
+        # Detach everything parsed so far so the tree never grows; the parser
+        # keeps its own reference to an element that is still being built.
+        if self._root is not None:
+            del self._root[:]
+        return records
+
+    @staticmethod
+    def _host_record(host: ET.Element) -> HostRecord | None:
+        status = host.find("status")
+        if status is not None and status.get("state") != "up":
+            return None
+
+        ip = mac = manufacturer = None
+        for address in host.iterfind("address"):
+            addrtype = address.get("addrtype")
+            if addrtype == "ipv4":
+                ip = address.get("addr")
+            elif addrtype == "mac":
+                mac = address.get("addr")
+                manufacturer = address.get("vendor")
+        if not ip or not mac:
+            return None
+
+        hostname_elem = host.find("hostnames/hostname")
+        hostname = hostname_elem.get("name") if hostname_elem is not None else None
+
+        latency = None
+        times = host.find("times")
+        if times is not None and times.get("srtt"):
+            latency = int(times.get("srtt")) / 1_000_000  # srtt is in microseconds
+
+        return HostRecord(
+            ip_address=ip,
+            mac_address=mac.lower(),
+            hostname=hostname,
+            manufacturer=manufacturer,
+            latency=latency,
+        )
+
+    def parse(self, lines: Iterable[str]) -> Iterator[HostRecord]:
+        """Yield a record for every up host with a MAC address in ``lines``."""
+        for line in lines:
+            yield from self.feed(line + "\n")
+        yield from self.close()
+
+    def parse_text(self, text: str) -> Iterator[HostRecord]:
+        """Yield a record for every up host with a MAC address in the complete output ``text``."""
+        yield from self.feed(text)
+        yield from self.close()
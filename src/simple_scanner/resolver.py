@@ -0,0 +1,322 @@
+"""Concurrent hostname resolution (reverse DNS, mDNS, NetBIOS) with a TTL cache."""
+
+import asyncio
+import ipaddress
+import random
+import socket
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+RESOLV_CONF = Path("/etc/resolv.conf")
+
+QTYPE_PTR = 12
+QTYPE_NBSTAT = 0x21
+QCLASS_IN = 1
+NB_GROUP = 0x8000  # NetBIOS name flag: group rather than unique name
+NB_WORKSTATION = 0x00  # NetBIOS name suffix of the machine name
+
+
+def read_nameserver(path: Path = RESOLV_CONF) -> str | None:
+    """Return the first IPv4 nameserver in resolv.conf, if any."""
+    try:
+        with open(path, "r", encoding="ascii", errors="replace") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    try:
+                        return str(ipaddress.IPv4Address(fields[1]))
+                    except ValueError:
+                        continue  # IPv6 nameserver
+    except FileNotFoundError:
+        pass  # Not Unix; use the system resolver
+    return None
+
+
+def _encode_name(name: str) -> bytes:
+    labels = [label.encode("ascii") for label in name.rstrip(".").split(".")]
+    return b"".join(bytes([len(label)]) + label for label in labels) + b"\0"
+
+
+def _read_name(data: bytes, pos: int) -> tuple[str, int]:
+    """Decode a possibly compressed DNS name at ``pos``; return it and the offset after it."""
+    labels = []
+    end = None
+    for _ in range(128):  # Bounds compression loops in hostile packets
+        length = data[pos]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = pos + 2
+            pos = (length & 0x3F) << 8 | data[pos + 1]
+            continue
+        pos += 1
+        if length == 0:
+            return ".".join(labels), pos if end is None else end
+        labels.append(data[pos:pos + length].decode("utf-8", errors="replace"))
+        pos += length
+    raise ValueError("DNS name compression loop")
+
+
+def build_ptr_query(query_id: int, ip: str) -> bytes:
+    """A recursive PTR query for the reverse name of ``ip``."""
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    name = ipaddress.ip_address(ip).reverse_pointer
+    return header + _encode_name(name) + struct.pack("!HH", QTYPE_PTR, QCLASS_IN)
+
+
+def parse_ptr_response(data: bytes, query_id: int) -> str | None:
+    """
+    Return the host name from a PTR response, or None if it has no answer.
+
+    Raises ValueError for packets that aren't a response to ``query_id``.
+    """
+    try:
+        qid, flags, qdcount, ancount = struct.unpack_from("!HHHH", data)
+        if qid != query_id or not flags & 0x8000:
+            raise ValueError("Not a response to this query")
+        if flags & 0x000F:
+            return None  # NXDOMAIN, SERVFAIL, ...
+        pos = 12
+        for _ in range(qdcount):
+            pos = _read_name(data, pos)[1] + 4
+        for _ in range(ancount):
+            pos = _read_name(data, pos)[1]
+            rtype, _, _, rdlength = struct.unpack_from("!HHIH", data, pos)
+            pos += 10
+            if rtype == QTYPE_PTR:
+                return _read_name(data, pos)[0] or None
+            pos += rdlength
+    except (IndexError, struct.error) as e:
+        raise ValueError("Truncated DNS response") from e
+    return None
+
+
+def build_nbstat_query(query_id: int) -> bytes:
+    """A NetBIOS node status request for the wildcard name ``*``."""
+    raw = b"*" + b"\0" * 15
+    # First-level encoding: each nibble becomes a letter from 'A'
+    encoded = bytes(c for b in raw for c in (0x41 + (b >> 4), 0x41 + (b & 0x0F)))
+    header = struct.pack("!HHHHHH", query_id, 0, 1, 0, 0, 0)
+    return header + bytes([len(encoded)]) + encoded + b"\0" + struct.pack("!HH", QTYPE_NBSTAT, QCLASS_IN)
+
+
+def parse_nbstat_response(data: bytes, query_id: int) -> str | None:
+    """
+    Return the machine name from a node status response, or None if it has none.
+
+    Raises ValueError for packets that aren't a response to ``query_id``.
+    """
+    try:
+        qid, flags, qdcount, ancount = struct.unpack_from("!HHHH", data)
+        if qid != query_id or not flags & 0x8000:
+            raise ValueError("Not a response to this query")
+        pos = 12
+        for _ in range(qdcount):
+            pos = _read_name(data, pos)[1] + 4
+        if not ancount:
+            return None
+        pos = _read_name(data, pos)[1]
+        rtype = struct.unpack_from("!H", data, pos)[0]
+        pos += 10
+        if rtype != QTYPE_NBSTAT:
+            return None
+        count = data[pos]
+        pos += 1
+        for _ in range(count):
+            name, suffix, name_flags = struct.unpack_from("!15sBH", data, pos)
+            pos += 18
+            if suffix == NB_WORKSTATION and not name_flags & NB_GROUP:
+                return name.decode("ascii", errors="replace").strip() or None
+    except (IndexError, struct.error) as e:
+        raise ValueError("Truncated NetBIOS response") from e
+    return None
+
+
+class HostnameCache:
+    """
+    Resolved hostnames keyed by (IP, MAC), each kept for a limited time.
+
+    Keying on both means a device that moves to another address, or an
+    address handed to another device, is resolved again. Failed lookups are
+    cached too, for ``negative_ttl`` seconds, so silent hosts aren't asked
+    on every scan. Beyond ``max_entries`` the oldest entries are dropped.
+    """
+
+    def __init__(self, ttl: float = 3600, negative_ttl: float = 300, max_entries: int = 65536) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: dict[tuple[str, str], tuple[str | None, float]] = {}
+
+    def get(self, ip: str, mac: str, now: float | None = None) -> tuple[bool, str | None]:
+        """Return ``(True, hostname or None)`` for a fresh entry, ``(False, None)`` otherwise."""
+        entry = self._entries.get((ip, mac))
+        if entry is None:
+            return False, None
+        hostname, expires = entry
+        if expires <= (time.monotonic() if now is None else now):
+            del self._entries[(ip, mac)]
+            return False, None
+        return True, hostname
+
+    def put(self, ip: str, mac: str, hostname: str | None, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        key = (ip, mac)
+        self._entries.pop(key, None)  # Re-insert so dict order is age order
+        self._entries[key] = (hostname, now + (self.ttl if hostname else self.negative_ttl))
+        if len(self._entries) > self.max_entries:
+            self.prune(now)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def prune(self, now: float | None = None) -> None:
+        """Drop expired entries."""
+        now = time.monotonic() if now is None else now
+        for key in [k for k, (_, expires) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Reply(asyncio.DatagramProtocol):
+    """Completes ``answer`` with the first datagram ``parse`` accepts."""
+
+    def __init__(self, answer: asyncio.Future, parse: Callable[[bytes], str | None]) -> None:
+        self.answer = answer
+        self.parse = parse
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            result = self.parse(data)
+        except ValueError:
+            return  # Stray or malformed packet; keep waiting
+        if not self.answer.done():
+            self.answer.set_result(result)
+
+    def error_received(self, exc: Exception) -> None:
+        # e.g. ICMP port unreachable: nothing is listening
+        if not self.answer.done():
+            self.answer.set_result(None)
+
+
+class HostnameResolver:
+    """
+    Resolves hostnames for many hosts at once, outside of nmap.
+
+    Each host is asked concurrently by reverse DNS (a PTR query to the
+    system nameserver), unicast mDNS (the same query sent to the host's
+    port 5353, answered by Apple, Avahi and most IoT devices) and NetBIOS
+    node status (port 137, answered by Windows and Samba); the first
+    method in ``methods`` order that knows a name wins. Up to
+    ``concurrency`` hosts are resolved at a time, and results are kept in
+    a HostnameCache so unchanged hosts aren't asked again on every scan.
+    """
+
+    METHODS = ("dns", "mdns", "netbios")
+    DNS_PORT = 53
+    MDNS_PORT = 5353
+    NETBIOS_PORT = 137
+
+    def __init__(
+        self,
+        methods: Iterable[str] = METHODS,
+        nameserver: str | None = None,
+        timeout: float = 1.0,
+        concurrency: int = 64,
+        cache: HostnameCache | None = None,
+        verbose: bool = False,
+    ) -> None:
+        methods = tuple(methods)
+        for method in methods:
+            if method not in self.METHODS:
+                raise ValueError(f"Unknown resolution method {method!r}; expected one of {', '.join(self.METHODS)}")
+        self.methods = methods
+        # None: the first resolv.conf nameserver, else the system resolver
+        self.nameserver = nameserver or read_nameserver()
+        self.timeout = timeout  # Seconds to wait for each method's reply
+        self.concurrency = concurrency
+        self.cache = cache if cache is not None else HostnameCache()
+        self.verbose = verbose
+
+    def resolve(self, hosts: Iterable[tuple[str, str]]) -> dict[str, str]:
+        """Resolve ``(ip, mac)`` pairs and return ``{mac: hostname}`` for those with a name."""
+        return asyncio.run(self.resolve_async(hosts))
+
+    async def resolve_async(self, hosts: Iterable[tuple[str, str]]) -> dict[str, str]:
+        hostnames: dict[str, str] = {}
+        pending = []
+        for ip, mac in dict.fromkeys(hosts):
+            hit, hostname = self.cache.get(ip, mac)
+            if not hit:
+                pending.append((ip, mac))
+            elif hostname:
+                hostnames[mac] = hostname
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def resolve_one(ip: str, mac: str) -> None:
+            async with semaphore:
+                hostname = await self._resolve_host(ip)
+            self.cache.put(ip, mac, hostname)
+            if hostname:
+                hostnames[mac] = hostname
+
+        await asyncio.gather(*(resolve_one(ip, mac) for ip, mac in pending))
+        if self.verbose and pending:
+            print(f"Resolved {sum(mac in hostnames for _, mac in pending)} of {len(pending)} new hostnames")
+        return hostnames
+
+    async def _resolve_host(self, ip: str) -> str | None:
+        lookups = {"dns": self._dns, "mdns": self._mdns, "netbios": self._netbios}
+        names = await asyncio.gather(*(lookups[method](ip) for method in self.methods))
+        return next((name for name in names if name), None)
+
+    async def _dns(self, ip: str) -> str | None:
+        if self.nameserver is None:
+            loop = asyncio.get_running_loop()
+            try:
+                hostname, _ = await asyncio.wait_for(
+                    loop.getnameinfo((ip, 0), socket.NI_NAMEREQD), self.timeout
+                )
+            except (OSError, asyncio.TimeoutError):
+                return None
+            return hostname
+        return await self._ptr((self.nameserver, self.DNS_PORT), ip)
+
+    async def _mdns(self, ip: str) -> str | None:
+        return await self._ptr((ip, self.MDNS_PORT), ip)
+
+    async def _ptr(self, server: tuple[str, int], ip: str) -> str | None:
+        query_id = random.getrandbits(16)
+        return await self._query(
+            server, build_ptr_query(query_id, ip), lambda data: parse_ptr_response(data, query_id)
+        )
+
+    async def _netbios(self, ip: str) -> str | None:
+        query_id = random.getrandbits(16)
+        return await self._query(
+            (ip, self.NETBIOS_PORT), build_nbstat_query(query_id),
+            lambda data: parse_nbstat_response(data, query_id),
+        )
+
+    async def _query(
+        self, address: tuple[str, int], payload: bytes, parse: Callable[[bytes], str | None]
+    ) -> str | None:
+        """Send one UDP request to ``address`` and return the parsed reply, or None."""
+        loop = asyncio.get_running_loop()
+        answer = loop.create_future()
+        try:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _Reply(answer, parse), remote_addr=address
+            )
+        except OSError:
+            return None  # e.g. network unreachable
+        try:
+            transport.sendto(payload)
+            return await asyncio.wait_for(answer, self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            transport.close()
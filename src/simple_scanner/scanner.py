@@ -1,13 +1,37 @@
 import subprocess
 import datetime
-import re
 import socket
 import ipaddress
 import shutil
 import json
 import os
+import threading
+import copy
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 from .models import Device
+from .events import (
+    DeviceEvent,
+    DeviceJoined,
+    DeviceLeft,
+    HostnameChanged,
+    IpChanged,
+    VendorChanged,
+)
+from .export import export_devices
+from .history import SightingHistory
+from .neighbors import NeighborWatcher, read_neighbors
+from .oui import OuiDatabase
+from .parsers import HostRecord, NmapTextParser, NmapXmlParser
+from .resolver import HostnameResolver
+from .search import DeviceSearchIndex
+from .sweep import SweepEngine, connected_networks
+from .storage import FSYNC_POLICIES, BackgroundWriter, JsonDeviceStore, LazyDeviceMap, SQLiteDeviceStore
+
+UNKNOWN_VENDOR = "Unknown"  # nmap's vendor for prefixes missing from its own table
 
 
 def get_user_data_dir() -> Path:
@@ -27,6 +51,21 @@ def get_core_data_file() -> Path:
     return get_user_data_dir() / 'devices.json'
 
 
+def get_database_file() -> Path:
+    """Get the path to the SQLite device database."""
+    return get_user_data_dir() / 'devices.db'
+
+
+def get_history_file() -> Path:
+    """Get the path to the sighting history file."""
+    return get_user_data_dir() / 'history.bin'
+
+
+def get_oui_file() -> Path:
+    """Get the path to the compiled MAC vendor (OUI) table."""
+    return get_user_data_dir() / 'oui.bin'
+
+
 def autodetect_network() -> str:
     """
     Return the most likely 'home‑LAN' /24 network, skipping
@@ -63,21 +102,75 @@ def autodetect_network() -> str:
     best_ip = max(ips, key=score)
     return str(ipaddress.ip_network(f"{best_ip}/24", strict=False))
 
+
+def autodetect_networks() -> list[str]:
+    """
+    Return the subnets of every local interface, for monitoring all of them.
+
+    Reads the directly connected routes (Linux) and skips loopback,
+    link-local and VirtualBox host-only ranges; elsewhere falls back to the
+    single network from autodetect_network().
+    """
+    networks = []
+    for _, network in connected_networks():
+        first = network.split("/")[0]
+        if first.startswith(("127.", "169.254.", "192.168.56.")) or network in networks:
+            continue
+        networks.append(network)
+    return networks or [autodetect_network()]
+
+
+def split_targets(network: str) -> list[str]:
+    """Split a comma or whitespace separated target string into nmap targets."""
+    return network.replace(",", " ").split()
+
+
+@lru_cache(maxsize=64)
+def _parse_targets(network: str) -> tuple[tuple[str, ipaddress.IPv4Network | ipaddress.IPv6Network | None], ...]:
+    """Pair each target with its parsed network (None for hostnames and nmap ranges)."""
+    parsed = []
+    for target in split_targets(network):
+        try:
+            parsed.append((target, ipaddress.ip_network(target, strict=False)))
+        except ValueError:
+            parsed.append((target, None))
+    return tuple(parsed)
+
+
+def shard_network(network: str, prefix: int = 24) -> list[str]:
+    """
+    Split the targets in ``network`` into sub-networks no larger than /prefix.
+
+    Targets nmap understands but that are not plain CIDRs (hostnames,
+    ranges like ``10.0.0.1-50``) are passed through unsplit.
+    """
+    shards: list[str] = []
+    for target in split_targets(network):
+        try:
+            net = ipaddress.ip_network(target, strict=False)
+        except ValueError:
+            shards.append(target)
+            continue
+        if net.version == 4 and net.prefixlen < prefix:
+            shards.extend(str(sub) for sub in net.subnets(new_prefix=prefix))
+        else:
+            shards.append(str(net))
+    return shards
+
 class NetworkMonitor:
     """Scans the network using nmap and tracks devices."""
     
     # Constants
     MAC_LOOKAHEAD_LINES = 4  # How many lines to look ahead for MAC address
     NMAP_TIMEOUT_SECONDS = 300  # 5 minute timeout for nmap scans
+    PARSERS = ("text", "xml")  # Supported nmap output parsers
+    BACKENDS = ("json", "sqlite")  # Supported persistence backends
+    ENGINES = ("nmap", "sweep")  # nmap subprocess or the in-process SweepEngine
+    HISTORY_SAVE_SECONDS = 600  # Minimum interval between sighting history saves
 
-    # Updated regex to capture hostname if present
-    HOST_REGEX = re.compile(
-        r"^Nmap scan report for (?:(?P<hostname>[\w.-]+) \()?(?P<ip>\d+\.\d+\.\d+\.\d+)\)?"
-    )
-    # Updated regex to capture MAC and manufacturer
-    MAC_REGEX = re.compile(
-        r"^MAC Address: (?P<mac>(?:[0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2})(?: \((?P<manufacturer>[^)]+)\))?"
-    )
+    # Regexes live on the parser; kept here for backwards compatibility
+    HOST_REGEX = NmapTextParser.HOST_REGEX
+    MAC_REGEX = NmapTextParser.MAC_REGEX
 
     def __init__(
         self,
@@ -85,16 +178,73 @@ class NetworkMonitor:
         remove_stale: bool = False,
         verbose: bool = False,
         use_persistence: bool = True,
+        max_workers: int = 1,
+        shard_prefix: int = 24,
+        parser: str = "text",
+        backend: str = "json",
+        track_history: bool = False,
+        engine: str = "nmap",
+        mac_lookup: bool = False,
+        resolve_hostnames: bool = False,
+        save_interval: float | None = None,
+        fsync: str = "snapshot",
     ) -> None:
+        if parser not in self.PARSERS:
+            raise ValueError(f"Unknown parser {parser!r}; expected one of {', '.join(self.PARSERS)}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {', '.join(self.BACKENDS)}")
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(self.ENGINES)}")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}; expected one of {', '.join(FSYNC_POLICIES)}")
         self.network = network or autodetect_network()
         self.remove_stale = remove_stale
         self.verbose = verbose
         self.use_persistence = use_persistence
-        self._devices: dict[str, Device] = {}
+        self.max_workers = max_workers  # Concurrent nmap processes for sharded scans
+        self.shard_prefix = shard_prefix
+        self.parser = parser
+        self.backend = backend
+        self.engine = engine
+        # Settings for engine="sweep" (method, concurrency, rate, timeout)
+        self.sweeper = SweepEngine(verbose=verbose)
+        # Fill in vendors nmap didn't report from the offline OUI table
+        self.mac_lookup = mac_lookup
+        self._oui: OuiDatabase | None = None
+        # Resolve hostnames concurrently after each scan instead of by
+        # nmap's serial reverse DNS (settings: methods, timeout, cache TTLs)
+        self.resolve_hostnames = resolve_hostnames
+        self.resolver = HostnameResolver(verbose=verbose)
+        self._devices: dict[str, Device] | LazyDeviceMap = {}
+        self._store: JsonDeviceStore | SQLiteDeviceStore | None = None
+        # Seconds between saves by a background writer; None saves after every scan
+        self.save_interval = save_interval
+        self.fsync = fsync  # One of storage.FSYNC_POLICIES
+        self._writer: BackgroundWriter | None = None
+        # Changes not yet written to the store
+        self._dirty: set[str] = set()
+        self._removed: set[str] = set()
+        # Per-scan sightings, when enabled
+        self.history: SightingHistory | None = SightingHistory() if track_history else None
+        self._history_saved_at: datetime.datetime | None = None
+        # Change events: MACs seen in the previous scan, subscribers and this scan's events
+        self._present: set[str] = set()
+        self._subscribers: list[Callable[[DeviceEvent], None]] = []
+        self.last_events: list[DeviceEvent] = []
+        # Scans of several networks can overlap: each collects its own events
+        # (the sink, swapped in while it holds the lock) and publishes them
+        # when it finishes
+        self._event_sink: list[DeviceEvent] | None = None
+        self._scans_running = 0
+        # Built on first search, then kept current by scans
+        self._search_index: DeviceSearchIndex | None = None
+        # Guards device state while a scan thread merges results and other
+        # threads (e.g. the GUI) read it
+        self._lock = threading.RLock()
 
         # Locate nmap executable
         self._nmap_path = shutil.which('nmap')
-        if not self._nmap_path:
+        if not self._nmap_path and engine == "nmap":
             raise RuntimeError(
                 "nmap not found. Please install nmap and ensure it's in your PATH."
             )
@@ -102,10 +252,25 @@ class NetworkMonitor:
         # Load existing device data if persistence is enabled
         if self.use_persistence:
             self._load_existing_data()
+            if self.history is not None:
+                self._load_history()
 
-    def _run_command(self) -> str:
+    def _nmap_args(self) -> list[str]:
+        """Return the nmap options for the configured parser and hostname resolution."""
+        args = ['-sn', '-n'] if self.resolve_hostnames else ['-sn']
+        if self.parser == "xml":
+            args += ['-oX', '-']
+        return args
+
+    def _make_parser(self) -> NmapTextParser | NmapXmlParser:
+        """Create a fresh parser matching the nmap output format."""
+        if self.parser == "xml":
+            return NmapXmlParser()
+        return NmapTextParser(lookahead=self.MAC_LOOKAHEAD_LINES)
+
+    def _run_command(self, target: str | None = None) -> str:
         """Run nmap ping scan on the target network and return its output."""
-        cmd = [self._nmap_path, '-sn', self.network]
+        cmd = [self._nmap_path, *self._nmap_args(), *split_targets(target or self.network)]
         try:
             result = subprocess.run(
                 cmd, 
@@ -126,126 +291,640 @@ class NetworkMonitor:
             raise RuntimeError(f"Nmap scan failed (exit code {result.returncode}): {error_msg}")
         return result.stdout
 
+    def _get_store(self) -> JsonDeviceStore | SQLiteDeviceStore:
+        """Return the persistence store, creating it on first use."""
+        if self._store is None:
+            if self.backend == "sqlite":
+                self._store = SQLiteDeviceStore(get_database_file(), fsync=self.fsync)
+            else:
+                self._store = JsonDeviceStore(get_core_data_file(), fsync=self.fsync)
+        return self._store
+
     def _load_existing_data(self) -> None:
-        """Load existing device data from the core data file if it exists."""
-        core_file = get_core_data_file()
-        if not core_file.exists():
+        """
+        Open the device store; devices are read from it as scans touch them.
+
+        Neither backend parses the inventory up front: the SQLite database is
+        queried per device and the JSON snapshot is read through its MAC index
+        (snapshot plus journal), so startup doesn't grow with the inventory.
+        """
+        store = self._get_store()
+        if isinstance(store, SQLiteDeviceStore):
+            self._devices = LazyDeviceMap(store)
+            self._import_json_inventory(store)
             return
-        
+
         try:
-            with open(core_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            for device_data in data:
-                mac = device_data['mac_address'].lower()
-                ip = device_data['ip_address']
-                hostname = device_data.get('hostname')  # May not exist in old data
-                manufacturer = device_data.get('manufacturer')  # May not exist in old data
-                date_added = datetime.datetime.fromisoformat(device_data['date_added'])
-                last_seen = datetime.datetime.fromisoformat(device_data['last_seen'])
-                
-                self._devices[mac] = Device(
-                    mac_address=mac,
-                    ip_address=ip,
-                    hostname=hostname,
-                    manufacturer=manufacturer,
-                    date_added=date_added,
-                    last_seen=last_seen
-                )
-                
+            store.open()
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            # Keep the unreadable file rather than overwriting it on the next save
+            moved = store.quarantine()
+            store.open()
             if self.verbose:
-                print(f"Loaded {len(self._devices)} existing devices from {core_file}")
-                
+                print(f"Warning: Could not load existing data from {store.path}: {e}")
+                if moved is not None:
+                    print(f"Moved it aside to {moved}")
+        self._devices = LazyDeviceMap(store)
+        if self.verbose and store.path.exists():
+            print(f"Opened existing devices from {store.path}")
+
+    def _import_json_inventory(self, store: SQLiteDeviceStore) -> None:
+        """Seed an empty database from the JSON inventory, if there is one."""
+        if store.count():
+            return
+        try:
+            devices = JsonDeviceStore(get_core_data_file()).load()
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             if self.verbose:
-                print(f"Warning: Could not load existing data from {core_file}: {e}")
+                print(f"Warning: Could not import existing JSON data: {e}")
+            return
+        if devices:
+            store.save(devices, devices.keys())
+            if self.verbose:
+                print(f"Imported {len(devices)} devices into {store.path}")
 
     def _save_core_data(self) -> None:
-        """Save current device data to the core data file."""
+        """Persist devices changed since the last save to the core data file."""
         if not self.use_persistence:
             return
             
-        core_file = get_core_data_file()
-        # Ensure parent directory exists
-        core_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        data = [d.to_dict() for d in self.devices()]
-        
+        store = self._get_store()
         try:
-            with open(core_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            store.save(self._devices, self._dirty, self._removed)
         except (OSError, IOError) as e:
+            # Keep the pending changes so the next save retries them
             if self.verbose:
-                print(f"Warning: Could not save core data to {core_file}: {e}")
+                print(f"Warning: Could not save core data to {store.path}: {e}")
+            return
+        self._dirty.clear()
+        self._removed.clear()
 
-    def _parse(self, raw: str) -> None:
-        now = datetime.datetime.now(datetime.timezone.utc)
-        seen_macs = set()
-        lines = raw.splitlines()
+    def _request_save(self) -> None:
+        """Save now, or let the background writer save once save_interval allows."""
+        if self.save_interval is None:
+            self._save_core_data()
+            return
+        if self._writer is None:
+            self._writer = BackgroundWriter(self._save_in_background, self.save_interval,
+                                            name="device-store-writer")
+        self._writer.interval = self.save_interval
+        self._writer.request()
 
-        for i, line in enumerate(lines):
-            host_match = self.HOST_REGEX.match(line)
-            if not host_match:
-                continue
-            ip = host_match.group('ip')
-            hostname = host_match.group('hostname')  # May be None
-            mac: str | None = None
-            manufacturer: str | None = None
-
-            # Look ahead for MAC Address line
-            for j in range(i+1, min(i+1+self.MAC_LOOKAHEAD_LINES, len(lines))):
-                mac_match = self.MAC_REGEX.match(lines[j])
-                if mac_match:
-                    mac = mac_match.group('mac').lower()
-                    manufacturer = mac_match.group('manufacturer')  # May be None
-                    break
-
-            if not mac:
+    def _save_in_background(self) -> None:
+        with self._lock:
+            self._save_core_data()
+
+    def flush(self) -> None:
+        """Write any changes the background writer hasn't saved yet, and wait for it."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        """Save pending changes and the sighting history and stop the background writer."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.use_persistence and (self._dirty or self._removed):
+            with self._lock:
+                self._save_core_data()
+        self.save_history()
+
+    def _load_history(self) -> None:
+        """Load the saved sighting history if it exists."""
+        path = get_history_file()
+        if not path.exists():
+            return
+        try:
+            self.history = SightingHistory.load(path)
+        except (OSError, EOFError, ValueError, KeyError) as e:
+            if self.verbose:
+                print(f"Warning: Could not load sighting history from {path}: {e}")
+
+    def save_history(self) -> None:
+        """Write the sighting history to disk."""
+        if self.history is None or not self.use_persistence:
+            return
+        path = get_history_file()
+        try:
+            self.history.save(path, fsync=self.fsync != "never")
+        except OSError as e:
+            if self.verbose:
+                print(f"Warning: Could not save sighting history to {path}: {e}")
+
+    def _record_history(self, now: datetime.datetime, records: list[HostRecord]) -> None:
+        """Add one scan's sightings and save the history at most every HISTORY_SAVE_SECONDS."""
+        try:
+            self.history.record_scan(now, records)
+        except ValueError as e:
+            # The clock stepped back (e.g. NTP); the devices were already updated
+            if self.verbose:
+                print(f"Warning: Scan not added to the sighting history: {e}")
+            return
+        if (
+            self._history_saved_at is None
+            or (now - self._history_saved_at).total_seconds() >= self.HISTORY_SAVE_SECONDS
+        ):
+            self.save_history()
+            self._history_saved_at = now
+
+    def _stream_command(self) -> Iterator[str]:
+        """Run nmap ping scan and yield its output line by line as it arrives."""
+        cmd = [self._nmap_path, *self._nmap_args(), *split_targets(self.network)]
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError(f"Nmap executable not found: {self._nmap_path}") from e
+        except PermissionError as e:
+            raise RuntimeError(f"Permission denied running nmap: {self._nmap_path}") from e
+
+        # Reading stdout blocks, so enforce the timeout by killing the process
+        timed_out = threading.Event()
+
+        def _kill() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(self.NMAP_TIMEOUT_SECONDS, _kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            for line in proc.stdout:
+                yield line.rstrip('\n')
+            stderr = proc.stderr.read()
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            proc.stderr.close()
+
+        if timed_out.is_set():
+            raise RuntimeError(f"Nmap scan timed out after {self.NMAP_TIMEOUT_SECONDS} seconds")
+        if returncode != 0:
+            error_msg = stderr.strip() if stderr else "Unknown error"
+            raise RuntimeError(f"Nmap scan failed (exit code {returncode}): {error_msg}")
+
+    def subscribe(self, callback: Callable[[DeviceEvent], None]) -> None:
+        """Call ``callback`` with every change event as scans detect it."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[DeviceEvent], None]) -> None:
+        """Stop sending change events to ``callback``."""
+        self._subscribers.remove(callback)
+
+    def events(self) -> Iterator[DeviceEvent]:
+        """Iterate over the change events produced by the most recent scan."""
+        return iter(self.last_events)
+
+    def _emit(self, event: DeviceEvent) -> None:
+        (self.last_events if self._event_sink is None else self._event_sink).append(event)
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                # A broken subscriber must not abort the scan or its save
+                if self.verbose:
+                    print(f"Warning: Event subscriber failed on {type(event).__name__}: {e}")
+
+    def _network_of(self, ip: str, scope: str | None = None) -> str:
+        """Return the monitored network (target) ``ip`` belongs to, for tagging devices."""
+        network = scope or self.network
+        targets = _parse_targets(network)
+        if len(targets) == 1:
+            return targets[0][0]
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return network
+        for target, net in targets:
+            if net is not None and address in net:
+                return target
+        return network
+
+    def _in_scope(self, device: Device, scope: str) -> bool:
+        """True if ``device`` belongs to the part of the network a scan covered."""
+        if device.network == scope:
+            return True
+        try:
+            address = ipaddress.ip_address(device.ip_address)
+        except ValueError:
+            return False
+        return any(net is not None and address in net for _, net in _parse_targets(scope))
+
+    def _lookup_vendor(self, mac: str) -> str | None:
+        """Vendor of ``mac`` from the OUI table, if lookups are enabled and it is known."""
+        if not self.mac_lookup:
+            return None
+        if self._oui is None:
+            self._oui = OuiDatabase(get_oui_file())
+        try:
+            return self._oui.lookup(mac)
+        except (OSError, ValueError) as e:
+            # Unreadable table: stop trying for the rest of this session
+            if self.verbose:
+                print(f"Warning: MAC vendor lookup disabled: {e}")
+            self.mac_lookup = False
+            return None
+
+    def _upsert(self, record: HostRecord, now: datetime.datetime, scope: str | None = None) -> Device:
+        """Merge one parsed host into the tracked devices, emit its changes and return it."""
+        mac = record.mac_address
+        self._dirty.add(mac)
+        device = self._devices.get(mac)
+        network = self._network_of(record.ip_address, scope)
+        manufacturer = record.manufacturer
+        if manufacturer in (None, UNKNOWN_VENDOR) and (device is None or device.manufacturer in (None, UNKNOWN_VENDOR)):
+            manufacturer = self._lookup_vendor(mac) or manufacturer
+        if device is not None:
+            device.network = network
+            old_ip, old_hostname, old_manufacturer = device.ip_address, device.hostname, device.manufacturer
+            # Update existing device - preserve original date_added
+            device.update_last_seen(now)
+            # Update IP in case it changed (DHCP)
+            device.update_ip_address(record.ip_address)
+            # Update hostname if found
+            if record.hostname:
+                device.update_hostname(record.hostname)
+            # Update manufacturer if found
+            if manufacturer:
+                device.update_manufacturer(manufacturer)
+
+            if mac not in self._present:
+                self._present.add(mac)
+                self._emit(DeviceJoined(device, now))
+            if device.ip_address != old_ip:
+                self._emit(IpChanged(device, now, old_ip, device.ip_address))
+            if device.hostname != old_hostname:
+                self._emit(HostnameChanged(device, now, old_hostname, device.hostname))
+            if device.manufacturer != old_manufacturer:
+                self._emit(VendorChanged(device, now, old_manufacturer, device.manufacturer))
+        else:
+            # New device - set both timestamps to now
+            device = Device(
+                mac_address=mac,
+                ip_address=record.ip_address,
+                hostname=record.hostname,
+                manufacturer=manufacturer,
+                date_added=now,
+                last_seen=now,
+                network=network,
+            )
+            self._devices[mac] = device
+            self._present.add(mac)
+            self._emit(DeviceJoined(device, now, first_seen=True))
+        if self._search_index is not None:
+            self._search_index.update(device)
+        return device
+
+    def _unnamed(self, record: HostRecord) -> bool:
+        """True if ``record`` should get its hostname from the resolution stage."""
+        return self.resolve_hostnames and not record.hostname
+
+    def _apply_hostnames(self, hostnames: dict[str, str], now: datetime.datetime) -> None:
+        """Merge resolved ``{mac: hostname}`` into the tracked devices and emit the changes."""
+        for mac, hostname in hostnames.items():
+            device = self._devices.get(mac)
+            if device is None or device.hostname == hostname:
                 continue
+            old_hostname = device.hostname
+            device.update_hostname(hostname)
+            self._dirty.add(mac)
+            self._emit(HostnameChanged(device, now, old_hostname, device.hostname))
+            if self._search_index is not None:
+                self._search_index.update(device)
 
-            seen_macs.add(mac)
-            if mac in self._devices:
-                # Update existing device - preserve original date_added
-                self._devices[mac].update_last_seen(now)
-                # Update IP in case it changed (DHCP)
-                self._devices[mac].update_ip_address(ip)
-                # Update hostname if found
-                if hostname:
-                    self._devices[mac].update_hostname(hostname)
-                # Update manufacturer if found
-                if manufacturer:
-                    self._devices[mac].update_manufacturer(manufacturer)
-            else:
-                # New device - set both timestamps to now
-                self._devices[mac] = Device(
-                    mac_address=mac,
-                    ip_address=ip,
-                    hostname=hostname,
-                    manufacturer=manufacturer,
-                    date_added=now,
-                    last_seen=now
-                )
+    def _finish_scan(
+        self,
+        seen_macs: set[str],
+        now: datetime.datetime | None = None,
+        scope: str | None = None,
+    ) -> None:
+        """
+        Report departed devices, prune stale ones and persist once all hosts of a scan are merged.
+
+        With ``scope`` the scan covered only that network, so only devices
+        on it can have departed or gone stale.
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        departed = []
+        for mac in sorted(self._present - seen_macs):
+            device = self._devices.get(mac)
+            if device is not None and (scope is None or self._in_scope(device, scope)):
+                departed.append(mac)
+                self._emit(DeviceLeft(device, now))
+        if scope is None:
+            self._present = set(seen_macs)
+        else:
+            self._present.difference_update(departed)
+            self._present |= seen_macs
 
         if self.remove_stale:
-            stale = [m for m in self._devices if m not in seen_macs]
+            stale = [
+                m for m in self._devices
+                if m not in seen_macs and (scope is None or self._in_scope(self._devices[m], scope))
+            ]
             for m in stale:
                 del self._devices[m]
+                self._dirty.discard(m)
+                self._removed.add(m)
+                if self._search_index is not None:
+                    self._search_index.remove(m)
         
         # Always update the core data file if persistence is enabled
         if self.use_persistence:
-            self._save_core_data()
+            self._request_save()
+
+    @contextmanager
+    def _scan_events(self, events: list[DeviceEvent]) -> Iterator[None]:
+        """Hold the lock, sending events emitted meanwhile to ``events``."""
+        with self._lock:
+            previous, self._event_sink = self._event_sink, events
+            try:
+                yield
+            finally:
+                self._event_sink = previous
+
+    def _start_scan(self) -> list[DeviceEvent]:
+        """Return a new event list for one scan; last_events restarts unless another scan is running."""
+        with self._lock:
+            if not self._scans_running:
+                self.last_events = []
+            self._scans_running += 1
+        return []
+
+    def _end_scan(self, events: list[DeviceEvent]) -> None:
+        """Add one scan's events to last_events."""
+        with self._lock:
+            self.last_events = self.last_events + events
+            self._scans_running -= 1
+
+    def _apply(
+        self,
+        records: Iterable[HostRecord],
+        on_device: Callable[[Device], None] | None = None,
+        scope: str | None = None,
+    ) -> None:
+        """Upsert every record of one scan (of ``scope`` only, if given), then finish the scan."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        events = self._start_scan()
+        try:
+            seen_macs = set()
+            sightings = [] if self.history is not None else None
+            unnamed = []
+            # Records may arrive while nmap is still running, so lock per record
+            # rather than for the whole scan
+            for record in records:
+                seen_macs.add(record.mac_address)
+                with self._scan_events(events):
+                    device = self._upsert(record, now, scope)
+                if sightings is not None:
+                    sightings.append(record)
+                if self._unnamed(record):
+                    unnamed.append((record.ip_address, record.mac_address))
+                if on_device is not None:
+                    on_device(device)
+            # Every host is merged before names are looked up, all at once
+            hostnames = self.resolver.resolve(unnamed) if unnamed else {}
+            with self._scan_events(events):
+                self._apply_hostnames(hostnames, now)
+                self._finish_scan(seen_macs, now, scope)
+                if sightings is not None:
+                    # Stamped under the lock: overlapping scans (and lazily run
+                    # shards) must reach the history in the order they finish
+                    self._record_history(datetime.datetime.now(datetime.timezone.utc), sightings)
+        finally:
+            self._end_scan(events)
+
+    def observe(self, records: Iterable[HostRecord]) -> list[Device]:
+        """
+        Merge sightings learned outside a scan and return the devices they touched.
+
+        Unlike a scan, sightings are not a complete picture of the network:
+        devices missing from them are neither reported as departed nor
+        pruned, and they are not recorded in the sighting history.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            self.last_events = []
+            devices = [self._upsert(record, now) for record in records]
+            if devices and self.use_persistence:
+                self._request_save()
+        return devices
 
-    def scan(self) -> None:
-        """Perform a nmap ping scan and update devices."""
-        raw = self._run_command()
+    def probe(self, addresses: list[str]) -> set[str]:
+        """
+        Probe only ``addresses`` and return those that answered.
+
+        Devices found are merged as in a scan. A device present in the
+        previous scan whose address was probed without an answer is reported
+        as departed; devices elsewhere in the network are left alone, and
+        nothing is pruned or added to the sighting history.
+        """
+        if not addresses:
+            return set()
+        if self.engine == "sweep":
+            records = self.sweeper.sweep(addresses)
+        else:
+            raw = self._run_command(" ".join(addresses))
+            if self.verbose:
+                print(raw)
+            records = list(self._make_parser().parse_text(raw))
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        probed = set(addresses)
+        with self._lock:
+            self.last_events = []
+            seen_macs = {self._upsert(record, now).mac_address for record in records}
+            for mac in sorted(self._present - seen_macs):
+                device = self._devices.get(mac)
+                if device is not None and device.ip_address in probed:
+                    self._present.discard(mac)
+                    self._emit(DeviceLeft(device, now))
+            if self.use_persistence:
+                self._request_save()
+        return {record.ip_address for record in records}
+
+    def refresh_neighbors(self, watcher: NeighborWatcher | None = None) -> list[Device]:
+        """
+        Refresh ``last_seen`` from the kernel neighbor table, without sending probes.
+
+        Hosts the kernel has recently confirmed as reachable inside the
+        monitored network count as sightings. With a ``watcher`` only the
+        entries announced since its last poll are used instead of a full
+        table read.
+        """
+        neighbors = watcher.poll() if watcher is not None else read_neighbors()
+        networks = []
+        for target in split_targets(self.network):
+            try:
+                networks.append(ipaddress.ip_network(target, strict=False))
+            except ValueError:
+                # nmap ranges and hostnames can't be matched against addresses
+                if self.verbose:
+                    print(f"Warning: Ignoring {target!r} for passive discovery")
+        return self.observe(
+            HostRecord(n.ip_address, n.mac_address)
+            for n in neighbors
+            if n.fresh and any(ipaddress.ip_address(n.ip_address) in net for net in networks)
+        )
+
+    def _parse(self, raw: str) -> None:
+        self._apply(self._make_parser().parse_text(raw))
+
+    def _scan_shard(self, target: str) -> list[HostRecord]:
+        """Scan one shard and parse it; runs on a worker thread."""
+        raw = self._run_command(target)
+        if self.verbose:
+            print(raw)
+        return list(self._make_parser().parse_text(raw))
+
+    def _sharded_records(self, shards: list[str], max_workers: int | None = None) -> Iterator[HostRecord]:
+        """Scan shards concurrently and yield records as each shard completes."""
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as pool:
+            futures = [pool.submit(self._scan_shard, shard) for shard in shards]
+            try:
+                for future in as_completed(futures):
+                    yield from future.result()
+            finally:
+                # Don't start queued shards once one has failed
+                for future in futures:
+                    future.cancel()
+
+    def scan(self, network: str | None = None, max_workers: int | None = None) -> None:
+        """
+        Perform a nmap ping scan (or an in-process sweep) and update devices.
+
+        ``network`` scans only part of what is monitored, e.g. one VLAN of
+        several; only devices on it can then be reported as departed or
+        pruned. ``max_workers`` overrides the sharding concurrency for this scan.
+        """
+        target = network or self.network
+        workers = self.max_workers if max_workers is None else max_workers
+        if self.engine == "sweep":
+            self._apply(self.sweeper.sweep(split_targets(target)), scope=network)
+            return
+        if workers > 1:
+            shards = shard_network(target, self.shard_prefix)
+            if len(shards) > 1:
+                self._apply(self._sharded_records(shards, workers), scope=network)
+                return
+
+        raw = self._run_command(network)
         if self.verbose:
             print(raw)
-        self._parse(raw)
+        if network is None:
+            self._parse(raw)
+        else:
+            self._apply(self._make_parser().parse_text(raw), scope=network)
+
+    def scan_stream(self, on_device: Callable[[Device], None] | None = None) -> None:
+        """
+        Perform a nmap ping scan, updating devices while nmap is still running.
+
+        Each device is upserted (and passed to ``on_device``) as soon as its
+        report block is complete, instead of after the whole scan finishes.
+        """
+        if self.engine == "sweep":
+            self._apply(self.sweeper.sweep(split_targets(self.network)), on_device)
+            return
+        lines = self._stream_command()
+        if self.verbose:
+            lines = self._echo(lines)
+        self._apply(self._make_parser().parse(lines), on_device)
+
+    @staticmethod
+    def _echo(lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            print(line)
+            yield line
 
     def devices(self) -> list[Device]:
         """Return list of tracked devices."""
-        return list(self._devices.values())
+        with self._lock:
+            return list(self._devices.values())
+
+    def snapshot(self) -> list[Device]:
+        """
+        Return copies of the tracked devices, taken atomically.
+
+        Unlike ``devices()``, the copies are not updated in place by scans
+        running on another thread, so a reader sees one consistent state.
+        """
+        with self._lock:
+            return [copy.copy(d) for d in self._devices.values()]
+
+    def find_devices(
+        self,
+        search: str | None = None,
+        manufacturer: str | None = None,
+        ip_address: str | None = None,
+        hostname_prefix: str | None = None,
+        seen_since: datetime.datetime | None = None,
+    ) -> list[Device]:
+        """
+        Return devices matching every given filter, sorted by IP address.
+
+        ``search`` matches a case-insensitive substring of the MAC, IP,
+        hostname or manufacturer. With the SQLite backend the filtering runs
+        in the database instead of over every tracked device.
+        """
+        # The lock keeps the background writer from saving (and clearing the
+        # pending changes) between the flush below and the query
+        with self._lock:
+            if isinstance(self._store, SQLiteDeviceStore) and self.use_persistence:
+                if self._dirty or self._removed:
+                    self._save_core_data()
+                if not (self._dirty or self._removed):
+                    results = self._get_store().query(
+                        search=search,
+                        manufacturer=manufacturer,
+                        ip_address=ip_address,
+                        hostname_prefix=hostname_prefix,
+                        seen_since=seen_since,
+                    )
+                    return [self._devices.cached(d) for d in results]
+
+            if search:
+                candidates = [self._devices[mac] for mac in self.search_macs(search) if mac in self._devices]
+            else:
+                candidates = self.devices()
+            matches = []
+            for d in candidates:
+                if manufacturer and (d.manufacturer or "").lower() != manufacturer.lower():
+                    continue
+                if ip_address and d.ip_address != ip_address:
+                    continue
+                if hostname_prefix and not (d.hostname or "").lower().startswith(hostname_prefix.lower()):
+                    continue
+                if seen_since is not None and d.last_seen < seen_since:
+                    continue
+                matches.append(d)
+            return sorted(matches, key=lambda d: d.ip_address)
     
+    def search_macs(self, text: str) -> frozenset[str]:
+        """
+        Return the MACs of devices with ``text`` in their MAC, IP, hostname
+        or manufacturer (case-insensitive).
+
+        Backed by a trigram index built on first use and updated as scans
+        upsert or prune devices, so repeated searches do not rescan every device.
+        """
+        with self._lock:
+            if self._search_index is None:
+                index = DeviceSearchIndex()
+                for device in self._devices.values():
+                    index.update(device)
+                self._search_index = index
+            return self._search_index.search(text)
+
     @staticmethod
     def get_device_header() -> str:
         """Get formatted header for device display."""
@@ -261,17 +940,20 @@ class NetworkMonitor:
         return f"{header}\n{separator}"
 
     def to_json(self, path: str) -> None:
-        import json
-        data = [d.to_dict() for d in self.devices()]
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        export_devices(self.devices(), path, "json")
 
     def to_csv(self, path: str) -> None:
-        import csv
-        fieldnames = ['mac_address', 'ip_address', 'hostname', 'manufacturer', 'date_added', 'last_seen']
-        with open(path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for d in self.devices():
-                writer.writerow(d.to_dict())
+        export_devices(self.devices(), path, "csv")
+
+    def to_ndjson(self, path: str) -> None:
+        """Write one compact JSON object per device and line."""
+        export_devices(self.devices(), path, "ndjson")
+
+    def export(self, path: str, fmt: str | None = None) -> None:
+        """
+        Write all devices to ``path`` as JSON, NDJSON, CSV, Parquet or Arrow IPC.
 
+        The format is ``fmt`` or taken from the suffix (.json, .ndjson/.jsonl,
+        .csv, .parquet, .arrow/.feather); see ``simple_scanner.export``.
+        """
+        export_devices(self.devices(), path, fmt)
@@ -0,0 +1,196 @@
+"""Adaptive probe scheduling: probe likely-changed addresses often and cold space rarely."""
+
+import heapq
+import ipaddress
+import time
+from typing import Iterable
+
+from .models import Device
+from .sweep import expand_targets
+
+
+def parse_ranges(ranges: Iterable[str]) -> list[tuple[int, int]]:
+    """Parse ``"a.b.c.d-w.x.y.z"`` ranges and CIDRs into inclusive integer bounds."""
+    bounds = []
+    for text in ranges:
+        try:
+            if "-" in text:
+                first, last = (int(ipaddress.IPv4Address(part.strip())) for part in text.split("-", 1))
+            else:
+                network = ipaddress.IPv4Network(text, strict=False)
+                first, last = int(network.network_address), int(network.broadcast_address)
+        except ValueError as e:
+            raise ValueError(f"Invalid address range {text!r}") from e
+        if first > last:
+            raise ValueError(f"Invalid address range {text!r}: start is after end")
+        bounds.append((first, last))
+    return bounds
+
+
+def _is_cidr(target: str) -> bool:
+    try:
+        ipaddress.IPv4Network(target, strict=False)
+    except ValueError:
+        return False
+    return True
+
+
+class AdaptiveScheduler:
+    """
+    Chooses which addresses of a network to probe next, within a probe budget.
+
+    Every address is due again some time after it was last probed,
+    depending on what that probe found:
+
+    - a device answered: just before it would stop counting as online
+      (``online_seconds`` times ``ONLINE_MARGIN`` after it answered), so
+      online status stays fresh without probing it every tick;
+    - the address recently changed state (a host appeared, disappeared or
+      moved): after ``hot_seconds``, for ``churn_seconds`` after the change;
+    - inside a DHCP pool range: after ``pool_seconds``;
+    - anything else: after ``cold_seconds``.
+
+    ``next_batch()`` spends the budget (``probe_budget`` probes per second
+    of elapsed time) on the addresses that have been due longest, and
+    ``record()`` feeds the results back. Addresses never probed are due
+    immediately, so the first batches sweep the whole network at the
+    budget's pace unless ``seed()`` reports a full scan's results first.
+    """
+
+    ONLINE_MARGIN = 0.75  # Fraction of online_seconds after which an online host is re-probed
+    MAX_BURST_SECONDS = 10  # Unspent budget carried over between ticks
+    MAX_ADDRESSES = 65536
+
+    def __init__(
+        self,
+        network: str,
+        probe_budget: float = 10.0,
+        dhcp_ranges: Iterable[str] = (),
+        online_seconds: float = 120,
+        hot_seconds: float = 15,
+        churn_seconds: float = 600,
+        pool_seconds: float = 120,
+        cold_seconds: float = 900,
+    ) -> None:
+        if probe_budget <= 0:
+            raise ValueError("probe_budget must be positive")
+        targets = network.replace(",", " ").split()
+        # Check the size before expanding; a /8 would take 16M entries
+        size = sum(ipaddress.IPv4Network(t, strict=False).num_addresses for t in targets if _is_cidr(t))
+        if size > self.MAX_ADDRESSES:
+            raise ValueError(
+                f"Adaptive scheduling supports up to {self.MAX_ADDRESSES} addresses, {network} has {size}"
+            )
+        addresses = expand_targets(targets)
+        self.probe_budget = probe_budget
+        self.online_seconds = online_seconds
+        self.hot_seconds = hot_seconds
+        self.churn_seconds = churn_seconds
+        self.pool_seconds = pool_seconds
+        self.cold_seconds = cold_seconds
+        self._pools = parse_ranges(dhcp_ranges)
+
+        self._probed: dict[str, float] = {}  # Last probe time per address
+        self._alive: dict[str, float] = {}  # Last time a host answered, while it is answering
+        self._changed: dict[str, float] = {}  # Last change of state per address
+        # Earliest-due-first heap; entries whose due time no longer matches
+        # self._due are stale and skipped
+        self._due = dict.fromkeys(addresses, 0.0)
+        self._heap = [(0.0, i, address) for i, address in enumerate(addresses)]
+        self._order = {address: i for i, address in enumerate(addresses)}
+        self._tokens = 0.0
+        self._last_tick: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def _in_pool(self, address: str) -> bool:
+        value = int(ipaddress.IPv4Address(address))
+        return any(first <= value <= last for first, last in self._pools)
+
+    def _period(self, address: str) -> float:
+        """Seconds between probes of an address where no host is answering."""
+        last = self._probed.get(address, 0.0)
+        if last - self._changed.get(address, float("-inf")) < self.churn_seconds:
+            return self.hot_seconds
+        if self._in_pool(address):
+            return self.pool_seconds
+        return self.cold_seconds
+
+    def _reschedule(self, address: str) -> None:
+        if address in self._alive:
+            due = self._alive[address] + self.online_seconds * self.ONLINE_MARGIN
+        else:
+            due = self._probed.get(address, 0.0) + self._period(address)
+        self._due[address] = due
+        heapq.heappush(self._heap, (due, self._order[address], address))
+
+    def next_batch(self, now: float | None = None) -> list[str]:
+        """Return the addresses to probe now, most overdue first."""
+        now = time.time() if now is None else now
+        elapsed = 1.0 if self._last_tick is None else max(0.0, now - self._last_tick)
+        self._last_tick = now
+        self._tokens = min(
+            self._tokens + elapsed * self.probe_budget, self.probe_budget * self.MAX_BURST_SECONDS
+        )
+
+        batch = []
+        heap = self._heap
+        while heap and len(batch) < int(self._tokens) and heap[0][0] <= now:
+            due, _, address = heapq.heappop(heap)
+            if self._due.get(address) != due:
+                continue  # Rescheduled since this entry was pushed
+            # Not due again until its result is recorded
+            self._due[address] = float("inf")
+            batch.append(address)
+        self._tokens -= len(batch)
+        return batch
+
+    def record(self, probed: Iterable[str], answered: Iterable[str], now: float | None = None) -> None:
+        """
+        Feed back probe results: the ``probed`` addresses and those of them that ``answered``.
+
+        Answers from addresses that were not probed (e.g. passive sightings)
+        count too; they postpone the next probe of that address.
+        """
+        now = time.time() if now is None else now
+        answered = set(answered) & self._due.keys()
+        for address in set(probed) & self._due.keys() | answered:
+            was_known = address in self._probed or address in self._alive
+            was_alive = address in self._alive
+            is_alive = address in answered
+            self._probed[address] = now
+            if is_alive:
+                self._alive[address] = now
+            else:
+                self._alive.pop(address, None)
+            if was_known and was_alive != is_alive:
+                self._changed[address] = now
+            self._reschedule(address)
+
+    def requeue(self, addresses: Iterable[str]) -> None:
+        """Return addresses from a batch whose probe failed, to be retried."""
+        for address in addresses:
+            if address in self._due:
+                self._reschedule(address)
+
+    def seed(self, devices: Iterable[Device], now: float | None = None) -> None:
+        """Start from a full scan just completed: every address was probed at ``now``."""
+        now = time.time() if now is None else now
+        for address in self._due:
+            self._probed[address] = now
+        for device in devices:
+            seen = device.last_seen.timestamp()
+            if device.ip_address in self._due and now - seen < self.online_seconds:
+                self._alive[device.ip_address] = seen
+        self._heap = []
+        for address in self._due:
+            self._reschedule(address)
+
+    def probes_per_second(self) -> float:
+        """Long-run probe rate the current schedule needs, before the budget cap."""
+        online_period = self.online_seconds * self.ONLINE_MARGIN
+        return sum(
+            1 / (online_period if address in self._alive else self._period(address))
+            for address in self._due
+        )
@@ -0,0 +1,99 @@
+"""Incremental substring index over device fields."""
+
+from .models import Device
+from .storage import SEARCH_FIELDS
+
+
+def search_text(device: Device) -> str:
+    """Return the lowercased text a search query is matched against."""
+    # NUL never occurs in a query, so matches cannot span two fields
+    return "\0".join((getattr(device, field) or "").lower() for field in SEARCH_FIELDS)
+
+
+class DeviceSearchIndex:
+    """
+    Trigram index answering case-insensitive substring queries over devices.
+
+    Each device's searchable text is split into overlapping three-character
+    grams; a query of three or more characters intersects the MAC sets of its
+    grams (smallest first) and confirms the few candidates with a substring
+    check. Shorter queries scan the cached texts, which is still far cheaper
+    than formatting every device. Devices are added, updated and removed one
+    at a time as scans change them, and the last result is reused until the
+    query or the index changes.
+    """
+
+    GRAM = 3
+
+    def __init__(self) -> None:
+        self._texts: dict[str, str] = {}
+        self._grams: dict[str, set[str]] = {}
+        self.version = 0  # Bumped on every change to the indexed texts
+        self._last: tuple[str, int, frozenset[str]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, mac: object) -> bool:
+        return mac in self._texts
+
+    @classmethod
+    def _grams_of(cls, text: str) -> set[str]:
+        return {text[i:i + cls.GRAM] for i in range(len(text) - cls.GRAM + 1)}
+
+    def update(self, device: Device) -> None:
+        """Index ``device``, or re-index it if its searchable fields changed."""
+        mac = device.mac_address
+        text = search_text(device)
+        old = self._texts.get(mac)
+        if old == text:
+            return
+        old_grams = self._grams_of(old) if old is not None else set()
+        new_grams = self._grams_of(text)
+        for gram in old_grams - new_grams:
+            macs = self._grams[gram]
+            macs.discard(mac)
+            if not macs:
+                del self._grams[gram]
+        for gram in new_grams - old_grams:
+            self._grams.setdefault(gram, set()).add(mac)
+        self._texts[mac] = text
+        self.version += 1
+
+    def remove(self, mac: str) -> None:
+        """Drop a device from the index."""
+        text = self._texts.pop(mac, None)
+        if text is None:
+            return
+        for gram in self._grams_of(text):
+            macs = self._grams[gram]
+            macs.discard(mac)
+            if not macs:
+                del self._grams[gram]
+        self.version += 1
+
+    def search(self, query: str) -> frozenset[str]:
+        """Return the MACs of devices with ``query`` in any searchable field."""
+        query = query.lower()
+        if self._last is not None and self._last[:2] == (query, self.version):
+            return self._last[2]
+
+        if len(query) < self.GRAM:
+            # list() snapshots the texts in one step, so a scan thread
+            # updating the index cannot break the iteration
+            result = frozenset(mac for mac, text in list(self._texts.items()) if query in text)
+        else:
+            candidates = None
+            for gram in sorted(self._grams_of(query), key=lambda g: len(self._grams.get(g, ()))):
+                macs = self._grams.get(gram)
+                if not macs:
+                    candidates = set()
+                    break
+                candidates = set(macs) if candidates is None else candidates & macs
+                if not candidates:
+                    break
+            texts = self._texts
+            result = frozenset(mac for mac in candidates or () if query in texts.get(mac, ""))
+
+        self._last = (query, self.version, result)
+        return result
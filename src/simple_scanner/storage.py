@@ -0,0 +1,883 @@
+"""Persistent storage backends for the tracked device inventory."""
+
+import array
+import datetime
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator, Mapping, MutableMapping
+
+from .models import Device
+
+# Device fields matched by free-text search
+SEARCH_FIELDS = ("mac_address", "ip_address", "hostname", "manufacturer")
+
+# When saves call fsync: never, when a whole file is replaced, or also on journal appends
+FSYNC_POLICIES = ("never", "snapshot", "always")
+
+
+def _check_fsync_policy(fsync: str) -> None:
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy {fsync!r}; expected one of {', '.join(FSYNC_POLICIES)}")
+
+
+def _fsync_dir(path: Path) -> None:
+    """Flush a directory entry (a rename) to disk where the platform allows it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Windows can't open directories
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w", fsync: bool = False, **kwargs) -> Iterator[IO]:
+    """
+    Open ``<path>.tmp`` for writing and rename it over ``path`` once the block ends.
+
+    Readers see either the old file or the complete new one, never a partial
+    write. If the block raises, the temporary file is removed and ``path`` is
+    left untouched. With ``fsync`` the data and the rename are flushed to disk
+    before returning, so they also survive a power loss.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+    if fsync:
+        _fsync_dir(path.parent)
+
+
+class BackgroundWriter:
+    """
+    Runs a save function on a daemon thread, coalescing bursts of requests.
+
+    request() only marks that there is something to save and returns at once.
+    The thread then calls ``flush_func`` at most once per ``interval`` seconds;
+    requests arriving while a save is pending or running fold into the next
+    one, so a burst of scans costs one write. flush() saves pending work now
+    and waits for it, close() does the same and stops the thread. Exceptions
+    from ``flush_func`` go to ``on_error`` (a printed warning by default) and
+    don't stop the writer.
+    """
+
+    def __init__(
+        self,
+        flush_func: Callable[[], None],
+        interval: float = 5.0,
+        on_error: Callable[[Exception], None] | None = None,
+        name: str = "background-writer",
+    ) -> None:
+        self.interval = interval
+        self._flush_func = flush_func
+        self._on_error = on_error
+        self._name = name
+        self._cond = threading.Condition()
+        self._pending = False  # A request not yet picked up by the thread
+        self._busy = False  # flush_func is running
+        self._urgent = False  # flush() or close() is waiting; skip the throttle
+        self._closed = False
+        self._last_flush = float("-inf")
+        self._thread: threading.Thread | None = None
+
+    def request(self) -> None:
+        """Schedule a save; after close() the save runs on the calling thread."""
+        with self._cond:
+            if not self._closed:
+                self._pending = True
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                    self._thread.start()
+                self._cond.notify_all()
+                return
+        self._call()
+
+    def flush(self) -> None:
+        """Run any pending save now and wait until no save is pending or running."""
+        with self._cond:
+            if not (self._pending or self._busy):
+                return
+            self._urgent = True
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                self._cond.wait()
+
+    def close(self, timeout: float | None = None) -> None:
+        """Run any pending save, then stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @property
+    def pending(self) -> bool:
+        """Whether a save has been requested but not finished yet."""
+        with self._cond:
+            return self._pending or self._busy
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return  # Closed with nothing left to save
+                # Throttle, unless someone is waiting for the save
+                while not (self._closed or self._urgent):
+                    delay = self._last_flush + self.interval - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                self._pending = False
+                self._urgent = False
+                self._busy = True
+            try:
+                self._call()
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._last_flush = time.monotonic()
+                    self._cond.notify_all()
+
+    def _call(self) -> None:
+        try:
+            self._flush_func()
+        except Exception as e:
+            if self._on_error is not None:
+                self._on_error(e)
+            else:
+                print(f"Warning: Background save failed: {e}")
+
+
+class _SnapshotIndex:
+    """
+    Sorted MAC -> (offset, length) table for a JSON snapshot, kept next to it
+    as ``<snapshot>.idx`` and memory-mapped, so one device can be read from
+    the snapshot without parsing the rest of it.
+
+    The header records the snapshot's size and mtime; an index that doesn't
+    match them is stale and is rebuilt by the store.
+
+    A few lookups binary-search the mapped keys. Once a scan has asked for
+    more than TABLE_AFTER_LOOKUPS devices the whole table is read into a dict,
+    one pass over the index being cheaper than that many searches.
+    """
+
+    MAGIC = b"LSDX"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHQQq")  # magic, version, key size, count, snapshot size, mtime_ns
+    TABLE_AFTER_LOOKUPS = 256
+
+    def __init__(self, mm: mmap.mmap, key_size: int, count: int) -> None:
+        self._mm = mm
+        self._key_size = key_size
+        self._count = count
+        self._offsets_at = self.HEADER.size + key_size * count
+        self._lengths_at = self._offsets_at + 8 * count
+        self._lookups = 0
+        self._table: dict[str, tuple[int, int]] | None = None
+
+    @classmethod
+    def open(cls, path: Path, snapshot: Path) -> "_SnapshotIndex | None":
+        """Map the index at ``path``, or return None if it is missing, damaged or stale."""
+        try:
+            stat = snapshot.stat()
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, version, key_size, count, size, mtime_ns = cls.HEADER.unpack_from(mm)
+        except struct.error:
+            mm.close()
+            return None
+        if (
+            magic != cls.MAGIC or version != cls.VERSION
+            or (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns)
+            or len(mm) != cls.HEADER.size + (key_size + 12) * count
+        ):
+            mm.close()
+            return None
+        return cls(mm, key_size, count)
+
+    @classmethod
+    def write(cls, path: Path, snapshot: Path, spans: Mapping[str, tuple[int, int]]) -> None:
+        """Write the index of ``snapshot`` from its ``{mac: (offset, length)}`` spans."""
+        stat = snapshot.stat()
+        keys = sorted((mac.encode("utf-8"), span) for mac, span in spans.items())
+        key_size = max((len(key) for key, _ in keys), default=0)
+        count = len(keys)
+        with atomic_write(path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, key_size, count, stat.st_size, stat.st_mtime_ns))
+            f.write(b"".join(key.ljust(key_size, b"\0") for key, _ in keys))
+            f.write(struct.pack(f"<{count}Q", *(offset for _, (offset, _) in keys)))
+            f.write(struct.pack(f"<{count}I", *(length for _, (_, length) in keys)))
+
+    @staticmethod
+    def scan(snapshot: Path) -> dict[str, tuple[int, int]]:
+        """
+        Find each device object's byte span in a snapshot written without an index.
+
+        Raises ValueError (JSONDecodeError included) if the file isn't a JSON
+        array of device objects.
+        """
+        text = snapshot.read_text(encoding="utf-8")
+        ascii_only = text.isascii()
+        mark = [0, 0]  # Last (char, byte) position converted
+
+        def byte_pos(pos: int) -> int:
+            if ascii_only:
+                return pos
+            mark[1] += len(text[mark[0]:pos].encode("utf-8"))
+            mark[0] = pos
+            return mark[1]
+
+        decoder = json.JSONDecoder()
+        spans: dict[str, tuple[int, int]] = {}
+        ws = " \t\r\n"
+        pos = len(text) - len(text.lstrip(ws))
+        if not text.startswith("[", pos):
+            raise ValueError("Device snapshot is not a JSON array")
+        pos += 1
+        while True:
+            while pos < len(text) and text[pos] in ws:
+                pos += 1
+            if text.startswith("]", pos) and not spans:
+                break
+            record, end = decoder.raw_decode(text, pos)
+            mac = record.get("mac_address") if isinstance(record, dict) else None
+            if not isinstance(mac, str):
+                raise ValueError(f"Device record without a MAC address at offset {pos}")
+            start = byte_pos(pos)
+            spans[mac.lower()] = (start, byte_pos(end) - start)  # Later duplicates win, as in load()
+            pos = end
+            while pos < len(text) and text[pos] in ws:
+                pos += 1
+            if text.startswith(",", pos):
+                pos += 1
+            elif text.startswith("]", pos):
+                break
+            else:
+                raise ValueError(f"Expected ',' or ']' at offset {pos} of the device snapshot")
+        if text[pos + 1:].strip(ws):
+            raise ValueError("Extra data after the device snapshot")
+        return spans
+
+    def _key(self, i: int) -> bytes:
+        start = self.HEADER.size + i * self._key_size
+        return self._mm[start:start + self._key_size]
+
+    def _read_table(self) -> dict[str, tuple[int, int]]:
+        """Read every entry into ``{mac: (offset, length)}``, in key order."""
+        size, count = self._key_size, self._count
+        keys = self._mm[self.HEADER.size:self._offsets_at]
+        offsets = array.array("Q", self._mm[self._offsets_at:self._lengths_at])
+        lengths = array.array("I", self._mm[self._lengths_at:self._lengths_at + 4 * count])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+            lengths.byteswap()
+        macs = [keys[i:i + size].rstrip(b"\0").decode("utf-8") for i in range(0, size * count, size)]
+        return dict(zip(macs, zip(offsets, lengths)))
+
+    def lookup(self, mac: str) -> tuple[int, int] | None:
+        """Return the (offset, length) of ``mac``'s object in the snapshot, or None."""
+        if self._table is None:
+            self._lookups += 1
+            if self._lookups > self.TABLE_AFTER_LOOKUPS:
+                self._table = self._read_table()
+        if self._table is not None:
+            return self._table.get(mac)
+        key = mac.encode("utf-8")
+        if len(key) > self._key_size:
+            return None
+        key = key.ljust(self._key_size, b"\0")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._count or self._key(lo) != key:
+            return None
+        return self._span(lo)
+
+    def _span(self, i: int) -> tuple[int, int]:
+        (offset,) = struct.unpack_from("<Q", self._mm, self._offsets_at + 8 * i)
+        (length,) = struct.unpack_from("<I", self._mm, self._lengths_at + 4 * i)
+        return offset, length
+
+    def spans(self) -> list[tuple[str, int, int]]:
+        """Return every ``(mac, offset, length)``, in snapshot order."""
+        table = self._table if self._table is not None else self._read_table()
+        return sorted(((mac, *span) for mac, span in table.items()), key=lambda entry: entry[1])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._table = None
+        self._mm.close()
+
+
+class _SpanDict(dict):
+    """In-memory stand-in for _SnapshotIndex when the index file can't be written."""
+
+    def lookup(self, mac: str) -> tuple[int, int] | None:
+        return self.get(mac)
+
+    def spans(self) -> list[tuple[str, int, int]]:
+        return sorted(((mac, *span) for mac, span in self.items()), key=lambda entry: entry[1])
+
+    def close(self) -> None:
+        pass
+
+
+class JsonDeviceStore:
+    """
+    Device inventory kept as a JSON snapshot plus an append-only journal.
+
+    Each save appends one compact JSON line per changed or removed device to
+    ``<snapshot>.journal``, so write cost scales with the number of changes
+    rather than the size of the inventory. Once the journal outgrows the
+    inventory it is compacted back into the snapshot. Journal records hold the
+    full device state, so replaying them is idempotent.
+
+    Compaction writes a temporary file and renames it over the snapshot, so a
+    crash never leaves a half-written snapshot. ``fsync`` (one of
+    FSYNC_POLICIES) decides what is also flushed to disk: nothing, the
+    snapshot, or the snapshot and every journal append.
+
+    Besides load(), which reads everything, the store can be opened lazily
+    (open(), then get()/contains()/macs()/iter_devices(), as LazyDeviceMap
+    uses it): compaction also writes ``<snapshot>.idx``, a sorted MAC ->
+    byte range table, so a device is parsed only when it is asked for and
+    opening costs the same however large the inventory is. Journal records
+    are kept in memory on top of the snapshot until the next compaction.
+    """
+
+    COMPACT_MIN_RECORDS = 1000  # Never compact a journal shorter than this
+    READ_CHUNK = 1 << 20  # Bytes of snapshot read at a time by iter_devices()
+    LAZY = True  # NetworkMonitor materializes devices on demand
+
+    def __init__(self, path: Path, fsync: str = "snapshot") -> None:
+        _check_fsync_policy(fsync)
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + '.journal')
+        self.index_path = self.path.with_name(self.path.name + '.idx')
+        self.fsync = fsync
+        self._journal_records = 0
+        # Lazy access, after open(): snapshot index and journaled records on top
+        # of it ({mac: record}, None for deleted devices)
+        self._index: _SnapshotIndex | _SpanDict | None = None
+        self._overlay: dict[str, dict | None] | None = None
+        self._snapshot: IO[bytes] | None = None  # Kept open for get() between compactions
+        self._count = 0  # Stored devices, kept up to date by open(), save() and compact()
+
+    def load(self) -> dict[str, Device]:
+        """Return the devices from the snapshot with the journal replayed on top."""
+        devices: dict[str, Device] = {}
+        if not self.path.exists():
+            return devices
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for device_data in json.load(f):
+                device = Device.from_dict(device_data)
+                devices[device.mac_address] = device
+
+        for mac, record in self._read_journal():
+            if record is None:
+                devices.pop(mac, None)
+            else:
+                devices[mac] = Device.from_dict(record)
+        return devices
+
+    def _read_journal(self) -> Iterator[tuple[str, dict | None]]:
+        """Yield ``(mac, record)`` per journal line, with None for deletions."""
+        self._journal_records = 0
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final line from an interrupted append
+                    continue
+                self._journal_records += 1
+                yield record['mac_address'].lower(), None if record.get('deleted') else record
+
+    def open(self) -> None:
+        """
+        Prepare lazy access: map the snapshot index and read the journal.
+
+        An index that is missing or older than the snapshot (e.g. one written
+        by hand or by an older version) is rebuilt by scanning the snapshot
+        once. Raises ValueError (JSONDecodeError included) if the snapshot
+        can't be read.
+        """
+        self._close_index()
+        if self.path.exists():
+            self._index = _SnapshotIndex.open(self.index_path, self.path)
+            if self._index is None:
+                self._use_spans(_SnapshotIndex.scan(self.path))
+        self._overlay = {}
+        self._count = len(self._index) if self._index is not None else 0
+        self._apply_overlay(self._read_journal())
+
+    def _apply_overlay(self, records: Iterable[tuple[str, dict | None]]) -> None:
+        """Put journaled records on top of the snapshot, keeping count() current."""
+        for mac, record in records:
+            self._count += (record is not None) - self.contains(mac)
+            self._overlay[mac] = record
+
+    def _use_spans(self, spans: dict[str, tuple[int, int]]) -> None:
+        """Write the index for freshly computed spans and map it (kept in memory if it can't be written)."""
+        try:
+            _SnapshotIndex.write(self.index_path, self.path, spans)
+            self._index = _SnapshotIndex.open(self.index_path, self.path)
+        except OSError:
+            self._index = None
+        if self._index is None:
+            self._index = _SpanDict(spans)
+
+    def _close_index(self) -> None:
+        # Also before the files are replaced: Windows can't rename over open files
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def _read_device(self, f: IO[bytes], offset: int, length: int) -> Device:
+        f.seek(offset)
+        return Device.from_dict(json.loads(f.read(length).decode('utf-8')))
+
+    def get(self, mac: str) -> Device | None:
+        """Return the stored device with this MAC, or None."""
+        if mac in self._overlay:
+            record = self._overlay[mac]
+            return None if record is None else Device.from_dict(record)
+        span = self._index.lookup(mac) if self._index is not None else None
+        if span is None:
+            return None
+        if self._snapshot is None:
+            self._snapshot = open(self.path, 'rb')
+        return self._read_device(self._snapshot, *span)
+
+    def contains(self, mac: str) -> bool:
+        if mac in self._overlay:
+            return self._overlay[mac] is not None
+        return self._index is not None and self._index.lookup(mac) is not None
+
+    def macs(self) -> list[str]:
+        """Return the stored MACs in snapshot order, journaled additions last."""
+        stored = [mac for mac, _, _ in self._index.spans()] if self._index is not None else []
+        in_snapshot = set(stored)
+        result = [mac for mac in stored if self._overlay.get(mac, True) is not None]
+        result.extend(mac for mac, record in self._overlay.items() if record is not None and mac not in in_snapshot)
+        return result
+
+    def count(self) -> int:
+        return self._count
+
+    def iter_devices(self) -> Iterator[Device]:
+        """Yield every stored device, reading the snapshot front to back in READ_CHUNK pieces."""
+        in_snapshot = set()
+        if self._index is not None:
+            decoder = json.JSONDecoder()
+            chunk, chunk_start, text = b"", 0, None
+            with open(self.path, 'rb') as f:
+                for mac, offset, length in self._index.spans():
+                    in_snapshot.add(mac)
+                    if mac in self._overlay:
+                        record = self._overlay[mac]
+                        if record is not None:
+                            yield Device.from_dict(record)
+                        continue
+                    start, end = offset - chunk_start, offset - chunk_start + length
+                    if start < 0 or end > len(chunk):
+                        f.seek(offset)
+                        chunk, chunk_start = f.read(max(length, self.READ_CHUNK)), offset
+                        start, end = 0, length
+                        # Byte offsets are character offsets in ASCII text (what compact() writes)
+                        text = chunk.decode('ascii') if chunk.isascii() else None
+                    if text is not None:
+                        record, _ = decoder.raw_decode(text, start)
+                    else:
+                        record = json.loads(chunk[start:end].decode('utf-8'))
+                    yield Device.from_dict(record)
+        for mac, record in self._overlay.items():
+            if record is not None and mac not in in_snapshot:
+                yield Device.from_dict(record)
+
+    def save(
+        self,
+        devices: Mapping[str, Device],
+        changed: Iterable[str],
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Journal the changed and removed devices, compacting when due."""
+        if not self.path.exists():
+            self.compact(devices)
+            return
+
+        records = [(mac, devices[mac].to_dict()) for mac in changed if mac in devices]
+        records.extend((mac, None) for mac in removed)
+        if not records:
+            return
+
+        if self._index is not None:
+            # Counting a lazy mapping would read every MAC; the index plus journal is close enough
+            size = len(self._index) + len(self._overlay)
+        else:
+            size = len(devices)
+        if self._journal_records + len(records) > max(self.COMPACT_MIN_RECORDS, size):
+            self.compact(devices)
+            return
+
+        lines = [
+            json.dumps(record if record is not None else {'mac_address': mac, 'deleted': True},
+                       separators=(',', ':'))
+            for mac, record in records
+        ]
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            if self.fsync == "always":
+                f.flush()
+                os.fsync(f.fileno())
+        self._journal_records += len(lines)
+        if self._overlay is not None:
+            self._apply_overlay(records)
+
+    def compact(self, devices: Mapping[str, Device]) -> None:
+        """Rewrite the snapshot and its index from ``devices`` and truncate the journal."""
+        from .export import iter_json_objects  # export imports this module
+
+        entries = list(devices.values())  # Before the snapshot a lazy mapping reads from is replaced
+        spans: dict[str, tuple[int, int]] = {}
+        # Same bytes as json.dump(..., indent=2), noting where each device starts
+        with atomic_write(self.path, 'wb', fsync=self.fsync != "never") as f:
+            pos = f.write(b"[")
+            for device, text in iter_json_objects(entries):
+                body = text.encode("ascii")
+                pos += f.write(b",\n  " if spans else b"\n  ")
+                spans[device.mac_address] = (pos, len(body))
+                pos += f.write(body)
+            f.write(b"\n]" if spans else b"]")
+        # The snapshot now includes everything journaled so far
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        self._journal_records = 0
+        self._close_index()
+        self._count = len(spans)
+        if self._overlay is not None:
+            self._use_spans(spans)
+            self._overlay = {}
+        else:
+            try:
+                _SnapshotIndex.write(self.index_path, self.path, spans)
+            except OSError:
+                pass  # Rebuilt from the snapshot on the next open()
+
+    def quarantine(self) -> Path | None:
+        """
+        Move an unreadable snapshot and its journal aside as ``*.corrupt``.
+
+        The next save then starts a fresh snapshot instead of overwriting the
+        old data, which stays on disk for recovery. Returns the moved
+        snapshot's path, or None if there was no snapshot.
+        """
+        self._close_index()
+        if self.index_path.exists():
+            self.index_path.unlink()
+        if not self.path.exists():
+            return None
+        stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        moved = self.path.with_name(f"{self.path.name}.{stamp}.corrupt")
+        os.replace(self.path, moved)
+        if self.journal_path.exists():
+            os.replace(self.journal_path, self.journal_path.with_name(f"{self.journal_path.name}.{stamp}.corrupt"))
+        self._journal_records = 0
+        self._count = 0
+        if self._overlay is not None:
+            self._overlay = {}
+        return moved
+
+
+class LazyDeviceMap(MutableMapping[str, Device]):
+    """
+    Dict-like view of a lazy store that materializes devices on first access.
+
+    Devices that were read or written stay cached so in-place updates are seen
+    by the next save; everything else stays in the store until asked for.
+    After the first full pass (``values()``) every device is cached, so later
+    passes cost no more than a dict and always return the same live instances.
+    """
+
+    def __init__(self, store: "SQLiteDeviceStore | JsonDeviceStore") -> None:
+        self._store = store
+        self._cache: dict[str, Device] = {}
+        self._deleted: set[str] = set()  # Removed here but maybe not yet in the store
+        self._complete = False  # Every device is in _cache
+        self._len: int | None = None  # Counted on first use, then kept up to date
+
+    def __getitem__(self, mac: str) -> Device:
+        device = self._cache.get(mac)
+        if device is not None:
+            return device
+        if self._complete or mac in self._deleted:
+            raise KeyError(mac)
+        device = self._store.get(mac)
+        if device is None:
+            raise KeyError(mac)
+        self._cache[mac] = device
+        return device
+
+    def __setitem__(self, mac: str, device: Device) -> None:
+        if self._len is not None and mac not in self:
+            self._len += 1
+        self._cache[mac] = device
+        self._deleted.discard(mac)
+
+    def __delitem__(self, mac: str) -> None:
+        if mac not in self:
+            raise KeyError(mac)
+        self._cache.pop(mac, None)
+        self._deleted.add(mac)
+        if self._len is not None:
+            self._len -= 1
+
+    def __contains__(self, mac: object) -> bool:
+        if mac in self._cache:
+            return True
+        return not self._complete and mac not in self._deleted and self._store.contains(mac)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._complete:
+            yield from list(self._cache)
+            return
+        stored = self._store.macs()
+        yield from (mac for mac in stored if mac not in self._deleted)
+        stored_set = set(stored)
+        yield from (mac for mac in list(self._cache) if mac not in stored_set)
+
+    def __len__(self) -> int:
+        if self._complete:
+            return len(self._cache)
+        if self._len is None:
+            # Nothing changed here yet: the store's own count is exact
+            fresh = not self._cache and not self._deleted
+            self._len = self._store.count() if fresh else sum(1 for _ in self)
+        return self._len
+
+    def cached(self, device: Device) -> Device:
+        """Return the cached instance for a device loaded from the store, if any."""
+        return self._cache.get(device.mac_address, device)
+
+    def values(self) -> list[Device]:  # type: ignore[override]
+        """Return all devices; the first call reads the store once and caches them all."""
+        if not self._complete:
+            cache = {}
+            for device in self._store.iter_devices():
+                if device.mac_address not in self._deleted:
+                    cache[device.mac_address] = self._cache.get(device.mac_address, device)
+            for mac, device in self._cache.items():
+                cache.setdefault(mac, device)
+            self._cache = cache
+            self._complete = True
+        return list(self._cache.values())
+
+
+class SQLiteDeviceStore:
+    """
+    Device inventory kept in a local SQLite database.
+
+    Devices are indexed by MAC, IP, hostname, manufacturer and last_seen, each
+    save is a single batched transaction, and lookups are pushed down to the
+    database so the inventory never has to be held in memory as a whole.
+    Timestamps are stored as UTC epoch seconds.
+    """
+
+    LAZY = True  # NetworkMonitor materializes devices on demand
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS devices (
+            mac_address  TEXT PRIMARY KEY,
+            ip_address   TEXT NOT NULL,
+            hostname     TEXT,
+            manufacturer TEXT,
+            date_added   REAL NOT NULL,
+            last_seen    REAL NOT NULL,
+            network      TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_devices_ip ON devices (ip_address);
+        CREATE INDEX IF NOT EXISTS idx_devices_hostname ON devices (hostname COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_devices_manufacturer ON devices (manufacturer COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_devices_last_seen ON devices (last_seen);
+    """
+    COLUMNS = "mac_address, ip_address, hostname, manufacturer, date_added, last_seen, network"
+
+    # PRAGMA synchronous for each fsync policy; FULL is SQLite's default
+    SYNCHRONOUS = {"never": "OFF", "snapshot": "FULL", "always": "EXTRA"}
+
+    def __init__(self, path: Path, fsync: str = "snapshot") -> None:
+        _check_fsync_policy(fsync)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Scans run on worker threads, so share one connection behind a lock
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute(f"PRAGMA synchronous = {self.SYNCHRONOUS[fsync]}")
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(devices)")}
+            if "network" not in columns:
+                # Databases created before devices were tagged with their network
+                self._conn.execute("ALTER TABLE devices ADD COLUMN network TEXT")
+
+    @staticmethod
+    def _to_row(device: Device) -> tuple:
+        return (
+            device.mac_address,
+            device.ip_address,
+            device.hostname,
+            device.manufacturer,
+            device.date_added.timestamp(),
+            device.last_seen.timestamp(),
+            device.network,
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> Device:
+        mac, ip, hostname, manufacturer, date_added, last_seen, network = row
+        return Device(
+            mac_address=mac,
+            ip_address=ip,
+            hostname=hostname,
+            manufacturer=manufacturer,
+            date_added=datetime.datetime.fromtimestamp(date_added, datetime.timezone.utc),
+            last_seen=datetime.datetime.fromtimestamp(last_seen, datetime.timezone.utc),
+            network=network,
+        )
+
+    def _fetch(self, sql: str, params: Iterable = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def load(self) -> dict[str, Device]:
+        """Return every stored device (prefer the lazy accessors for large inventories)."""
+        return {d.mac_address: d for d in self.iter_devices()}
+
+    def get(self, mac: str) -> Device | None:
+        """Return the stored device with this MAC, or None."""
+        rows = self._fetch(f"SELECT {self.COLUMNS} FROM devices WHERE mac_address = ?", (mac,))
+        return self._from_row(rows[0]) if rows else None
+
+    def contains(self, mac: str) -> bool:
+        return bool(self._fetch("SELECT 1 FROM devices WHERE mac_address = ?", (mac,)))
+
+    def macs(self) -> list[str]:
+        return [row[0] for row in self._fetch("SELECT mac_address FROM devices")]
+
+    def count(self) -> int:
+        return self._fetch("SELECT COUNT(*) FROM devices")[0][0]
+
+    def iter_devices(self) -> Iterator[Device]:
+        for row in self._fetch(f"SELECT {self.COLUMNS} FROM devices"):
+            yield self._from_row(row)
+
+    def save(
+        self,
+        devices: Mapping[str, Device],
+        changed: Iterable[str],
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Upsert changed devices and delete removed ones in one transaction."""
+        rows = [self._to_row(devices[mac]) for mac in changed if mac in devices]
+        gone = [(mac,) for mac in removed]
+        if not rows and not gone:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO devices ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany("DELETE FROM devices WHERE mac_address = ?", gone)
+
+    def query(
+        self,
+        search: str | None = None,
+        manufacturer: str | None = None,
+        ip_address: str | None = None,
+        hostname_prefix: str | None = None,
+        seen_since: datetime.datetime | None = None,
+    ) -> list[Device]:
+        """
+        Return devices matching every given filter, ordered by IP address.
+
+        ``search`` is a case-insensitive substring match on any of
+        SEARCH_FIELDS; ``manufacturer`` matches exactly, ignoring case.
+        """
+        clauses, params = [], []
+        if search:
+            pattern = f"%{_escape_like(search)}%"
+            clauses.append(
+                "(" + " OR ".join(f"{col} LIKE ? ESCAPE '\\'" for col in SEARCH_FIELDS) + ")"
+            )
+            params.extend([pattern] * len(SEARCH_FIELDS))
+        if manufacturer:
+            clauses.append("manufacturer = ? COLLATE NOCASE")
+            params.append(manufacturer)
+        if ip_address:
+            clauses.append("ip_address = ?")
+            params.append(ip_address)
+        if hostname_prefix:
+            # A range rather than LIKE so the NOCASE hostname index is used
+            clauses.append("hostname >= ? COLLATE NOCASE AND hostname < ? COLLATE NOCASE")
+            params.extend([hostname_prefix, hostname_prefix + "\U0010ffff"])
+        if seen_since is not None:
+            clauses.append("last_seen >= ?")
+            params.append(seen_since.timestamp())
+
+        sql = f"SELECT {self.COLUMNS} FROM devices"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ip_address"
+        return [self._from_row(row) for row in self._fetch(sql, params)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards so user input matches literally."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,426 @@
+"""In-process host discovery (ARP, ICMP echo, TCP connect) as an alternative to nmap."""
+
+import asyncio
+import errno
+import ipaddress
+import select
+import socket
+import struct
+import time
+from pathlib import Path
+from typing import Iterable
+
+from .parsers import HostRecord
+
+ARP_TABLE = Path("/proc/net/arp")
+ROUTE_TABLE = Path("/proc/net/route")
+SYS_NET = Path("/sys/class/net")
+
+ETH_P_ARP = 0x0806
+ATF_COM = 0x2  # Completed ARP table entry
+RTF_UP = 0x1
+RTF_GATEWAY = 0x2
+SIOCGIFADDR = 0x8915
+
+
+def expand_targets(targets: Iterable[str]) -> list[str]:
+    """Expand IPv4 addresses and CIDRs into individual host addresses, without duplicates."""
+    addresses: dict[str, None] = {}
+    for target in targets:
+        try:
+            network = ipaddress.IPv4Network(target, strict=False)
+        except ValueError as e:
+            raise ValueError(
+                f"Cannot sweep {target!r}: only IPv4 addresses and CIDRs are supported"
+            ) from e
+        hosts = network.hosts() if network.num_addresses > 2 else iter(network)
+        for address in hosts:
+            addresses[str(address)] = None
+    return list(addresses)
+
+
+def read_arp_table(path: Path = ARP_TABLE) -> dict[str, tuple[str, str]]:
+    """Return ``{ip: (mac, interface)}`` for the complete entries of the kernel ARP table."""
+    entries = {}
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            next(f, None)  # Header
+            for line in f:
+                fields = line.split()
+                if len(fields) < 6:
+                    continue
+                ip, _, flags, mac, _, device = fields[:6]
+                if not int(flags, 16) & ATF_COM or mac == "00:00:00:00:00:00":
+                    continue
+                entries[ip] = (mac.lower(), device)
+    except FileNotFoundError:
+        pass  # Not Linux; nothing to read
+    return entries
+
+
+def read_routes(path: Path = ROUTE_TABLE) -> list[tuple[str, int, int]]:
+    """Return ``(interface, destination, mask)`` for every directly connected IPv4 route."""
+    routes = []
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            next(f, None)
+            for line in f:
+                fields = line.split()
+                if len(fields) < 8:
+                    continue
+                flags = int(fields[3], 16)
+                if not flags & RTF_UP or flags & RTF_GATEWAY:
+                    continue
+                # Addresses are in host byte order (little-endian) hex
+                dest = struct.unpack("!I", struct.pack("<I", int(fields[1], 16)))[0]
+                mask = struct.unpack("!I", struct.pack("<I", int(fields[7], 16)))[0]
+                routes.append((fields[0], dest, mask))
+    except FileNotFoundError:
+        pass  # Not Linux
+    return routes
+
+
+def local_interface(
+    ip: str, path: Path = ROUTE_TABLE, routes: list[tuple[str, int, int]] | None = None
+) -> str | None:
+    """
+    Return the interface with a directly connected route to ``ip``, if any.
+
+    Pass ``routes`` from ``read_routes()`` to look up many addresses
+    without re-reading the route table for each.
+    """
+    address = struct.unpack("!I", socket.inet_aton(ip))[0]
+    best, best_mask = None, -1
+    for interface, dest, mask in read_routes(path) if routes is None else routes:
+        if address & mask == dest and mask > best_mask:
+            best, best_mask = interface, mask
+    return best
+
+
+def connected_networks(path: Path = ROUTE_TABLE) -> list[tuple[str, str]]:
+    """Return ``(interface, CIDR)`` for every directly connected IPv4 route."""
+    networks = []
+    for interface, dest, mask in read_routes(path):
+        network = ipaddress.IPv4Network(
+            f"{ipaddress.IPv4Address(dest)}/{ipaddress.IPv4Address(mask)}", strict=False
+        )
+        if network.prefixlen == 0:
+            continue  # Default route via an interface, not a subnet
+        networks.append((interface, str(network)))
+    return networks
+
+
+def _interface_addresses(interface: str) -> tuple[bytes, bytes]:
+    """Return the (MAC, IPv4) of ``interface`` as raw bytes."""
+    import fcntl  # Unix only; ARP sweeps are Linux only anyway
+
+    mac_text = (SYS_NET / interface / "address").read_text(encoding="ascii").strip()
+    mac = bytes.fromhex(mac_text.replace(":", ""))
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        request = struct.pack("256s", interface[:15].encode())
+        ip = fcntl.ioctl(s.fileno(), SIOCGIFADDR, request)[20:24]
+    return mac, ip
+
+
+def _packet_socket() -> socket.socket:
+    """Open a raw packet socket receiving ARP frames (Linux, root or CAP_NET_RAW)."""
+    return socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ARP))
+
+
+def _ping_socket() -> socket.socket:
+    """Open an unprivileged ICMP echo socket (needs net.ipv4.ping_group_range on Linux)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    sock.setblocking(False)
+    return sock
+
+
+class _EchoReplies(asyncio.DatagramProtocol):
+    """Records the latency of the first echo reply from each address in ``sent``."""
+
+    def __init__(self, sent: dict[str, float], alive: dict[str, float]) -> None:
+        self.sent = sent
+        self.alive = alive
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        ip = addr[0]
+        if data and data[0] == 0 and ip in self.sent and ip not in self.alive:  # Echo reply
+            self.alive[ip] = time.monotonic() - self.sent[ip]
+
+    def error_received(self, exc: Exception) -> None:
+        pass  # e.g. network unreachable for one address; the others still count
+
+
+def arp_request(src_mac: bytes, src_ip: bytes, dst_ip: bytes) -> bytes:
+    """Build a broadcast Ethernet frame carrying an ARP who-has request."""
+    ethernet = b"\xff" * 6 + src_mac + struct.pack("!H", ETH_P_ARP)
+    arp = struct.pack("!HHBBH6s4s6s4s", 1, 0x0800, 6, 4, 1, src_mac, src_ip, b"\x00" * 6, dst_ip)
+    return ethernet + arp
+
+
+def parse_arp_reply(frame: bytes) -> tuple[str, str] | None:
+    """Return (ip, mac) of the sender if ``frame`` is an ARP reply."""
+    if len(frame) < 42 or frame[12:14] != struct.pack("!H", ETH_P_ARP):
+        return None
+    _, ptype, _, _, op, sha, spa, _, _ = struct.unpack("!HHBBH6s4s6s4s", frame[14:42])
+    if op != 2 or ptype != 0x0800:
+        return None
+    return socket.inet_ntoa(spa), ":".join(f"{b:02x}" for b in sha)
+
+
+def arp_sweep(
+    interface: str,
+    addresses: list[str],
+    timeout: float = 0.5,
+    rate: float | None = None,
+) -> dict[str, tuple[str, float]]:
+    """
+    Send an ARP request for every address on ``interface`` and collect replies.
+
+    Returns ``{ip: (mac, latency)}``. Needs a raw packet socket, i.e. Linux
+    and root or CAP_NET_RAW. Requests are paced to ``rate`` per second when
+    given; replies are awaited until ``timeout`` after the last request.
+    """
+    src_mac, src_ip = _interface_addresses(interface)
+    sock = _packet_socket()
+    try:
+        sock.bind((interface, 0))
+        sock.setblocking(False)
+        interval = 1.0 / rate if rate else 0.0
+        sent: dict[str, float] = {}
+        results: dict[str, tuple[str, float]] = {}
+        index = 0
+        next_send = time.monotonic()
+        deadline = None
+
+        while True:
+            now = time.monotonic()
+            blocked = False  # Send buffer full: select on writability, not a 0 s timeout
+            while index < len(addresses) and now >= next_send:
+                try:
+                    sock.send(arp_request(src_mac, src_ip, socket.inet_aton(addresses[index])))
+                except BlockingIOError:
+                    blocked = True  # Retry once the socket is writable again
+                    break
+                sent[addresses[index]] = now
+                index += 1
+                next_send = now + interval if interval else now
+            if index == len(addresses) and deadline is None:
+                deadline = now + timeout
+            if deadline is not None and (now >= deadline or len(results) == len(addresses)):
+                break
+
+            if deadline is not None:
+                wait = deadline - now
+            elif blocked:
+                wait = 0.05
+            else:
+                wait = min(max(0.0, next_send - now), 0.05)
+            readable, _, _ = select.select([sock], [sock] if blocked else [], [], wait)
+            if not readable:
+                continue
+            while True:
+                try:
+                    frame = sock.recv(65535)
+                except BlockingIOError:
+                    break
+                reply = parse_arp_reply(frame)
+                if reply and reply[0] in sent and reply[0] not in results:
+                    results[reply[0]] = (reply[1], time.monotonic() - sent[reply[0]])
+        return results
+    finally:
+        sock.close()
+
+
+class SweepEngine:
+    """
+    Discovers hosts without spawning nmap.
+
+    On-link addresses are resolved with raw ARP requests when the process may
+    open packet sockets. Other addresses, or all of them when unprivileged,
+    are probed with ICMP echo (unprivileged ping sockets) or, failing that,
+    TCP connects; MACs then come from the kernel ARP table those probes
+    populate. Only hosts whose MAC is known are returned, as with nmap.
+    """
+
+    METHODS = ("auto", "arp", "icmp", "tcp")
+    TCP_PORTS = (80, 443, 22, 445, 139, 53, 8080, 62078)
+
+    def __init__(
+        self,
+        method: str = "auto",
+        concurrency: int = 256,
+        rate: float | None = None,
+        timeout: float = 0.5,
+        tcp_ports: tuple[int, ...] = TCP_PORTS,
+        verbose: bool = False,
+    ) -> None:
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown sweep method {method!r}; expected one of {', '.join(self.METHODS)}")
+        self.method = method
+        self.concurrency = concurrency  # TCP connection attempts in flight
+        self.rate = rate  # Probes per second, None for unpaced
+        self.timeout = timeout  # Seconds to wait for replies
+        self.tcp_ports = tcp_ports
+        self.verbose = verbose
+
+    def sweep(self, targets: Iterable[str]) -> list[HostRecord]:
+        """Probe every address in ``targets`` and return the hosts that answered."""
+        return asyncio.run(self.sweep_async(targets))
+
+    async def sweep_async(self, targets: Iterable[str]) -> list[HostRecord]:
+        addresses = expand_targets(targets)
+        found: dict[str, tuple[str | None, float]] = {}  # ip -> (mac if known, latency)
+
+        remaining = addresses
+        if self.method in ("auto", "arp"):
+            remaining = await self._arp_phase(addresses, found)
+
+        if remaining and self.method != "arp":
+            alive = None
+            if self.method in ("auto", "icmp"):
+                try:
+                    alive = await self._icmp_sweep(remaining)
+                except OSError as e:
+                    # PermissionError without ping socket rights; others where unsupported
+                    if self.method == "icmp":
+                        raise RuntimeError(
+                            f"ICMP sweep not available ({e}); allow ping sockets "
+                            "(sysctl net.ipv4.ping_group_range) or use the tcp method"
+                        ) from e
+                    if self.verbose:
+                        print(f"ICMP sweep not available ({e}), falling back to TCP connect probes")
+            if alive is None:
+                alive = await self._tcp_sweep(remaining)
+            for ip, latency in alive.items():
+                found[ip] = (None, latency)
+
+        # Probed on-link hosts now have ARP entries, even without raw sockets
+        neighbors = read_arp_table() if any(mac is None for mac, _ in found.values()) else {}
+        records = []
+        for ip in addresses:
+            if ip not in found:
+                continue
+            mac, latency = found[ip]
+            mac = mac or neighbors.get(ip, (None,))[0]
+            if mac:
+                records.append(HostRecord(ip_address=ip, mac_address=mac, latency=latency))
+        return records
+
+    async def _arp_phase(self, addresses: list[str], found: dict) -> list[str]:
+        """ARP-sweep on-link addresses; return those left for other probes."""
+        by_interface: dict[str, list[str]] = {}
+        off_link = []
+        routes = read_routes()  # Once per sweep, not per address
+        for ip in addresses:
+            interface = local_interface(ip, routes=routes)
+            if interface is None:
+                off_link.append(ip)
+            else:
+                by_interface.setdefault(interface, []).append(ip)
+
+        loop = asyncio.get_running_loop()
+        for interface, ips in by_interface.items():
+            try:
+                replies = await loop.run_in_executor(
+                    None, arp_sweep, interface, ips, self.timeout, self.rate
+                )
+            except (PermissionError, AttributeError, OSError) as e:
+                # AttributeError: no AF_PACKET on this platform
+                if self.method == "arp":
+                    raise RuntimeError(
+                        f"ARP sweep on {interface} needs raw sockets (Linux, root or CAP_NET_RAW): {e}"
+                    ) from e
+                if self.verbose:
+                    print(f"ARP sweep unavailable on {interface} ({e}); probing instead")
+                off_link.extend(ips)
+                continue
+            for ip, (mac, latency) in replies.items():
+                found[ip] = (mac, latency)
+        if self.method == "arp" and off_link and self.verbose:
+            print(f"Skipping {len(off_link)} addresses with no directly connected interface")
+        return [] if self.method == "arp" else off_link
+
+    async def _pace(self) -> None:
+        if self.rate:
+            await asyncio.sleep(1.0 / self.rate)
+
+    async def _icmp_sweep(self, addresses: list[str]) -> dict[str, float]:
+        """Send one echo request per address over an unprivileged ping socket."""
+        loop = asyncio.get_running_loop()
+        sent: dict[str, float] = {}
+        alive: dict[str, float] = {}
+        sock = _ping_socket()
+        try:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _EchoReplies(sent, alive), sock=sock
+            )
+        except BaseException:
+            sock.close()
+            raise
+        try:
+            for seq, ip in enumerate(addresses):
+                # Ping sockets fill in the identifier and checksum
+                packet = struct.pack("!BBHHH", 8, 0, 0, 0, seq & 0xFFFF) + b"simple-lan-scanner"
+                sent[ip] = time.monotonic()
+                transport.sendto(packet, (ip, 0))
+                await self._pace()
+            deadline = time.monotonic() + self.timeout
+            while len(alive) < len(sent) and time.monotonic() < deadline:
+                await asyncio.sleep(min(0.02, max(0.0, deadline - time.monotonic())))
+        finally:
+            transport.close()
+        return alive
+
+    async def _tcp_sweep(self, addresses: list[str]) -> dict[str, float]:
+        """Consider a host alive if any probe port accepts or refuses a connection."""
+        # Bounds sockets, not hosts: each host tries every port at once
+        semaphore = asyncio.Semaphore(self.concurrency)
+        alive: dict[str, float] = {}
+
+        async def connect(ip: str, port: int) -> float | None:
+            """Return the connection latency if the port answered."""
+            async with semaphore:
+                if ip in alive:
+                    return None  # Another port already answered
+                start = time.monotonic()
+                try:
+                    _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), self.timeout)
+                except ConnectionRefusedError:
+                    return time.monotonic() - start  # A RST still proves the host is up
+                except OSError as e:
+                    if e.errno in (errno.EMFILE, errno.ENFILE):
+                        raise RuntimeError(
+                            f"Out of file descriptors with {self.concurrency} concurrent TCP probes; "
+                            "lower the sweep concurrency or raise the open file limit"
+                        ) from e
+                    return None
+                except asyncio.TimeoutError:
+                    return None
+                writer.close()
+                return time.monotonic() - start
+
+        async def probe(ip: str) -> None:
+            attempts = [asyncio.ensure_future(connect(ip, port)) for port in self.tcp_ports]
+            try:
+                for attempt in asyncio.as_completed(attempts):
+                    latency = await attempt
+                    if latency is not None:
+                        alive[ip] = latency
+                        return
+            finally:
+                for attempt in attempts:
+                    attempt.cancel()
+                await asyncio.gather(*attempts, return_exceptions=True)
+
+        tasks = []
+        try:
+            for ip in addresses:
+                tasks.append(asyncio.ensure_future(probe(ip)))
+                await self._pace()
+            await asyncio.gather(*tasks)
+        finally:
+            # One failed probe (e.g. out of descriptors) stops the rest
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return alive
@@ -0,0 +1,144 @@
+"""Tests for the asyncio NetworkMonitor, against a fake nmap script."""
+
+import asyncio
+import sys
+import time
+from contextlib import aclosing
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from simple_scanner.async_monitor import AsyncNetworkMonitor
+from simple_scanner.events import DeviceJoined
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason="fake nmap is a shell script")
+
+
+@pytest.fixture
+def fake_nmap(tmp_path):
+    """Write an executable standing in for nmap and make the monitor use it."""
+    def make(body):
+        script = tmp_path / "nmap"
+        script.write_text("#!/bin/sh\n" + body)
+        script.chmod(0o755)
+        return str(script)
+    return make
+
+
+def _monitor(nmap_path, **kwargs):
+    with patch('shutil.which', return_value=nmap_path):
+        return AsyncNetworkMonitor(network='192.168.1.0/24', use_persistence=False, **kwargs)
+
+
+class TestAsyncNetworkMonitor:
+    """Test cases for awaiting scans and streaming their results."""
+
+    def test_scan_updates_devices(self, fake_nmap, sample_nmap_output):
+        """Test that an awaited scan parses nmap's output and publishes events."""
+        monitor = _monitor(fake_nmap(f"cat <<'EOF'\n{sample_nmap_output}\nEOF\n"))
+
+        asyncio.run(monitor.ascan())
+
+        assert sorted(d.ip_address for d in monitor.devices()) == ['192.168.1.1', '192.168.1.100', '192.168.1.50']
+        assert all(isinstance(e, DeviceJoined) for e in monitor.events())
+
+    def test_scan_resolves_hostnames_without_nmap(self, fake_nmap, sample_nmap_output):
+        """Test that nmap gets -n and unnamed hosts are resolved before the scan finishes."""
+        monitor = _monitor(fake_nmap(f'[ "$2" = -n ] || exit 3\ncat <<\'EOF\'\n{sample_nmap_output}\nEOF\n'),
+                           resolve_hostnames=True)
+        resolved = {'aa:bb:cc:dd:ee:ff': 'router.lan'}
+
+        with patch.object(monitor.resolver, 'resolve_async', AsyncMock(return_value=resolved)) as resolve:
+            asyncio.run(monitor.ascan())
+
+        assert len(resolve.call_args[0][0]) == 2  # hostname.local came from nmap
+        assert {d.ip_address: d.hostname for d in monitor.devices()}['192.168.1.1'] == 'router.lan'
+
+    def test_scan_stream_yields_before_nmap_exits(self, fake_nmap):
+        """Test that devices arrive while nmap is still running and breaking off kills it."""
+        monitor = _monitor(fake_nmap(
+            "echo 'Nmap scan report for 192.168.1.1'\n"
+            "echo 'MAC Address: AA:BB:CC:DD:EE:FF (Router)'\n"
+            "exec sleep 5\n"
+        ))
+
+        async def first_device():
+            started = time.monotonic()
+            async with aclosing(monitor.ascan_stream()) as devices:
+                async for device in devices:
+                    return device, time.monotonic() - started
+
+        device, elapsed = asyncio.run(first_device())
+
+        assert device.mac_address == 'aa:bb:cc:dd:ee:ff'
+        assert elapsed < 2
+
+    def test_timeout_kills_scan(self, fake_nmap):
+        """Test that a scan exceeding its timeout raises RuntimeError."""
+        monitor = _monitor(fake_nmap("exec sleep 5\n"))
+
+        started = time.monotonic()
+        with pytest.raises(RuntimeError, match="timed out"):
+            asyncio.run(monitor.ascan(timeout=0.2))
+        assert time.monotonic() - started < 2
+
+    def test_failure_reports_stderr(self, fake_nmap):
+        """Test that a non-zero exit surfaces nmap's error message."""
+        monitor = _monitor(fake_nmap("echo 'Failed to resolve' >&2\nexit 1\n"))
+
+        with pytest.raises(RuntimeError, match="exit code 1.*Failed to resolve"):
+            asyncio.run(monitor.ascan())
+
+    def test_many_monitors_share_one_loop(self, fake_nmap, sample_nmap_output):
+        """Test that concurrent scans overlap instead of running back to back."""
+        nmap = fake_nmap(f"sleep 0.5\ncat <<'EOF'\n{sample_nmap_output}\nEOF\n")
+        monitors = [_monitor(nmap) for _ in range(4)]
+
+        async def scan_all():
+            await asyncio.gather(*(m.ascan() for m in monitors))
+
+        started = time.monotonic()
+        asyncio.run(scan_all())
+
+        assert time.monotonic() - started < 1.5
+        assert all(len(m.devices()) == 3 for m in monitors)
+
+    def test_sharded_scan(self, fake_nmap):
+        """Test that shards run as separate nmap processes and all results are merged."""
+        # Report the shard's first address with a MAC derived from its third octet
+        monitor = _monitor(fake_nmap(
+            'octet=$(echo "$2" | cut -d. -f3)\n'
+            'echo "Nmap scan report for 10.0.$octet.1"\n'
+            'echo "MAC Address: 02:00:00:00:00:0$octet"\n'
+        ), max_workers=2)
+        monitor.network = '10.0.0.0/22'
+
+        asyncio.run(monitor.ascan())
+
+        assert sorted(d.ip_address for d in monitor.devices()) == ['10.0.0.1', '10.0.1.1', '10.0.2.1', '10.0.3.1']
+
+    def test_scan_of_one_network_leaves_others_alone(self, fake_nmap, sample_nmap_output, tmp_path):
+        """Test that ascan(network=...) scans only that network and limits departures to it."""
+        args = tmp_path / "args"
+        monitor = _monitor(fake_nmap(
+            f'echo "$@" > {args}\n'
+            "echo 'Nmap scan report for 192.168.1.1'\n"
+            "echo 'MAC Address: AA:BB:CC:DD:EE:FF (Router Manufacturer)'\n"
+        ), remove_stale=True)
+        monitor.network = '192.168.1.0/24,10.0.0.0/24'
+        monitor._parse("Nmap scan report for 10.0.0.5\nMAC Address: 02:00:00:00:00:05 (Other)\n"
+                       + sample_nmap_output)
+
+        asyncio.run(monitor.ascan(network='192.168.1.0/24'))
+
+        assert args.read_text().split()[-1] == '192.168.1.0/24'
+        assert sorted(d.ip_address for d in monitor.devices()) == ['10.0.0.5', '192.168.1.1']
+        assert sorted(e.device.ip_address for e in monitor.events()) == ['192.168.1.100', '192.168.1.50']
+
+    def test_synchronous_scan_is_still_available(self, fake_nmap, sample_nmap_output):
+        """Test that the inherited scan() keeps its signature and runs to completion."""
+        monitor = _monitor(fake_nmap(f"cat <<'EOF'\n{sample_nmap_output}\nEOF\n"))
+
+        monitor.scan(network='192.168.1.0/24', max_workers=1)
+
+        assert len(monitor.devices()) == 3
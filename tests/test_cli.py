@@ -147,7 +147,7 @@ class TestCLI:
         # Setup mock
         mock_monitor = MagicMock()
         mock_monitor.network = '192.168.1.0/24'
-        mock_monitor.devices.return_value = []
+        mock_monitor.find_devices.return_value = []
         mock_monitor_class.return_value = mock_monitor
         
         # Make sleep raise KeyboardInterrupt to exit the loop
@@ -177,7 +177,7 @@ class TestCLI:
         # Setup mock
         mock_monitor = MagicMock()
         mock_monitor.network = '192.168.1.0/24'
-        mock_monitor.devices.return_value = []
+        mock_monitor.find_devices.return_value = []
         mock_monitor_class.return_value = mock_monitor
         
         # Make sleep raise KeyboardInterrupt after first iteration
@@ -290,7 +290,7 @@ class TestCLI:
         mock_monitor = MagicMock()
         mock_monitor.network = '192.168.1.0/24'
         
-        # Create test devices with different last_seen times
+        # Create an online test device
         from datetime import datetime, timezone, timedelta
         now = datetime.now(timezone.utc)
         online_device = MagicMock()
@@ -300,14 +300,7 @@ class TestCLI:
         online_device.manufacturer = "Test"
         online_device.last_seen = now - timedelta(seconds=30)  # Online
         
-        offline_device = MagicMock()
-        offline_device.mac_address = "11:22:33:44:55:66"
-        offline_device.ip_address = "192.168.1.101"
-        offline_device.hostname = "offline-device"
-        offline_device.manufacturer = "Test"
-        offline_device.last_seen = now - timedelta(seconds=150)  # Offline
-        
-        mock_monitor.devices.return_value = [online_device, offline_device]
+        mock_monitor.find_devices.return_value = [online_device]
         mock_monitor_class.return_value = mock_monitor
         mock_monitor.get_device_header.return_value = "Header"
         
@@ -320,6 +313,13 @@ class TestCLI:
         
         assert result.exit_code == 0
         assert 'Stopped by user' in result.output
+        assert 'Online devices: 1' in result.output
+
+        # The online filter is handed to find_devices rather than applied to every device
+        filters = mock_monitor.find_devices.call_args.kwargs
+        assert filters['search'] is None
+        assert now - timedelta(seconds=125) < filters['seen_since'] <= datetime.now(timezone.utc) - timedelta(seconds=120)
+        mock_monitor.devices.assert_not_called()
         
         # Verify NetworkMonitor was called correctly
         mock_monitor_class.assert_called_once_with(
@@ -348,14 +348,7 @@ class TestCLI:
         device1.manufacturer = "Netgear"
         device1.last_seen = now
         
-        device2 = MagicMock()
-        device2.mac_address = "11:22:33:44:55:66"
-        device2.ip_address = "192.168.1.101"
-        device2.hostname = "laptop"
-        device2.manufacturer = "Apple"
-        device2.last_seen = now
-        
-        mock_monitor.devices.return_value = [device1, device2]
+        mock_monitor.find_devices.return_value = [device1]
         mock_monitor_class.return_value = mock_monitor
         mock_monitor.get_device_header.return_value = "Header"
         
@@ -368,6 +361,11 @@ class TestCLI:
         
         assert result.exit_code == 0
         assert 'Stopped by user' in result.output
+        assert 'Total devices: 1' in result.output
+
+        # The JSON backend also searches through find_devices (and its index)
+        mock_monitor.find_devices.assert_called_with(search='router', seen_since=None)
+        mock_monitor.devices.assert_not_called()
         
         # Verify NetworkMonitor was called correctly
         mock_monitor_class.assert_called_once_with(
@@ -396,14 +394,7 @@ class TestCLI:
         device1.manufacturer = "Netgear"
         device1.last_seen = now - timedelta(seconds=30)  # Online
         
-        device2 = MagicMock()
-        device2.mac_address = "11:22:33:44:55:66"
-        device2.ip_address = "192.168.1.101"
-        device2.hostname = "router-old"
-        device2.manufacturer = "Netgear"
-        device2.last_seen = now - timedelta(seconds=150)  # Offline
-        
-        mock_monitor.devices.return_value = [device1, device2]
+        mock_monitor.find_devices.return_value = [device1]
         mock_monitor_class.return_value = mock_monitor
         mock_monitor.get_device_header.return_value = "Header"
         
@@ -416,4 +407,270 @@ class TestCLI:
         
         assert result.exit_code == 0
         assert 'Stopped by user' in result.output
-        assert 'Online devices: 1' in result.output  # Only online router should be shown
\ No newline at end of file
+        assert 'Online devices: 1' in result.output  # Only online router should be shown
+        filters = mock_monitor.find_devices.call_args.kwargs
+        assert filters['search'] == 'router'
+        assert filters['seen_since'] is not None
+
+class TestCLIBackend:
+    """Test cases for selecting the storage backend from the CLI."""
+
+    @patch('simple_scanner.cli.NetworkMonitor')
+    @patch('simple_scanner.cli.time.sleep')
+    def test_monitor_sqlite_uses_find_devices(self, mock_sleep, mock_monitor_class):
+        """Test that the SQLite backend filters through find_devices."""
+        mock_monitor = MagicMock()
+        mock_monitor.network = '192.168.1.0/24'
+        mock_monitor.find_devices.return_value = []
+        mock_monitor_class.return_value = mock_monitor
+        mock_sleep.side_effect = KeyboardInterrupt()
+
+        runner = CliRunner()
+        result = runner.invoke(app, ['monitor', '--backend', 'sqlite', '--search', 'router'])
+
+        assert result.exit_code == 0
+        assert mock_monitor_class.call_args.kwargs['backend'] == 'sqlite'
+        mock_monitor.find_devices.assert_called_with(search='router', seen_since=None)
+        mock_monitor.devices.assert_not_called()
+
+    @patch('simple_scanner.cli.NetworkMonitor')
+    @patch('simple_scanner.cli.time.sleep')
+    def test_monitor_saves_in_background(self, mock_sleep, mock_monitor_class):
+        """Test that monitor throttles saves, passes the fsync policy and flushes on exit."""
+        mock_monitor = MagicMock()
+        mock_monitor.network = '192.168.1.0/24'
+        mock_monitor.find_devices.return_value = []
+        mock_monitor_class.return_value = mock_monitor
+        mock_sleep.side_effect = KeyboardInterrupt()
+
+        runner = CliRunner()
+        result = runner.invoke(app, ['monitor', '--save-interval', '30', '--fsync', 'always'])
+
+        assert result.exit_code == 0
+        assert mock_monitor_class.call_args.kwargs['fsync'] == 'always'
+        assert mock_monitor.save_interval == 30
+        mock_monitor.close.assert_called_once()
+
+
+class TestCLIPassive:
+    """Test cases for passive neighbor-table refreshes between scans."""
+
+    @patch('simple_scanner.cli.NetworkMonitor')
+    @patch('simple_scanner.cli.time.sleep')
+    def test_monitor_refreshes_between_scans(self, mock_sleep, mock_monitor_class):
+        """Test that --passive refreshes from the neighbor table while waiting."""
+        mock_monitor = MagicMock()
+        mock_monitor.network = '192.168.1.0/24'
+        mock_monitor.find_devices.return_value = []
+        mock_monitor_class.return_value = mock_monitor
+        mock_sleep.side_effect = [None, None, KeyboardInterrupt()]
+
+        runner = CliRunner()
+        result = runner.invoke(app, ['monitor', '--interval', '60', '--passive', '10'])
+
+        assert result.exit_code == 0
+        assert mock_monitor.scan.call_count == 1
+        assert mock_monitor.refresh_neighbors.call_count == 2
+        mock_sleep.assert_called_with(10)
+
+
+class TestCLIAdaptive:
+    """Test cases for adaptive probing between displays."""
+
+    @patch('simple_scanner.cli.NetworkMonitor')
+    @patch('simple_scanner.cli.time.sleep')
+    def test_monitor_probes_instead_of_rescanning(self, mock_sleep, mock_monitor_class):
+        """Test that --probe-budget scans once, then probes scheduled batches."""
+        mock_monitor = MagicMock()
+        mock_monitor.network = '192.168.1.0/29'
+        mock_monitor.devices.return_value = []
+        mock_monitor.find_devices.return_value = []
+        mock_monitor.probe.return_value = {'192.168.1.1'}
+        mock_monitor_class.return_value = mock_monitor
+        mock_sleep.side_effect = [None, None, KeyboardInterrupt()]
+
+        runner = CliRunner()
+        result = runner.invoke(app, ['monitor', '--probe-budget', '2'])
+
+        assert result.exit_code == 0
+        assert mock_monitor.scan.call_count == 1
+        # Everything was just scanned, so nothing is due yet
+        mock_monitor.probe.assert_not_called()
+
+    def test_monitor_rejects_bad_dhcp_range(self):
+        """Test that an invalid --dhcp-range is reported."""
+        with patch('simple_scanner.cli.NetworkMonitor') as mock_monitor_class:
+            mock_monitor_class.return_value.network = '192.168.1.0/24'
+            result = CliRunner().invoke(app, ['monitor', '--probe-budget', '2', '--dhcp-range', 'x-y'])
+
+        assert result.exit_code == 1
+        assert 'Invalid address range' in result.output
+
+
+class TestCLIMultiNetwork:
+    """Test cases for monitoring several networks from one process."""
+
+    @patch('simple_scanner.cli.MultiNetworkMonitor')
+    @patch('simple_scanner.cli.time.sleep')
+    def test_monitor_targets_scan_when_due(self, mock_sleep, mock_multi_class):
+        """Test that --target builds per-network schedules and sleeps until the next is due."""
+        mock_multi = MagicMock()
+        mock_multi.targets = []
+        mock_multi.monitor.find_devices.return_value = []
+        mock_multi.seconds_until_due.return_value = 7
+        mock_multi_class.return_value = mock_multi
+        mock_sleep.side_effect = [None, KeyboardInterrupt()]
+
+        runner = CliRunner()
+        result = runner.invoke(app, ['monitor', '--target', '10.0.0.0/24', '--target', '10.1.0.0/22:300:4'])
+
+        assert result.exit_code == 0
+        targets = mock_multi_class.call_args[0][0]
+        assert [(t.network, t.interval, t.max_workers) for t in targets] == [
+            ('10.0.0.0/24', 30, 1), ('10.1.0.0/22', 300, 4)
+        ]
+        assert mock_multi.run_due.call_count == 2
+        mock_sleep.assert_called_with(7)
+
+    def test_monitor_rejects_bad_target(self):
+        """Test that a malformed --target is a usage error."""
+        result = CliRunner().invoke(app, ['monitor', '--target', '10.0.0.0/24:soon'])
+
+        assert result.exit_code == 2
+        assert 'Invalid target' in result.output
+
+    @pytest.mark.parametrize("option", [['--passive', '15'], ['--probe-budget', '2'], ['--network', '10.0.0.0/24']])
+    def test_monitor_rejects_single_network_options_with_targets(self, option):
+        """Test that options only the single-network loop honours aren't silently ignored."""
+        result = CliRunner().invoke(app, ['monitor', '--target', '10.0.0.0/24', *option])
+
+        assert result.exit_code == 2
+        assert "can't be combined" in result.output
+
+
+class TestCLIOuiUpdate:
+    """Test cases for rebuilding the offline MAC vendor table."""
+
+    def test_oui_update_from_file(self, tmp_path):
+        """Test that the given files are compiled into the user's table."""
+        source = tmp_path / "nmap-mac-prefixes"
+        source.write_text("B827EB Raspberry Pi Foundation\n3C5AB4 Google\n")
+        target = tmp_path / "oui.bin"
+
+        with patch('simple_scanner.cli.get_oui_file', return_value=target):
+            result = CliRunner().invoke(app, ['oui-update', str(source)])
+
+        assert result.exit_code == 0
+        assert '2 prefixes from 1 file(s)' in result.output
+        assert target.exists()
+
+    def test_oui_update_without_sources(self, tmp_path):
+        """Test that a missing vendor database is a usage error."""
+        with patch('simple_scanner.cli.DEFAULT_SOURCES', (tmp_path / "missing",)):
+            result = CliRunner().invoke(app, ['oui-update'])
+
+        assert result.exit_code == 2
+        assert 'No vendor database found' in result.output
+
+    def test_oui_update_with_empty_file(self, tmp_path):
+        """Test that a file without assignments is reported as an error."""
+        source = tmp_path / "empty"
+        source.write_text("# nothing\n")
+
+        with patch('simple_scanner.cli.get_oui_file', return_value=tmp_path / "oui.bin"):
+            result = CliRunner().invoke(app, ['oui-update', str(source)])
+
+        assert result.exit_code == 1
+        assert 'No OUI assignments' in result.output
+
+
+class TestCLIDiff:
+    """Test cases for comparing snapshot exports."""
+
+    @staticmethod
+    def _write(path, records):
+        path.write_text(json.dumps(records))
+        return str(path)
+
+    def test_diff_two_snapshots(self, tmp_path):
+        """Test that added, removed and changed devices are listed with a summary."""
+        old = self._write(tmp_path / "a.json", [{"mac_address": "aa:00:00:00:00:01", "ip_address": "10.0.0.1"},
+                                               {"mac_address": "aa:00:00:00:00:02", "ip_address": "10.0.0.2"}])
+        new = self._write(tmp_path / "b.json", [{"mac_address": "aa:00:00:00:00:01", "ip_address": "10.0.0.9"},
+                                               {"mac_address": "aa:00:00:00:00:03", "ip_address": "10.0.0.3"}])
+
+        result = CliRunner().invoke(app, ['diff', old, new])
+
+        assert result.exit_code == 0
+        assert result.output.splitlines() == [
+            "~ aa:00:00:00:00:01  ip_address: 10.0.0.1 → 10.0.0.9",
+            "- aa:00:00:00:00:02  10.0.0.2",
+            "+ aa:00:00:00:00:03  10.0.0.3",
+            "1 added, 1 removed, 1 changed",
+        ]
+
+    def test_diff_series_as_json_with_exit_code(self, tmp_path):
+        """Test that each snapshot is compared with the previous one."""
+        paths = [self._write(tmp_path / f"{i}.json", [{"mac_address": f"aa:00:00:00:00:0{n}", "ip_address": "10.0.0.1"}
+                                                      for n in range(i + 1)]) for i in range(3)]
+
+        result = CliRunner().invoke(app, ['diff', *paths, '--format', 'json', '--exit-code'])
+
+        assert result.exit_code == 1
+        changes = [json.loads(line) for line in result.output.splitlines()]
+        assert [(c["kind"], c["mac_address"], c["old_snapshot"]) for c in changes] == [
+            ("added", "aa:00:00:00:00:01", paths[0]), ("added", "aa:00:00:00:00:02", paths[1])
+        ]
+
+    def test_diff_needs_two_snapshots(self, tmp_path):
+        """Test that a single snapshot is a usage error."""
+        result = CliRunner().invoke(app, ['diff', self._write(tmp_path / "a.json", [])])
+
+        assert result.exit_code == 2
+
+    def test_diff_invalid_export(self, tmp_path):
+        """Test that an unreadable export is reported."""
+        bad = tmp_path / "bad.json"
+        bad.write_text("[{")
+
+        result = CliRunner().invoke(app, ['diff', str(bad), self._write(tmp_path / "a.json", [])])
+
+        assert result.exit_code == 1
+        assert 'Could not compare' in result.output
+
+
+class TestCLIExportFormats:
+    """Test cases for scan output formats beyond JSON and CSV."""
+
+    @patch('simple_scanner.cli.NetworkMonitor')
+    def test_scan_to_ndjson(self, mock_monitor_class, tmp_path):
+        """Test that other supported suffixes go through the generic exporter."""
+        mock_monitor = MagicMock()
+        mock_monitor_class.return_value = mock_monitor
+        output_file = tmp_path / "devices.ndjson"
+
+        result = CliRunner().invoke(app, ['scan', '--out', str(output_file)])
+
+        assert result.exit_code == 0
+        mock_monitor.export.assert_called_once_with(output_file)
+
+    @patch('simple_scanner.cli.NetworkMonitor')
+    def test_unknown_suffix_is_rejected_before_scanning(self, mock_monitor_class):
+        """Test that a bad --out doesn't cost a scan."""
+        result = CliRunner().invoke(app, ['scan', '--out', 'devices.txt'])
+
+        assert result.exit_code == 1
+        assert '.ndjson' in result.output
+        mock_monitor_class.assert_not_called()
+
+    @patch('simple_scanner.cli.NetworkMonitor')
+    def test_columnar_export_without_pyarrow(self, mock_monitor_class, tmp_path):
+        """Test that a missing optional dependency is reported, not raised."""
+        mock_monitor = MagicMock()
+        mock_monitor.export.side_effect = RuntimeError("Parquet and Arrow export need pyarrow")
+        mock_monitor_class.return_value = mock_monitor
+
+        result = CliRunner().invoke(app, ['scan', '--out', str(tmp_path / "devices.parquet")])
+
+        assert result.exit_code == 1
+        assert 'pyarrow' in result.output
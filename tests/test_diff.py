@@ -0,0 +1,144 @@
+"""Tests for comparing device exports."""
+
+import datetime
+import json
+
+import pytest
+
+from simple_scanner.diff import DeviceDiff, diff_snapshots, read_export
+from simple_scanner.models import Device
+from simple_scanner.scanner import NetworkMonitor
+
+
+def _devices(*specs):
+    stamp = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    return [Device(mac, ip, hostname, vendor, stamp, stamp) for mac, ip, hostname, vendor in specs]
+
+
+OLD = _devices(
+    ("aa:aa:aa:00:00:01", "10.0.0.1", "router", "Netgear"),
+    ("aa:aa:aa:00:00:02", "10.0.0.2", None, "Apple"),
+    ("aa:aa:aa:00:00:03", "10.0.0.3", "nas", None),
+)
+NEW = _devices(
+    ("AA:AA:AA:00:00:01", "10.0.0.1", "router", "Netgear"),
+    ("aa:aa:aa:00:00:02", "10.0.0.20", "phone", "Apple"),
+    ("aa:aa:aa:00:00:04", "10.0.0.4", None, None),
+)
+
+
+def _export(tmp_path, name, devices):
+    """Write ``devices`` the way NetworkMonitor.to_json/to_csv does."""
+    monitor = NetworkMonitor(network='10.0.0.0/24', use_persistence=False)
+    monitor._devices = {d.mac_address: d for d in devices}
+    path = tmp_path / name
+    if path.suffix == ".csv":
+        monitor.to_csv(path)
+    else:
+        monitor.to_json(path)
+    return path
+
+
+EXPECTED = [
+    DeviceDiff("changed", "aa:aa:aa:00:00:02",
+               {"ip_address": "10.0.0.2", "hostname": None, "manufacturer": "Apple", "network": None},
+               {"ip_address": "10.0.0.20", "hostname": "phone", "manufacturer": "Apple", "network": None}),
+    DeviceDiff("removed", "aa:aa:aa:00:00:03",
+               {"ip_address": "10.0.0.3", "hostname": "nas", "manufacturer": None, "network": None}, None),
+    DeviceDiff("added", "aa:aa:aa:00:00:04", None,
+               {"ip_address": "10.0.0.4", "hostname": None, "manufacturer": None, "network": None}),
+]
+
+
+def _without_network(diff):
+    """``diff`` as seen when a CSV export, which has no network column, is involved."""
+    old, new = ({k: v for k, v in f.items() if k != "network"} if f else f for f in (diff.old, diff.new))
+    return DeviceDiff(diff.kind, diff.mac_address, old, new)
+
+
+class TestReadExport:
+    """Test cases for streaming exports."""
+
+    def test_json_array_across_chunks(self, tmp_path, mock_nmap_executable):
+        """Test that objects split over read chunks are decoded."""
+        path = _export(tmp_path, "a.json", OLD)
+
+        assert [r["mac_address"] for r in read_export(path, chunk_size=7)] == [d.mac_address for d in OLD]
+
+    def test_ndjson(self, tmp_path):
+        """Test that one object per line is read as well."""
+        path = tmp_path / "a.ndjson"
+        path.write_text('{"mac_address": "aa:aa:aa:00:00:01"}\n{"mac_address": "aa:aa:aa:00:00:02"}\n')
+
+        assert len(list(read_export(path, chunk_size=5))) == 2
+
+    def test_csv_empty_cells_are_none(self, tmp_path, mock_nmap_executable):
+        """Test that CSV's empty strings read back as missing values."""
+        path = _export(tmp_path, "a.csv", OLD)
+
+        assert list(read_export(path))[1]["hostname"] is None
+
+    def test_truncated_json(self, tmp_path):
+        """Test that a cut-off export is reported."""
+        path = tmp_path / "a.json"
+        path.write_text('[{"mac_address": "aa:aa:aa:00:00:01"}, {"mac_add')
+
+        with pytest.raises(ValueError, match="Invalid device export"):
+            list(read_export(path))
+
+
+class TestDiffSnapshots:
+    """Test cases for the hash and sorted-merge diffs."""
+
+    @pytest.mark.parametrize("method", ["hash", "merge"])
+    @pytest.mark.parametrize("suffixes", [(".json", ".json"), (".csv", ".json"), (".json", ".csv")])
+    def test_added_removed_changed(self, tmp_path, mock_nmap_executable, method, suffixes):
+        """Test that both methods agree across formats and ignore MAC case and timestamps."""
+        old = _export(tmp_path, "old" + suffixes[0], OLD)
+        new = _export(tmp_path, "new" + suffixes[1], NEW)
+
+        expected = EXPECTED if ".csv" not in suffixes else [_without_network(d) for d in EXPECTED]
+
+        assert list(diff_snapshots(old, new, method=method, run_size=2)) == expected
+
+    def test_csv_against_json_skips_missing_columns(self, tmp_path, mock_nmap_executable):
+        """Test that the network column CSV exports lack isn't reported as a change."""
+        devices = _devices(("aa:aa:aa:00:00:01", "10.0.0.1", "router", "Netgear"))
+        devices[0].network = "10.0.0.0/24"
+        old = _export(tmp_path, "old.csv", devices)
+        new = _export(tmp_path, "new.json", devices)
+
+        assert list(diff_snapshots(old, new)) == []
+        assert list(diff_snapshots(new, old, fields=["network"])) == []
+
+    def test_changes_and_fields(self, tmp_path, mock_nmap_executable):
+        """Test that only the chosen fields are compared."""
+        old = _export(tmp_path, "old.json", OLD)
+        new = _export(tmp_path, "new.json", NEW)
+
+        diffs = list(diff_snapshots(old, new, fields=["manufacturer"]))
+
+        assert [d.kind for d in diffs] == ["removed", "added"]
+        assert EXPECTED[0].changes() == {"ip_address": ("10.0.0.2", "10.0.0.20"), "hostname": (None, "phone")}
+
+    def test_merge_of_many_runs_matches_hash(self, tmp_path):
+        """Test that an external sort over many small runs gives the in-memory result."""
+        old = [{"mac_address": f"02:00:00:00:{i // 256:02x}:{i % 256:02x}", "ip_address": f"10.0.{i // 256}.{i % 256}"}
+               for i in range(0, 1000, 3)][::-1]
+        new = [{**r, "ip_address": "10.9.9.9"} if i % 5 == 0 else r for i, r in enumerate(old) if i % 7]
+        new.append({"mac_address": "02:00:00:ff:ff:ff", "ip_address": "10.255.255.255"})
+        paths = []
+        for name, records in (("old.json", old), ("new.json", new)):
+            paths.append(tmp_path / name)
+            paths[-1].write_text(json.dumps(records))
+
+        merged = list(diff_snapshots(*paths, method="merge", run_size=10))
+
+        assert merged == list(diff_snapshots(*paths, method="hash"))
+        assert {d.kind for d in merged} == {"added", "removed", "changed"}
+
+    def test_unknown_method(self, tmp_path, mock_nmap_executable):
+        """Test that an unknown method is rejected."""
+        path = _export(tmp_path, "a.json", OLD)
+        with pytest.raises(ValueError, match="Unknown diff method"):
+            diff_snapshots(path, path, method="bloom")
@@ -0,0 +1,123 @@
+"""Tests for the streaming device exporters."""
+
+import csv
+import datetime
+import io
+import json
+
+import pytest
+
+from simple_scanner.diff import read_export
+from simple_scanner.export import export_devices, write_csv, write_json, write_ndjson
+from simple_scanner.models import Device
+
+UTC = datetime.timezone.utc
+
+
+@pytest.fixture
+def devices():
+    """Devices sharing one scan timestamp, with and without optional fields."""
+    seen = datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=UTC)
+    added = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+    return [
+        Device("aa:bb:cc:dd:ee:01", "10.0.0.1", "router.lan", "Netgear", added, seen, "10.0.0.0/24"),
+        Device("aa:bb:cc:dd:ee:02", "10.0.0.2", None, None, seen, seen),
+        Device("aa:bb:cc:dd:ee:03", "10.0.0.3", 'Zoë\'s "iPad"', "Apple, Inc.", seen, seen),
+    ]
+
+
+class TestWriters:
+    """Test cases for the JSON, NDJSON and CSV writers."""
+
+    def test_json_matches_indented_dump(self, devices):
+        """Test that streamed JSON is byte-identical to json.dump(indent=2)."""
+        for subset in (devices, devices[:1], []):
+            out = io.StringIO()
+            write_json(iter(subset), out)
+            assert out.getvalue() == json.dumps([d.to_dict() for d in subset], indent=2)
+
+    def test_ndjson_one_object_per_line(self, devices):
+        """Test that every device is one compact line with all fields present."""
+        out = io.StringIO()
+        write_ndjson(iter(devices), out)
+
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 3 and all(": " not in line for line in lines)
+        records = [json.loads(line) for line in lines]
+        assert records[1]["network"] is None
+        assert [Device.from_dict(r).to_dict() for r in records] == [d.to_dict() for d in devices]
+
+    def test_csv_matches_dict_writer(self, devices):
+        """Test that the CSV rows, and the header without network, are what csv.DictWriter wrote before."""
+        fieldnames = ['mac_address', 'ip_address', 'hostname', 'manufacturer', 'date_added', 'last_seen']
+        expected = io.StringIO()
+        writer = csv.DictWriter(expected, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(d.to_dict() for d in devices)
+
+        out = io.StringIO()
+        write_csv(iter(devices), out)
+        assert out.getvalue() == expected.getvalue()
+
+    def test_equal_instants_keep_their_offsets(self):
+        """Test that cached timestamp text isn't reused across time zones."""
+        utc = datetime.datetime(2025, 1, 1, 12, tzinfo=UTC)
+        cest = utc.astimezone(datetime.timezone(datetime.timedelta(hours=2)))
+        out = io.StringIO()
+        write_ndjson([Device("aa:bb:cc:dd:ee:01", "10.0.0.1", date_added=utc, last_seen=cest)], out)
+
+        record = json.loads(out.getvalue())
+        assert (record["date_added"], record["last_seen"]) == ("2025-01-01T12:00:00+00:00", "2025-01-01T14:00:00+02:00")
+
+
+class TestExportDevices:
+    """Test cases for choosing the format from the file name."""
+
+    @pytest.mark.parametrize("name", ["out.json", "out.ndjson", "out.jsonl", "out.csv"])
+    def test_round_trip_by_suffix(self, devices, tmp_path, name):
+        """Test that every text format reads back as the same devices (CSV without network)."""
+        path = tmp_path / name
+        export_devices(devices, path)
+
+        expected = [d.to_dict() for d in devices]
+        if name.endswith(".csv"):
+            for record in expected:
+                record.pop("network", None)
+        assert [Device.from_dict(r).to_dict() for r in read_export(path)] == expected
+
+    def test_unknown_suffix(self, devices, tmp_path):
+        """Test that an unknown format is rejected before anything is written."""
+        with pytest.raises(ValueError, match="Unknown export format"):
+            export_devices(devices, tmp_path / "out.txt")
+        assert not (tmp_path / "out.txt").exists()
+
+    @pytest.mark.parametrize("name", ["out.parquet", "out.arrow"])
+    def test_columnar_formats(self, devices, tmp_path, name):
+        """Test that Parquet and Arrow files keep typed UTC timestamps."""
+        pa = pytest.importorskip("pyarrow")
+        path = tmp_path / name
+        export_devices(devices, path)
+
+        if name.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            table = pq.read_table(path)
+        else:
+            table = pa.ipc.open_file(str(path)).read_all()
+        assert table.schema.field("last_seen").type == pa.timestamp("us", tz="UTC")
+        assert table.column("mac_address").to_pylist() == [d.mac_address for d in devices]
+        assert table.column("date_added").to_pylist()[0] == devices[0].date_added
+        assert table.column("hostname").to_pylist()[1] is None
+
+    def test_columnar_without_pyarrow(self, devices, tmp_path, monkeypatch):
+        """Test that a missing pyarrow is reported as a RuntimeError."""
+        import builtins
+        real_import = builtins.__import__
+
+        def no_pyarrow(name, *args, **kwargs):
+            if name.startswith("pyarrow"):
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", no_pyarrow)
+        with pytest.raises(RuntimeError, match="pyarrow"):
+            export_devices(devices, tmp_path / "out.parquet")
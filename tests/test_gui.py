@@ -4,8 +4,16 @@ import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone, timedelta
 import tkinter as tk
+import threading
 
 from simple_scanner.models import Device
+from simple_scanner.gui import (
+    ADAPTIVE_TICK_MS,
+    DeviceTreeRows,
+    ModernNetworkMonitorGUI,
+    ScanExecutor,
+    VirtualDeviceRows,
+)
 
 
 class TestGUIFeatures:
@@ -164,4 +172,351 @@ class TestGUIFeatures:
         # Toggle back to scanning
         scanning = True
         button_text = "Stop Scanning" if scanning else "Start Scanning"
-        assert button_text == "Stop Scanning"
\ No newline at end of file
+        assert button_text == "Stop Scanning"
+
+
+class FakeTree:
+    """Minimal stand-in for ttk.Treeview that records every row operation."""
+
+    def __init__(self):
+        self.children = []
+        self.items = {}
+        self.calls = []
+
+    def detach(self, iid):
+        self.calls.append(("detach", iid))
+        if iid in self.children:
+            self.children.remove(iid)
+
+    def move(self, iid, parent, index):
+        self.calls.append(("move", iid))
+        if iid in self.children:
+            self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def delete(self, iid):
+        self.calls.append(("delete", iid))
+        self.detach(iid)
+        del self.items[iid]
+
+    def get_children(self):
+        return list(self.children)
+
+    def cget(self, option):
+        return {"height": 20}[option]
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, items):
+        self.selected = tuple(items)
+
+    selected = ()
+    _next_id = 0
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        if iid is None:
+            FakeTree._next_id += 1
+            iid = f"I{FakeTree._next_id}"
+        self.calls.append(("insert", iid))
+        self.items[iid] = (values, tags)
+        self.children.insert(len(self.children) if index == "end" else index, iid)
+        return iid
+
+    def item(self, iid, values=(), tags=()):
+        self.calls.append(("item", iid))
+        self.items[iid] = (values, tags)
+
+
+class TestDeviceTreeRows:
+    """Test cases for incremental Treeview synchronisation."""
+
+    @staticmethod
+    def make_devices(count, now):
+        return [
+            Device(f"aa:bb:cc:dd:{n // 256:02x}:{n % 256:02x}", f"10.0.{n // 256}.{n % 256}",
+                   date_added=now - timedelta(days=1), last_seen=now)
+            for n in range(count)
+        ]
+
+    def test_initial_sync_inserts_sorted_rows(self):
+        """Test that the first sync inserts every visible device in sort order."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(5, now)[::-1]
+        tree = FakeTree()
+
+        shown = DeviceTreeRows(tree).sync(devices, now, lambda d: True)
+
+        assert shown == 5
+        assert tree.get_children() == sorted(d.mac_address for d in devices)
+        assert tree.items[devices[0].mac_address][0][6] == "Online"
+
+    def test_unchanged_sync_touches_nothing(self):
+        """Test that syncing the same devices again makes no tree calls."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(50, now)
+        tree = FakeTree()
+        rows = DeviceTreeRows(tree)
+        rows.sync(devices, now, lambda d: True)
+        tree.calls.clear()
+
+        rows.sync(devices, now, lambda d: True)
+
+        assert tree.calls == []
+
+    def test_changed_devices_touch_only_their_rows(self):
+        """Test that a scan changing a few devices only updates those rows."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(50, now)
+        tree = FakeTree()
+        rows = DeviceTreeRows(tree)
+        rows.sync(devices, now, lambda d: True)
+        tree.calls.clear()
+
+        devices[3].update_hostname("printer")
+        devices[7].update_ip_address("10.0.9.9")  # Moves to the end
+        rows.sync(devices, now, lambda d: True)
+
+        assert {iid for _, iid in tree.calls} == {devices[3].mac_address, devices[7].mac_address}
+        assert tree.get_children()[-1] == devices[7].mac_address
+        assert tree.items[devices[3].mac_address][0][2] == "printer"
+
+    def test_filter_detaches_and_reattaches(self):
+        """Test that filtered rows are hidden and come back in place."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(10, now)
+        tree = FakeTree()
+        rows = DeviceTreeRows(tree)
+        rows.sync(devices, now, lambda d: True)
+
+        assert rows.sync(devices, now, lambda d: d.ip_address.endswith("5")) == 1
+        assert tree.get_children() == [devices[5].mac_address]
+        assert len(tree.items) == 10  # Hidden rows are detached, not deleted
+
+        rows.sync(devices, now, lambda d: True)
+        assert tree.get_children() == [d.mac_address for d in devices]
+
+    def test_removed_devices_are_deleted(self):
+        """Test that devices no longer tracked are deleted from the tree."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(3, now)
+        tree = FakeTree()
+        rows = DeviceTreeRows(tree)
+        rows.sync(devices, now, lambda d: True)
+
+        rows.sync(devices[1:], now, lambda d: True)
+
+        assert devices[0].mac_address not in tree.items
+        assert tree.get_children() == [d.mac_address for d in devices[1:]]
+
+    def test_sort_by_column(self):
+        """Test that changing the sort column re-places rows by that column."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(3, now)
+        for device, name in zip(devices, ["c", "a", "b"]):
+            device.update_hostname(name)
+        tree = FakeTree()
+        rows = DeviceTreeRows(tree)
+        rows.sync(devices, now, lambda d: True)
+
+        rows.sort_by(2)
+        rows.sync(devices, now, lambda d: True)
+
+        assert [tree.items[i][0][2] for i in tree.get_children()] == ["a", "b", "c"]
+
+
+class TestVirtualDeviceRows:
+    """Test cases for the virtualised device list."""
+
+    @staticmethod
+    def make_devices(count, now):
+        return [
+            Device(f"aa:bb:cc:{n // 65536:02x}:{n // 256 % 256:02x}:{n % 256:02x}",
+                   f"10.{n // 65536}.{n // 256 % 256}.{n % 256}",
+                   date_added=now - timedelta(days=1), last_seen=now)
+            for n in range(count)
+        ]
+
+    def test_only_viewport_rows_are_materialised(self):
+        """Test that a large list creates only viewport plus buffer rows."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(50000, now)
+        tree, scrollbar = FakeTree(), MagicMock()
+        rows = VirtualDeviceRows(tree, scrollbar, sort_column=0)
+
+        assert rows.sync(devices, now, lambda d: True) == 50000
+
+        assert len(tree.items) == 20 + VirtualDeviceRows.BUFFER_ROWS
+        assert len(rows._cells) == len(tree.items)  # Only shown rows are formatted
+        scrollbar.set.assert_called_with(0.0, 20 / 50000)
+
+    def test_scrolling_refills_pool(self):
+        """Test that scrolling reuses the same items for other devices."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(1000, now)
+        tree, scrollbar = FakeTree(), MagicMock()
+        rows = VirtualDeviceRows(tree, scrollbar, sort_column=0)
+        rows.sync(devices, now, lambda d: True)
+        slots = tree.get_children()
+
+        rows.yview("moveto", "0.5")
+        assert tree.get_children() == slots
+        assert tree.items[slots[0]][0][0] == devices[500].mac_address
+
+        rows.yview("scroll", "1", "pages")
+        assert tree.items[slots[0]][0][0] == devices[520].mac_address
+
+        rows.yview("moveto", "1.0")  # Clamped so the last page is full
+        assert tree.items[slots[0]][0][0] == devices[980].mac_address
+
+    def test_selection_follows_device(self):
+        """Test that the selection stays with the device as the list scrolls."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(100, now)
+        tree = FakeTree()
+        rows = VirtualDeviceRows(tree, MagicMock(), sort_column=0)
+        rows.sync(devices, now, lambda d: True)
+        tree.selection_set([tree.get_children()[2]])
+        rows.note_selection()
+
+        rows.yview("scroll", "1", "units")
+        assert tree.items[tree.selection()[0]][0][0] == devices[2].mac_address
+
+        rows.yview("moveto", "0.5")
+        assert tree.selection() == ()
+
+    def test_filter_shrinks_pool(self):
+        """Test that a filter leaving few devices shrinks the pool."""
+        now = datetime.now(timezone.utc)
+        devices = self.make_devices(100, now)
+        tree = FakeTree()
+        rows = VirtualDeviceRows(tree, MagicMock())
+        rows.sync(devices, now, lambda d: True)
+
+        assert rows.sync(devices, now, lambda d: d.ip_address.endswith(".7")) == 1
+        assert len(tree.items) == 1
+
+
+class TestScanExecutor:
+    """Test cases for single-flight scan execution."""
+
+    def test_ticks_during_a_scan_coalesce(self):
+        """Test that overlapping ticks queue one catch-up run, not one run each."""
+        release = threading.Event()
+        finished = threading.Event()
+        runs = []
+
+        def scan():
+            runs.append(threading.current_thread())
+            release.wait(5)
+
+        def on_done(job, seconds, error):
+            if executor.depth == 0:
+                finished.set()
+
+        executor = ScanExecutor(on_done=on_done)
+        assert executor.submit(scan)
+        assert executor.submit(scan)  # Queued behind the running scan
+        assert not executor.submit(scan)  # Coalesced into the queued one
+        assert not executor.submit(scan)
+        assert executor.depth == 2
+        assert executor.coalesced == 2
+
+        release.set()
+        assert finished.wait(5)
+        assert len(runs) == 2
+        assert executor.last_duration is not None
+
+    def test_errors_are_reported_and_do_not_stop_the_queue(self):
+        """Test that a failing job reaches on_done and the next job still runs."""
+        done = []
+        finished = threading.Event()
+
+        def fail():
+            raise RuntimeError("nmap failed")
+
+        def on_done(job, seconds, error):
+            done.append((job, error))
+            if len(done) == 2:
+                finished.set()
+
+        executor = ScanExecutor(on_done=on_done)
+        blocker = threading.Event()
+        executor.submit(lambda: blocker.wait(5))
+        executor.submit(fail)
+        blocker.set()
+
+        assert finished.wait(5)
+        assert done[0][1] is None
+        assert done[1][0] is fail and isinstance(done[1][1], RuntimeError)
+
+    def test_cancel_pending(self):
+        """Test that stopping drops queued jobs but lets the running one finish."""
+        release = threading.Event()
+        ran = []
+        executor = ScanExecutor()
+        executor.submit(lambda: release.wait(5))
+        executor.submit(lambda: ran.append(True))
+
+        executor.cancel_pending()
+        release.set()
+
+        for _ in range(100):
+            if not executor.busy:
+                break
+            threading.Event().wait(0.01)
+        assert not executor.busy
+        assert ran == []
+
+
+class TestScanTicks:
+    """Test cases for the scan and adaptive probe tick chain."""
+
+    def make_gui(self):
+        """A stand-in for the window with just what the tick methods use."""
+        gui = MagicMock()
+        gui._running = True
+        gui._probing = True
+        gui._scan_generation = 1
+        gui.settings = {"interval": 30}
+        gui.after.side_effect = lambda ms, callback: None
+        return gui
+
+    def scheduled_ticks(self, gui):
+        return [c.args[0] for c in gui.after.call_args_list if c.args[0] == ADAPTIVE_TICK_MS]
+
+    def test_failing_batch_keeps_probing(self):
+        """Test that an error picking the batch doesn't end the probe chain."""
+        gui = self.make_gui()
+        gui._scheduler.next_batch.side_effect = RuntimeError("broken")
+
+        ModernNetworkMonitorGUI._perform_probe(gui)
+
+        assert self.scheduled_ticks(gui) == [ADAPTIVE_TICK_MS]
+        gui._scheduler.requeue.assert_not_called()
+
+    def test_stop_during_probe_ends_the_chain(self):
+        """Test that a probe finishing after Stop (and Start) schedules nothing."""
+        gui = self.make_gui()
+
+        def probe(batch):
+            # Stop and Start while the probe runs
+            gui._scan_generation += 2
+            return set()
+
+        gui._scheduler.next_batch.return_value = ["10.0.0.1"]
+        gui.monitor.probe.side_effect = probe
+
+        ModernNetworkMonitorGUI._perform_probe(gui)
+
+        assert self.scheduled_ticks(gui) == []
+
+    def test_stale_tick_is_dropped(self):
+        """Test that a tick from before Stop and Start doesn't start a second chain."""
+        gui = self.make_gui()
+
+        ModernNetworkMonitorGUI._schedule_scan(gui, generation=0)
+        gui._executor.submit.assert_not_called()
+
+        ModernNetworkMonitorGUI._schedule_scan(gui, generation=1)
+        gui._executor.submit.assert_called_once_with(gui._perform_probe)
@@ -0,0 +1,124 @@
+"""Tests for the per-scan sighting history."""
+
+import datetime
+
+import pytest
+
+from simple_scanner.history import SightingHistory
+from simple_scanner.parsers import HostRecord
+
+
+START = datetime.datetime(2023, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
+MAC = 'aa:bb:cc:dd:ee:ff'
+
+
+def record(ip: str, mac: str = MAC, hostname: str | None = None, latency: float | None = None) -> HostRecord:
+    return HostRecord(ip, mac, hostname=hostname, latency=latency)
+
+
+class TestSightingHistory:
+    """Test cases for recording and querying sightings."""
+
+    def test_where_was_returns_latest_sighting_before_time(self):
+        """Test that the address at time T is the last one seen up to T."""
+        history = SightingHistory()
+        history.record_scan(START, [record('192.168.1.10', hostname='laptop', latency=0.002)])
+        history.record_scan(START + datetime.timedelta(minutes=10), [record('192.168.1.20')])
+
+        sighting = history.where_was(MAC, START + datetime.timedelta(minutes=5))
+
+        assert sighting.ip_address == '192.168.1.10'
+        assert sighting.hostname == 'laptop'
+        assert sighting.seen_at == START
+        assert sighting.latency == pytest.approx(0.002)
+        assert history.where_was(MAC, START + datetime.timedelta(minutes=10)).ip_address == '192.168.1.20'
+        assert history.where_was(MAC, START - datetime.timedelta(seconds=1)) is None
+        assert history.where_was('00:00:00:00:00:00', START) is None
+
+    def test_uptime_counts_scans_that_saw_device(self):
+        """Test that uptime is the share of scans in the window that saw the device."""
+        history = SightingHistory()
+        for minute in range(4):
+            seen = [record('192.168.1.10')] if minute % 2 == 0 else []
+            history.record_scan(START + datetime.timedelta(minutes=minute), seen)
+
+        now = START + datetime.timedelta(minutes=3)
+        assert history.uptime(MAC, days=1, now=now) == pytest.approx(0.5)
+        assert history.uptime('00:00:00:00:00:00', days=1, now=now) == 0.0
+
+    def test_ip_churn_counts_address_changes(self):
+        """Test that each change of address counts once."""
+        history = SightingHistory()
+        for minute, ip in enumerate(['10.0.0.1', '10.0.0.1', '10.0.0.2', '10.0.0.1']):
+            history.record_scan(START + datetime.timedelta(minutes=minute), [record(ip)])
+
+        assert history.ip_churn(MAC, days=1, now=START + datetime.timedelta(minutes=3)) == 2
+
+    def test_scans_out_of_order_are_rejected(self):
+        """Test that history only grows forward in time."""
+        history = SightingHistory()
+        history.record_scan(START, [])
+
+        with pytest.raises(ValueError):
+            history.record_scan(START - datetime.timedelta(minutes=1), [])
+
+    def test_old_rows_are_rolled_up(self):
+        """Test that queries give the same answers after raw rows are rolled up."""
+        history = SightingHistory(raw_retention=3600, tiers=[(3600, 2 * 86400), (86400, 30 * 86400)])
+        when = START
+        for i in range(6 * 60):  # Six hours, one scan a minute, address change every two hours
+            ip = f'10.0.0.{i // 120 + 1}'
+            seen = [record(ip, latency=0.001)] if i % 4 else []
+            history.record_scan(when, seen + [record('10.0.1.1', mac='11:22:33:44:55:66')])
+            when += datetime.timedelta(minutes=1)
+        now = when - datetime.timedelta(minutes=1)
+
+        # Only the last hour or so remains as raw rows
+        assert len(history) < 2 * 2 * 60 + 2 * 6
+        assert history.uptime(MAC, days=1, now=now) == pytest.approx(0.75)
+        assert history.uptime('11:22:33:44:55:66', days=1, now=now) == pytest.approx(1.0)
+        assert history.ip_churn(MAC, days=1, now=now) == 2
+        sighting = history.where_was(MAC, START + datetime.timedelta(minutes=30))
+        assert sighting.ip_address == '10.0.0.1'
+        assert sighting.seen_at == START
+        assert sighting.latency == pytest.approx(0.001)
+
+    def test_coarsest_tier_forgets_old_data(self):
+        """Test that data past the last tier's retention is dropped."""
+        history = SightingHistory(raw_retention=60, tiers=[(3600, 3600)])
+        history.record_scan(START, [record('10.0.0.1')])
+        history.record_scan(START + datetime.timedelta(hours=3), [])
+
+        assert history.where_was(MAC, START + datetime.timedelta(hours=3)) is None
+        assert len(history) == 0
+
+    def test_forgotten_macs_and_hostnames_are_released(self):
+        """Test that intern tables shrink once the coarsest tier forgets a device."""
+        history = SightingHistory(raw_retention=60, tiers=[(3600, 4 * 3600)])
+        history.record_scan(START, [record('10.0.0.1', hostname='old'), record('10.0.0.2', mac='11:22:33:44:55:66')])
+        later = START + datetime.timedelta(hours=3)
+        history.record_scan(later, [record('10.0.0.2', mac='11:22:33:44:55:66', hostname='new')])
+        history.record_scan(later + datetime.timedelta(hours=3), [record('10.0.0.3', mac='11:22:33:44:55:66')])
+
+        assert history._macs == ['11:22:33:44:55:66']
+        assert history._hostnames == [None, 'new']
+        assert history.where_was(MAC, later) is None
+        sighting = history.where_was('11:22:33:44:55:66', later)
+        assert (sighting.ip_address, sighting.hostname) == ('10.0.0.2', 'new')
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test that a saved history answers queries identically after loading."""
+        history = SightingHistory(raw_retention=60, tiers=[(3600, 86400)])
+        for minute in range(5):
+            history.record_scan(START + datetime.timedelta(minutes=minute),
+                                [record(f'10.0.0.{minute % 2 + 1}', hostname='phone')])
+        path = tmp_path / 'history.bin'
+        history.save(path)
+
+        loaded = SightingHistory.load(path)
+        now = START + datetime.timedelta(minutes=4)
+
+        assert len(loaded) == len(history)
+        assert loaded.where_was(MAC, now) == history.where_was(MAC, now)
+        assert loaded.ip_churn(MAC, now=now) == history.ip_churn(MAC, now=now) == 4
+        assert loaded.uptime(MAC, now=now) == pytest.approx(1.0)
@@ -122,3 +122,35 @@ class TestDevice:
         
         assert device.ip_address == "192.168.1.200"
 
+
+
+class TestCompactDevice:
+    """Test cases for the memory-saving Device layout."""
+
+    def test_no_instance_dict(self):
+        """Test that devices use slots rather than a per-instance __dict__."""
+        device = Device('AA:BB:CC:DD:EE:FF', '192.168.1.1')
+        assert not hasattr(device, '__dict__')
+        with pytest.raises(AttributeError):
+            device.nickname = 'router'
+
+    def test_repeated_strings_are_shared(self):
+        """Test that equal vendors and hostnames are stored once."""
+        vendor = ''.join(['Apple, ', 'Inc.'])  # Built at runtime, so not a constant
+        first = Device('aa:bb:cc:dd:ee:01', '192.168.1.1', manufacturer=vendor)
+        second = Device('aa:bb:cc:dd:ee:02', '192.168.1.2', manufacturer=''.join(['Apple, ', 'Inc.']))
+        assert first.manufacturer is second.manufacturer
+
+        second.update_hostname(''.join(['nas', '.lan']))
+        first.update_hostname(''.join(['nas', '.lan']))
+        assert first.hostname is second.hostname
+
+    def test_from_dict_shares_timestamps(self):
+        """Test that devices loaded with equal timestamps share one datetime."""
+        data = {'ip_address': '192.168.1.1', 'date_added': '2023-01-01T10:00:00+00:00',
+                'last_seen': '2023-01-01T10:00:00+00:00'}
+        first = Device.from_dict({**data, 'mac_address': 'aa:bb:cc:dd:ee:01'})
+        second = Device.from_dict({**data, 'mac_address': 'aa:bb:cc:dd:ee:02'})
+
+        assert first.last_seen is second.last_seen
+        assert first.date_added.tzinfo == datetime.timezone.utc
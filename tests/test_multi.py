@@ -0,0 +1,113 @@
+"""Tests for multi-network monitoring."""
+
+import datetime
+import time
+from unittest.mock import patch
+
+import pytest
+
+from simple_scanner.multi import MultiNetworkMonitor, NetworkTarget
+
+
+class TestNetworkTarget:
+    """Test cases for parsing network targets."""
+
+    def test_parse(self):
+        """Test that interval and workers are optional."""
+        assert NetworkTarget.parse("10.0.0.0/24") == NetworkTarget("10.0.0.0/24", 30, 1)
+        assert NetworkTarget.parse("10.0.0.0/24", default_interval=60).interval == 60
+        assert NetworkTarget.parse("10.0.0.0/22:300:4") == NetworkTarget("10.0.0.0/22", 300, 4)
+
+    def test_parse_ipv6(self):
+        """Test that colons inside an IPv6 network aren't taken for options."""
+        assert NetworkTarget.parse("fd00::/64") == NetworkTarget("fd00::/64", 30, 1)
+        assert NetworkTarget.parse("fd00::/64:60") == NetworkTarget("fd00::/64", 60, 1)
+        assert NetworkTarget.parse("fd00:1::1/128:60:2") == NetworkTarget("fd00:1::1/128", 60, 2)
+        assert NetworkTarget.parse("fd00::1") == NetworkTarget("fd00::1", 30, 1)
+
+    @pytest.mark.parametrize("text", ["", ":30", "10.0.0.0/24:x", "10.0.0.0/24:0", "10.0.0.0/24:30:0",
+                                      "10.0.0.0/24:30:1:9", "10.0.0.0/24,10.1.0.0/24",
+                                      "fd00::/64:x", "fd00::/64:30:1:9"])
+    def test_parse_rejects_invalid(self, text):
+        """Test that malformed targets raise ValueError."""
+        with pytest.raises(ValueError):
+            NetworkTarget.parse(text)
+
+
+class TestMultiNetworkMonitor:
+    """Test cases for per-network scan schedules."""
+
+    def make_monitor(self, mock_nmap_executable):
+        return MultiNetworkMonitor(
+            [NetworkTarget("10.0.0.0/24", 30), NetworkTarget("10.1.0.0/24", 300, 4)],
+            use_persistence=False,
+        )
+
+    def test_shares_one_monitor(self, mock_nmap_executable):
+        """Test that all targets are tracked by a single NetworkMonitor."""
+        multi = self.make_monitor(mock_nmap_executable)
+        assert multi.monitor.network == "10.0.0.0/24,10.1.0.0/24"
+
+    def test_each_network_runs_on_its_own_interval(self, mock_nmap_executable):
+        """Test that networks are rescanned only once their own interval has elapsed."""
+        multi = self.make_monitor(mock_nmap_executable)
+        with patch.object(multi.monitor, "scan") as scan:
+            assert len(multi.run_due(now=1000)) == 2
+            assert multi.run_due(now=1010) == []
+            assert multi.seconds_until_due(now=1010) == 20
+            assert [t.network for t in multi.run_due(now=1030)] == ["10.0.0.0/24"]
+
+        assert sorted(c.kwargs["network"] for c in scan.call_args_list) == [
+            "10.0.0.0/24", "10.0.0.0/24", "10.1.0.0/24"
+        ]
+        assert {c.kwargs["network"]: c.kwargs["max_workers"] for c in scan.call_args_list} == {
+            "10.0.0.0/24": 1, "10.1.0.0/24": 4
+        }
+
+    def test_failing_network_does_not_stop_others(self, mock_nmap_executable):
+        """Test that one network's scan error is contained."""
+        multi = self.make_monitor(mock_nmap_executable)
+
+        def scan(network, max_workers):
+            if network == "10.0.0.0/24":
+                raise RuntimeError("Nmap scan failed")
+
+        with patch.object(multi.monitor, "scan", side_effect=scan) as mock_scan:
+            multi.run_due(now=0)
+
+        assert mock_scan.call_count == 2
+
+    def test_defaults_to_interface_networks(self, mock_nmap_executable):
+        """Test that without targets every local subnet is monitored."""
+        with patch("simple_scanner.multi.autodetect_networks", return_value=["10.0.0.0/24", "10.9.0.0/16"]):
+            multi = MultiNetworkMonitor(interval=45, use_persistence=False)
+
+        assert multi.targets == [NetworkTarget("10.0.0.0/24", 45), NetworkTarget("10.9.0.0/16", 45)]
+
+    def test_concurrent_sharded_scans_with_history(self, mock_nmap_executable):
+        """Test that overlapping scans record history and keep each other's events."""
+        multi = MultiNetworkMonitor(
+            [NetworkTarget("10.0.0.0/23", 30, 2), NetworkTarget("10.9.1.0/24", 30)],
+            use_persistence=False,
+            track_history=True,
+        )
+        multi.monitor.shard_prefix = 24
+
+        def run_command(target):
+            # The sharded network starts first but finishes last
+            time.sleep(0.2 if target.startswith("10.0.") else 0.05)
+            host = target.split("/")[0][:-1] + "7"
+            mac = "aa:bb:cc:%02x:%02x:07" % tuple(int(part) for part in host.split(".")[1:3])
+            return f"Nmap scan report for {host}\nHost is up (0.001s latency).\nMAC Address: {mac.upper()} (Vendor)\n"
+
+        with patch.object(multi.monitor, "_run_command", side_effect=run_command):
+            multi.run_due(now=0)
+            assert {event.device.ip_address for event in multi.monitor.last_events} == {
+                "10.0.0.7", "10.0.1.7", "10.9.1.7"
+            }
+            multi.run_due(now=30)
+
+        assert len(multi.devices()) == 3
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for mac, ip in [("aa:bb:cc:00:01:07", "10.0.1.7"), ("aa:bb:cc:09:01:07", "10.9.1.7")]:
+            assert multi.monitor.history.where_was(mac, now).ip_address == ip
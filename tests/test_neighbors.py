@@ -0,0 +1,74 @@
+"""Tests for passive discovery from the kernel neighbor table."""
+
+import socket
+import struct
+from unittest.mock import patch
+
+from simple_scanner.neighbors import (
+    NDA_DST,
+    NDA_LLADDR,
+    NLMSG_DONE,
+    NUD_REACHABLE,
+    NUD_STALE,
+    RTM_NEWNEIGH,
+    Neighbor,
+    parse_messages,
+    read_neighbors,
+)
+
+
+def _neigh_message(ip, mac, state, family=socket.AF_INET):
+    attrs = b""
+    for attr_type, value in ((NDA_DST, socket.inet_aton(ip)), (NDA_LLADDR, bytes.fromhex(mac.replace(":", "")))):
+        attr = struct.pack("=HH", 4 + len(value), attr_type) + value
+        attrs += attr + b"\0" * (-len(attr) % 4)
+    body = struct.pack("=BxxxiHBB", family, 1, state, 0, 1) + attrs
+    return struct.pack("=IHHII", 16 + len(body), RTM_NEWNEIGH, 0, 1, 0) + body
+
+
+def _done_message():
+    return struct.pack("=IHHII", 20, NLMSG_DONE, 0, 1, 0) + b"\0" * 4
+
+
+class TestParseMessages:
+    """Test cases for decoding rtnetlink neighbor messages."""
+
+    def test_decodes_entries_and_done(self):
+        """Test that IPv4 entries are decoded with their state."""
+        data = (_neigh_message("10.0.0.5", "AA:BB:CC:DD:EE:05", NUD_REACHABLE)
+                + _neigh_message("10.0.0.6", "aa:bb:cc:dd:ee:06", NUD_STALE)
+                + _done_message())
+
+        with patch("simple_scanner.neighbors.socket.if_indextoname", return_value="eth0"):
+            messages = list(parse_messages(data))
+
+        assert messages == [
+            (RTM_NEWNEIGH, Neighbor("10.0.0.5", "aa:bb:cc:dd:ee:05", "eth0", NUD_REACHABLE)),
+            (RTM_NEWNEIGH, Neighbor("10.0.0.6", "aa:bb:cc:dd:ee:06", "eth0", NUD_STALE)),
+            (NLMSG_DONE, None),
+        ]
+        assert [n.fresh for _, n in messages[:2]] == [True, False]
+
+    def test_skips_incomplete_entries(self):
+        """Test that entries without a link-layer address are not returned."""
+        data = _neigh_message("10.0.0.7", "00:00:00:00:00:00", 0x01)
+
+        assert list(parse_messages(data)) == [(RTM_NEWNEIGH, None)]
+
+
+class TestReadNeighbors:
+    """Test cases for reading the neighbor table."""
+
+    def test_falls_back_to_proc(self, tmp_path):
+        """Test that /proc/net/arp is used when netlink is unavailable."""
+        table = tmp_path / "arp"
+        table.write_text(
+            "IP address       HW type     Flags       HW address            Mask     Device\n"
+            "192.168.1.1      0x1         0x2         aa:bb:cc:dd:ee:ff     *        eth0\n"
+        )
+
+        with patch("simple_scanner.neighbors.dump_neighbors", side_effect=OSError("no netlink")):
+            neighbors = read_neighbors(table)
+
+        assert neighbors == [Neighbor("192.168.1.1", "aa:bb:cc:dd:ee:ff", "eth0", None)]
+        assert neighbors[0].fresh
@@ -0,0 +1,143 @@
+"""Tests for the offline MAC vendor (OUI) table."""
+
+import pytest
+
+from simple_scanner.oui import OuiDatabase, compile_database, parse_source
+
+
+IEEE_CSV = """Registry,Assignment,Organization Name,Organization Address
+MA-L,001BC5,"Vendor Large, Inc.",Somewhere
+MA-M,001BC51,Vendor Medium,Somewhere
+MA-S,001BC5123,Vendor Small,Somewhere
+"""
+
+NMAP_PREFIXES = """# $Id$ generated
+001BC5 Nmap Name
+3C5AB4 Google
+"""
+
+WIRESHARK_MANUF = """# Wireshark manuf
+00:00:0C\tCisco\tCisco Systems, Inc
+00:1B:C5:00:00:00/36\tShort\tVendor Small Via Manuf
+B8:27:EB\tRaspberr\tRaspberry Pi Foundation
+"""
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """An IEEE CSV, an nmap prefix file and a Wireshark manuf file."""
+    paths = []
+    for name, text in (("oui.csv", IEEE_CSV), ("nmap-mac-prefixes", NMAP_PREFIXES), ("manuf", WIRESHARK_MANUF)):
+        path = tmp_path / name
+        path.write_text(text)
+        paths.append(path)
+    return paths
+
+
+class TestParseSource:
+    """Test cases for reading vendor databases."""
+
+    def test_ieee_csv(self, sources):
+        """Test that MA-L, MA-M and MA-S rows yield 24, 28 and 36 bit prefixes."""
+        assert list(parse_source(sources[0])) == [
+            (24, 0x001BC5, "Vendor Large, Inc."),
+            (28, 0x001BC51, "Vendor Medium"),
+            (36, 0x001BC5123, "Vendor Small"),
+        ]
+
+    def test_nmap_prefixes(self, sources):
+        """Test that nmap-mac-prefixes lines are read and comments skipped."""
+        assert list(parse_source(sources[1])) == [(24, 0x001BC5, "Nmap Name"), (24, 0x3C5AB4, "Google")]
+
+    def test_wireshark_manuf_uses_long_name_and_mask(self, sources):
+        """Test that manuf entries use the long vendor name and honour /bits masks."""
+        assert list(parse_source(sources[2])) == [
+            (24, 0x00000C, "Cisco Systems, Inc"),
+            (36, 0x001BC5000, "Vendor Small Via Manuf"),
+            (24, 0xB827EB, "Raspberry Pi Foundation"),
+        ]
+
+
+class TestOuiDatabase:
+    """Test cases for compiling and querying the vendor table."""
+
+    def test_longest_prefix_wins(self, sources, tmp_path):
+        """Test that MA-S beats MA-M beats MA-L for the same address."""
+        path = tmp_path / "oui.bin"
+        assert compile_database(sources, path) == 7
+        db = OuiDatabase(path, sources=())
+
+        assert db.lookup("00:1B:C5:12:34:56") == "Vendor Small"
+        assert db.lookup("00:1B:C5:1F:00:00") == "Vendor Medium"
+        assert db.lookup("00-1b-c5-ff-00-00") == "Vendor Large, Inc."  # Earlier source wins
+        assert db.lookup("00:1B:C5:00:01:02") == "Vendor Small Via Manuf"
+        assert db.lookup("b8:27:eb:00:00:01") == "Raspberry Pi Foundation"
+        assert db.lookup("00:00:00:00:00:01") is None
+        assert len(db) == 7
+        db.close()
+
+    def test_locally_administered_and_malformed(self, sources, tmp_path):
+        """Test that randomized MACs and garbage don't match anything."""
+        path = tmp_path / "oui.bin"
+        compile_database(sources, path)
+        db = OuiDatabase(path, sources=())
+
+        assert db.lookup("02:1B:C5:12:34:56") is None
+        assert db.lookup("not a mac") is None
+
+    def test_missing_table_is_compiled_from_sources(self, sources, tmp_path):
+        """Test that the table is built on first use when it doesn't exist yet."""
+        path = tmp_path / "data" / "oui.bin"
+        db = OuiDatabase(path, sources=sources)
+
+        assert not path.exists()
+        assert db.lookup("3C:5A:B4:00:00:00") == "Google"
+        assert path.exists()
+
+    def test_without_table_or_sources(self, tmp_path):
+        """Test that lookups return None when there is nothing to look up in."""
+        db = OuiDatabase(tmp_path / "oui.bin", sources=[tmp_path / "missing.csv"])
+
+        assert db.lookup("00:1B:C5:00:00:00") is None
+        assert len(db) == 0
+
+    def test_compile_without_entries(self, tmp_path):
+        """Test that compiling files with no assignments is an error."""
+        empty = tmp_path / "empty.txt"
+        empty.write_text("# nothing here\n")
+
+        with pytest.raises(ValueError, match="No OUI assignments"):
+            compile_database([empty], tmp_path / "oui.bin")
+        assert not (tmp_path / "oui.bin").exists()
+
+    def test_recompile_replaces_table(self, sources, tmp_path):
+        """Test that a reopened database sees a rebuilt table."""
+        path = tmp_path / "oui.bin"
+        compile_database(sources[1:2], path)
+        db = OuiDatabase(path, sources=())
+        assert db.lookup("00:1B:C5:00:00:00") == "Nmap Name"
+
+        db.close()
+        compile_database(sources, path)
+        assert db.lookup("00:1B:C5:00:00:00") == "Vendor Small Via Manuf"
+
+    def test_truncated_table_is_rebuilt_from_sources(self, sources, tmp_path):
+        """Test that a table cut short is compiled again instead of mapped."""
+        path = tmp_path / "oui.bin"
+        compile_database(sources, path)
+        path.write_bytes(path.read_bytes()[:-20])
+        db = OuiDatabase(path, sources=sources)
+
+        assert db.lookup("b8:27:eb:00:00:01") == "Raspberry Pi Foundation"
+        assert len(db) == 7
+        db.close()
+
+    def test_truncated_table_without_sources(self, sources, tmp_path):
+        """Test that a truncated table is reported as corrupt, not as a TypeError."""
+        path = tmp_path / "oui.bin"
+        compile_database(sources, path)
+        path.write_bytes(path.read_bytes()[:-20])
+        db = OuiDatabase(path, sources=())
+
+        with pytest.raises(ValueError, match="truncated"):
+            db.lookup("b8:27:eb:00:00:01")
@@ -0,0 +1,152 @@
+"""Tests for the nmap output parsers."""
+
+import pytest
+
+from simple_scanner.parsers import HostRecord, NmapTextParser, NmapXmlParser
+
+
+SAMPLE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap" args="nmap -sn -oX - 192.168.1.0/24">
+<host><status state="up" reason="arp-response"/>
+<address addr="192.168.1.1" addrtype="ipv4"/>
+<address addr="AA:BB:CC:DD:EE:FF" addrtype="mac" vendor="Cisco Systems"/>
+<hostnames><hostname name="router.local" type="PTR"/></hostnames>
+<times srtt="1500" rttvar="5000" to="100000"/>
+</host>
+<host><status state="up" reason="arp-response"/>
+<address addr="192.168.1.100" addrtype="ipv4"/>
+<address addr="11:22:33:44:55:66" addrtype="mac"/>
+<hostnames></hostnames>
+</host>
+<host><status state="up" reason="localhost-response"/>
+<address addr="192.168.1.2" addrtype="ipv4"/>
+<hostnames></hostnames>
+</host>
+<runstats><hosts up="3" down="253" total="256"/></runstats>
+</nmaprun>
+"""
+
+
+class TestNmapTextParser:
+    """Test cases for the incremental text parser."""
+
+    def test_parse_sample_output(self, sample_nmap_output):
+        """Test that every host with a MAC address yields a record."""
+        parser = NmapTextParser()
+        records = list(parser.parse(sample_nmap_output.splitlines()))
+
+        assert [r.ip_address for r in records] == ['192.168.1.1', '192.168.1.100', '192.168.1.50']
+        assert records[0].mac_address == 'aa:bb:cc:dd:ee:ff'
+        assert records[0].manufacturer == 'Router Manufacturer'
+        assert records[2].hostname == 'hostname.local'
+        assert records[1].latency == pytest.approx(0.002)
+
+    def test_feed_emits_record_on_mac_line(self):
+        """Test that a record is returned as soon as its MAC line is fed."""
+        parser = NmapTextParser()
+
+        assert parser.feed("Nmap scan report for router (192.168.1.1)") is None
+        assert parser.feed("Host is up (0.001s latency).") is None
+        record = parser.feed("MAC Address: AA:BB:CC:DD:EE:FF (Cisco)")
+
+        assert record == HostRecord(
+            ip_address='192.168.1.1',
+            mac_address='aa:bb:cc:dd:ee:ff',
+            hostname='router',
+            manufacturer='Cisco',
+            latency=0.001,
+        )
+
+    def test_host_without_mac_is_dropped(self):
+        """Test that a host block without a MAC line does not steal the next one's MAC."""
+        lines = [
+            "Nmap scan report for 192.168.1.10",
+            "Host is up.",
+            "Nmap scan report for 192.168.1.20",
+            "Host is up (0.001s latency).",
+            "MAC Address: 11:22:33:44:55:66",
+        ]
+        records = list(NmapTextParser().parse(lines))
+
+        assert len(records) == 1
+        assert records[0].ip_address == '192.168.1.20'
+        assert records[0].manufacturer is None
+
+    def test_mac_outside_lookahead_is_ignored(self):
+        """Test that a MAC line too far from its report line is not attributed."""
+        lines = [
+            "Nmap scan report for 192.168.1.10",
+            "line 1",
+            "line 2",
+            "MAC Address: 11:22:33:44:55:66",
+        ]
+
+        assert list(NmapTextParser(lookahead=2).parse(lines)) == []
+        assert len(list(NmapTextParser(lookahead=3).parse(lines))) == 1
+
+    def test_mac_without_report_is_ignored(self):
+        """Test that stray MAC lines are ignored."""
+        parser = NmapTextParser()
+        assert parser.feed("MAC Address: 11:22:33:44:55:66") is None
+
+    @pytest.mark.parametrize("lookahead", [0, 1, 2, 3, 4])
+    def test_parse_text_matches_line_parser(self, lookahead, sample_nmap_output):
+        """Test that the whole-output tokenizer finds exactly what the line state machine finds."""
+        text = sample_nmap_output + "\n" + "\n".join([
+            "Nmap scan report for 192.168.1.10",           # No MAC before the next report
+            "Nmap scan report for gw.lan (192.168.1.20)",
+            "Nmap scan report for fe80::1",                # Not a report the parser knows
+            "Host is up (0.004s latency).",
+            "MAC Address: 02:00:00:00:00:20 (Vendor (EU))",
+            "Nmap scan report for 192.168.1.30",
+            "Host is up.",
+            "Warning: something",
+            "MAC Address: nonsense",                       # Not a MAC line: counts as a line
+            "MAC Address: 02:00:00:00:00:30",
+            "MAC Address: 02:00:00:00:00:99",              # Stray
+            "Nmap scan report for 192.168.1.40",
+            "MAC Address: 02:00:00:00:00:40",
+        ])
+
+        expected = list(NmapTextParser(lookahead).parse(text.splitlines()))
+        assert list(NmapTextParser(lookahead).parse_text(text)) == expected
+        assert len(expected) > 0
+
+
+class TestNmapXmlParser:
+    """Test cases for the incremental XML parser."""
+
+    def test_parse_sample_xml(self):
+        """Test extraction of address, MAC, vendor, hostname and latency."""
+        records = list(NmapXmlParser().parse(SAMPLE_XML.splitlines()))
+
+        assert records == [
+            HostRecord('192.168.1.1', 'aa:bb:cc:dd:ee:ff', 'router.local', 'Cisco Systems', 0.0015),
+            HostRecord('192.168.1.100', '11:22:33:44:55:66', None, None, None),
+        ]
+
+    def test_feed_arbitrary_chunks(self):
+        """Test that records come out as soon as their host element closes."""
+        parser = NmapXmlParser()
+        split = SAMPLE_XML.index("<host>", SAMPLE_XML.index("</host>"))
+
+        first = parser.feed(SAMPLE_XML[:split])
+        rest = parser.feed(SAMPLE_XML[split:]) + parser.close()
+
+        assert [r.ip_address for r in first] == ['192.168.1.1']
+        assert [r.ip_address for r in rest] == ['192.168.1.100']
+
+    def test_finished_hosts_are_discarded(self):
+        """Test that parsed hosts do not accumulate in the element tree."""
+        parser = NmapXmlParser()
+        parser.feed(SAMPLE_XML[:SAMPLE_XML.index("<runstats>")])
+
+        assert len(parser._root) == 0
+
+    def test_down_hosts_are_skipped(self):
+        """Test that hosts reported down are ignored."""
+        xml = """<nmaprun><host><status state="down"/>
+<address addr="10.0.0.1" addrtype="ipv4"/>
+<address addr="AA:BB:CC:DD:EE:FF" addrtype="mac"/></host></nmaprun>"""
+
+        assert list(NmapXmlParser().parse([xml])) == []
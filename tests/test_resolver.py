@@ -0,0 +1,230 @@
+"""Tests for concurrent hostname resolution, against local stub DNS/mDNS/NetBIOS servers."""
+
+import asyncio
+import socket
+import struct
+import threading
+
+import pytest
+
+from simple_scanner.resolver import (
+    HostnameCache,
+    HostnameResolver,
+    build_nbstat_query,
+    build_ptr_query,
+    parse_nbstat_response,
+    parse_ptr_response,
+    read_nameserver,
+)
+
+MAC = "aa:bb:cc:dd:ee:ff"
+
+
+def ptr_reply(query: bytes, hostname: str | None) -> bytes:
+    """Answer a PTR query with ``hostname`` (compressed owner name), or NXDOMAIN."""
+    qid, question = query[:2], query[12:]
+    if hostname is None:
+        return qid + struct.pack("!HHHHH", 0x8183, 1, 0, 0, 0) + question
+    rdata = b"".join(bytes([len(label)]) + label.encode() for label in hostname.split(".")) + b"\0"
+    answer = b"\xc0\x0c" + struct.pack("!HHIH", 12, 1, 300, len(rdata)) + rdata
+    return qid + struct.pack("!HHHHH", 0x8180, 1, 1, 0, 0) + question + answer
+
+
+def nbstat_reply(query: bytes, names: list[tuple[str, int, int]]) -> bytes:
+    """Answer a node status query with ``(name, suffix, flags)`` entries."""
+    rdata = bytes([len(names)]) + b"".join(
+        struct.pack("!15sBH", name.ljust(15).encode(), suffix, flags) for name, suffix, flags in names
+    ) + b"\0" * 46  # Adapter statistics
+    owner = query[12:12 + 34]
+    return (query[:2] + struct.pack("!HHHHH", 0x8400, 0, 1, 0, 0) + owner
+            + struct.pack("!HHIH", 0x21, 1, 0, len(rdata)) + rdata)
+
+
+@pytest.fixture
+def stub_server():
+    """Run a UDP server on localhost that answers with ``handler(query)``; yields a starter."""
+    servers = []
+
+    def start(handler):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        sock.settimeout(0.05)
+        state = {"queries": 0, "stop": False}
+
+        def serve():
+            while not state["stop"]:
+                try:
+                    data, addr = sock.recvfrom(512)
+                except socket.timeout:
+                    continue
+                state["queries"] += 1
+                reply = handler(data)
+                if reply is not None:
+                    sock.sendto(reply, addr)
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        servers.append((sock, thread, state))
+        return sock.getsockname()[1], state
+
+    yield start
+    for sock, thread, state in servers:
+        state["stop"] = True
+        thread.join()
+        sock.close()
+
+
+def _resolver(**kwargs):
+    kwargs.setdefault("timeout", 0.5)
+    return HostnameResolver(nameserver="127.0.0.1", **kwargs)
+
+
+class TestWireFormat:
+    """Test cases for building and parsing the queries."""
+
+    def test_ptr_round_trip(self):
+        """Test that a compressed PTR answer decodes to the host name."""
+        query = build_ptr_query(0x1234, "192.168.1.20")
+        assert b"\x0220\x011\x03168\x03192\x07in-addr\x04arpa\x00" in query
+
+        assert parse_ptr_response(ptr_reply(query, "printer.lan"), 0x1234) == "printer.lan"
+        assert parse_ptr_response(ptr_reply(query, None), 0x1234) is None
+
+    def test_ptr_rejects_other_and_truncated_packets(self):
+        """Test that replies to other queries and short packets are not answers."""
+        query = build_ptr_query(1, "10.0.0.1")
+        reply = ptr_reply(query, "host.lan")
+
+        with pytest.raises(ValueError):
+            parse_ptr_response(reply, 2)
+        with pytest.raises(ValueError):
+            parse_ptr_response(reply[:-5], 1)
+
+    def test_nbstat_picks_unique_workstation_name(self):
+        """Test that the machine name is taken over group and service names."""
+        query = build_nbstat_query(7)
+        reply = nbstat_reply(query, [("WORKGROUP", 0x00, 0x8400), ("DESKTOP-1", 0x20, 0x0400),
+                                     ("DESKTOP-1", 0x00, 0x0400)])
+
+        assert query[12:14] == b"\x20C"  # "*" first-level encoded
+        assert parse_nbstat_response(reply, 7) == "DESKTOP-1"
+        assert parse_nbstat_response(nbstat_reply(query, [("WORKGROUP", 0x00, 0x8400)]), 7) is None
+
+    def test_read_nameserver(self, tmp_path):
+        """Test that the first IPv4 nameserver in resolv.conf is used."""
+        conf = tmp_path / "resolv.conf"
+        conf.write_text("# generated\nsearch lan\nnameserver fe80::1\nnameserver 192.168.1.1\n")
+
+        assert read_nameserver(conf) == "192.168.1.1"
+        assert read_nameserver(tmp_path / "missing") is None
+
+
+class TestHostnameCache:
+    """Test cases for the TTL cache."""
+
+    def test_entries_expire(self):
+        """Test that names and failures are kept for their own TTLs."""
+        cache = HostnameCache(ttl=60, negative_ttl=10)
+        cache.put("10.0.0.1", MAC, "nas.lan", now=0)
+        cache.put("10.0.0.2", MAC, None, now=0)
+
+        assert cache.get("10.0.0.1", MAC, now=30) == (True, "nas.lan")
+        assert cache.get("10.0.0.2", MAC, now=5) == (True, None)
+        assert cache.get("10.0.0.2", MAC, now=11) == (False, None)
+        assert cache.get("10.0.0.1", MAC, now=61) == (False, None)
+        assert len(cache) == 0
+
+    def test_keyed_by_ip_and_mac(self):
+        """Test that another device on the same address is a miss."""
+        cache = HostnameCache()
+        cache.put("10.0.0.1", MAC, "nas.lan", now=0)
+
+        assert cache.get("10.0.0.1", "11:22:33:44:55:66", now=1) == (False, None)
+
+    def test_oldest_entries_are_evicted(self):
+        """Test that the cache stays within max_entries."""
+        cache = HostnameCache(max_entries=2)
+        for i in range(3):
+            cache.put(f"10.0.0.{i}", MAC, "host", now=i)
+
+        assert len(cache) == 2
+        assert cache.get("10.0.0.0", MAC, now=3) == (False, None)
+
+
+class TestHostnameResolver:
+    """Test cases for resolving against stub servers."""
+
+    def test_reverse_dns_is_cached(self, stub_server):
+        """Test that a PTR answer is returned and not asked for again."""
+        names = {"1.0.0.127.in-addr.arpa": "router.lan"}
+        port, state = stub_server(lambda q: ptr_reply(q, names.get(_qname(q))))
+        resolver = _resolver(methods=["dns"])
+        resolver.DNS_PORT = port
+
+        assert resolver.resolve([("127.0.0.1", MAC)]) == {MAC: "router.lan"}
+        assert resolver.resolve([("127.0.0.1", MAC)]) == {MAC: "router.lan"}
+        assert state["queries"] == 1
+
+    def test_failures_are_cached_per_device(self, stub_server):
+        """Test that NXDOMAIN is remembered, but a new MAC on the address is asked again."""
+        port, state = stub_server(lambda q: ptr_reply(q, None))
+        resolver = _resolver(methods=["dns"])
+        resolver.DNS_PORT = port
+
+        assert resolver.resolve([("127.0.0.1", MAC)]) == {}
+        assert resolver.resolve([("127.0.0.1", MAC)]) == {}
+        assert state["queries"] == 1
+        resolver.resolve([("127.0.0.1", "11:22:33:44:55:66")])
+        assert state["queries"] == 2
+
+    def test_preferred_method_wins(self, stub_server):
+        """Test that methods run together and the earliest in order with a name is used."""
+        dns_port, _ = stub_server(lambda q: ptr_reply(q, None))
+        mdns_port, _ = stub_server(lambda q: ptr_reply(q, "iphone.local"))
+        netbios_port, _ = stub_server(lambda q: nbstat_reply(q, [("IPHONE", 0x00, 0)]))
+        resolver = _resolver()
+        resolver.DNS_PORT, resolver.MDNS_PORT, resolver.NETBIOS_PORT = dns_port, mdns_port, netbios_port
+
+        assert resolver.resolve([("127.0.0.1", MAC)]) == {MAC: "iphone.local"}
+
+    def test_netbios(self, stub_server):
+        """Test that a NetBIOS machine name is used when nothing else answers."""
+        port, _ = stub_server(lambda q: nbstat_reply(q, [("NAS", 0x00, 0)]))
+        resolver = _resolver(methods=["netbios"])
+        resolver.NETBIOS_PORT = port
+
+        assert resolver.resolve([("127.0.0.1", MAC)]) == {MAC: "NAS"}
+
+    def test_silent_and_stray_replies_time_out(self, stub_server):
+        """Test that a reply to another query is ignored until the timeout."""
+        port, _ = stub_server(lambda q: ptr_reply(bytes([q[0] ^ 0xFF]) + q[1:], "spoofed.lan"))
+        resolver = _resolver(methods=["dns"], timeout=0.2)
+        resolver.DNS_PORT = port
+
+        assert resolver.resolve([("127.0.0.1", MAC)]) == {}
+
+    def test_resolve_async_in_running_loop(self, stub_server):
+        """Test that many hosts resolve concurrently from a coroutine."""
+        port, state = stub_server(lambda q: ptr_reply(q, "h-" + _qname(q).split(".")[0] + ".lan"))
+        resolver = _resolver(methods=["dns"], concurrency=4)
+        resolver.DNS_PORT = port
+        # Every query goes to the stub nameserver; the addresses are never contacted
+        hosts = [(f"10.0.0.{i}", f"02:00:00:00:00:{i:02x}") for i in range(1, 21)]
+
+        hostnames = asyncio.run(resolver.resolve_async(hosts))
+
+        assert hostnames == {mac: f"h-{ip.split('.')[-1]}.lan" for ip, mac in hosts}
+        assert state["queries"] == 20
+
+    def test_unknown_method(self):
+        """Test that an unknown method is rejected."""
+        with pytest.raises(ValueError, match="Unknown resolution method"):
+            HostnameResolver(methods=["wins"])
+
+
+def _qname(query: bytes) -> str:
+    labels, pos = [], 12
+    while query[pos]:
+        labels.append(query[pos + 1:pos + 1 + query[pos]].decode())
+        pos += 1 + query[pos]
+    return ".".join(labels)
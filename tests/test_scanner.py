@@ -5,11 +5,15 @@ import json
 import csv
 import subprocess
 import datetime
+import threading
 from unittest.mock import patch, MagicMock, call
 from pathlib import Path
 
-from simple_scanner.scanner import NetworkMonitor, autodetect_network
+from simple_scanner.scanner import NetworkMonitor, autodetect_network, autodetect_networks, shard_network
 from simple_scanner.models import Device
+from simple_scanner.neighbors import NUD_REACHABLE, NUD_STALE, Neighbor
+from simple_scanner.parsers import HostRecord
+from simple_scanner.events import DeviceJoined, DeviceLeft, HostnameChanged, IpChanged, VendorChanged
 
 
 class TestAutodetectNetwork:
@@ -456,4 +460,713 @@ MAC Address: AA:BB:CC:DD:EE:FF (Manufacturer)"""
         device = devices[0]
         assert device.mac_address == 'aa:bb:cc:dd:ee:ff'
         assert device.ip_address == '192.168.1.150'  # Updated IP
-        assert device.date_added == old_date  # Preserved
\ No newline at end of file
+        assert device.date_added == old_date  # Preserved
+
+    def test_parse_journals_only_changed_devices(self, mock_nmap_executable, tmp_path):
+        """Test that repeated scans append changes instead of rewriting devices.json."""
+        data_file = tmp_path / "devices.json"
+        first_output = """Nmap scan report for 192.168.1.1
+MAC Address: AA:BB:CC:DD:EE:FF (Router)
+Nmap scan report for 192.168.1.2
+MAC Address: 11:22:33:44:55:66 (Laptop)"""
+        second_output = """Nmap scan report for 192.168.1.3
+MAC Address: 11:22:33:44:55:66 (Laptop)"""
+
+        with patch('simple_scanner.scanner.get_core_data_file', return_value=data_file):
+            monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=True)
+            monitor._parse(first_output)
+            snapshot = data_file.read_text(encoding='utf-8')
+            monitor._parse(second_output)
+
+            assert data_file.read_text(encoding='utf-8') == snapshot
+            journal = data_file.with_name('devices.json.journal').read_text(encoding='utf-8')
+            assert len(journal.splitlines()) == 1
+
+            reloaded = NetworkMonitor(network='192.168.1.0/24', use_persistence=True)
+
+        device = next(d for d in reloaded.devices() if d.mac_address == '11:22:33:44:55:66')
+        assert device.ip_address == '192.168.1.3'
+        assert len(reloaded.devices()) == 2
+
+
+class TestScanStream:
+    """Test cases for streaming scans."""
+
+    @staticmethod
+    def _mock_popen(lines, returncode=0, stderr=""):
+        process = MagicMock()
+        process.stdout = iter(line + "\n" for line in lines)
+        process.stderr.read.return_value = stderr
+        process.wait.return_value = returncode
+        process.poll.return_value = returncode
+        return process
+
+    def test_scan_stream_reports_devices_incrementally(self, mock_nmap_executable, sample_nmap_output):
+        """Test that each device is upserted before the next host is read."""
+        with patch('simple_scanner.scanner.get_core_data_file') as mock_get_file:
+            mock_get_file.return_value.exists.return_value = False
+            monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+
+        counts = []
+        process = self._mock_popen(sample_nmap_output.splitlines())
+        with patch('subprocess.Popen', return_value=process) as mock_popen:
+            monitor.scan_stream(on_device=lambda d: counts.append(len(monitor.devices())))
+
+        assert mock_popen.call_args[0][0][1:] == ['-sn', '192.168.1.0/24']
+        assert counts == [1, 2, 3]
+        assert {d.mac_address for d in monitor.devices()} == {
+            'aa:bb:cc:dd:ee:ff', '11:22:33:44:55:66', '77:88:99:aa:bb:cc'
+        }
+
+    def test_scan_stream_failure(self, mock_nmap_executable):
+        """Test that a non-zero exit code raises after the output is consumed."""
+        with patch('simple_scanner.scanner.get_core_data_file') as mock_get_file:
+            mock_get_file.return_value.exists.return_value = False
+            monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+
+        process = self._mock_popen([], returncode=1, stderr="Permission denied")
+        with patch('subprocess.Popen', return_value=process):
+            with pytest.raises(RuntimeError, match="Nmap scan failed.*Permission denied"):
+                monitor.scan_stream()
+
+    def test_scan_stream_file_not_found(self, mock_nmap_executable):
+        """Test handling of FileNotFoundError when spawning nmap."""
+        with patch('simple_scanner.scanner.get_core_data_file') as mock_get_file:
+            mock_get_file.return_value.exists.return_value = False
+            monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+
+        with patch('subprocess.Popen', side_effect=FileNotFoundError()):
+            with pytest.raises(RuntimeError, match="Nmap executable not found"):
+                monitor.scan_stream()
+
+
+class TestShardedScan:
+    """Test cases for sharded scanning across a worker pool."""
+
+    def test_shard_network_splits_large_cidr(self):
+        """Test that networks larger than the shard size are split."""
+        shards = shard_network('10.0.0.0/22')
+        assert shards == ['10.0.0.0/24', '10.0.1.0/24', '10.0.2.0/24', '10.0.3.0/24']
+
+    def test_shard_network_keeps_small_and_non_cidr_targets(self):
+        """Test that small networks, lists and ranges pass through."""
+        shards = shard_network('192.168.1.0/24, 192.168.2.0/25 10.0.0.1-50')
+        assert shards == ['192.168.1.0/24', '192.168.2.0/25', '10.0.0.1-50']
+
+    def test_scan_merges_shards(self, mock_nmap_executable):
+        """Test that each shard gets its own nmap process and results are merged."""
+        with patch('simple_scanner.scanner.get_core_data_file') as mock_get_file:
+            mock_get_file.return_value.exists.return_value = False
+            monitor = NetworkMonitor(network='10.0.0.0/23', use_persistence=False, max_workers=2)
+
+        outputs = {
+            '10.0.0.0/24': "Nmap scan report for 10.0.0.5\nMAC Address: AA:AA:AA:AA:AA:01 (Vendor A)",
+            '10.0.1.0/24': "Nmap scan report for 10.0.1.7\nMAC Address: AA:AA:AA:AA:AA:02 (Vendor B)",
+        }
+
+        def fake_run(cmd, **kwargs):
+            result = MagicMock()
+            result.returncode = 0
+            result.stdout = outputs[cmd[-1]]
+            result.stderr = ""
+            return result
+
+        with patch('subprocess.run', side_effect=fake_run) as mock_run:
+            monitor.scan()
+
+        assert mock_run.call_count == 2
+        assert {d.ip_address for d in monitor.devices()} == {'10.0.0.5', '10.0.1.7'}
+
+    def test_scan_single_worker_uses_one_process(self, mock_nmap_executable, sample_nmap_output):
+        """Test that a single worker scans every target in one nmap call."""
+        with patch('simple_scanner.scanner.get_core_data_file') as mock_get_file:
+            mock_get_file.return_value.exists.return_value = False
+            monitor = NetworkMonitor(network='10.0.0.0/23,10.0.5.0/24', use_persistence=False)
+
+        mock_result = MagicMock()
+        mock_result.returncode = 0
+        mock_result.stdout = sample_nmap_output
+        mock_result.stderr = ""
+
+        with patch('subprocess.run', return_value=mock_result) as mock_run:
+            monitor.scan()
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][1:] == ['-sn', '10.0.0.0/23', '10.0.5.0/24']
+        assert len(monitor.devices()) == 3
+
+    def test_scan_shard_failure_skips_stale_removal(self, mock_nmap_executable):
+        """Test that a failing shard aborts the scan before stale devices are pruned."""
+        with patch('simple_scanner.scanner.get_core_data_file') as mock_get_file:
+            mock_get_file.return_value.exists.return_value = False
+            monitor = NetworkMonitor(network='10.0.0.0/23', remove_stale=True,
+                                     use_persistence=False, max_workers=2)
+        monitor._devices['aa:aa:aa:aa:aa:99'] = Device('aa:aa:aa:aa:aa:99', '10.0.1.99')
+
+        mock_result = MagicMock()
+        mock_result.returncode = 1
+        mock_result.stdout = ""
+        mock_result.stderr = "boom"
+
+        with patch('subprocess.run', return_value=mock_result):
+            with pytest.raises(RuntimeError, match="boom"):
+                monitor.scan()
+
+        assert 'aa:aa:aa:aa:aa:99' in monitor._devices
+
+
+class TestXmlParserBackend:
+    """Test cases for selecting the XML parser backend."""
+
+    def test_invalid_parser_raises_error(self, mock_nmap_executable):
+        """Test that an unknown parser name is rejected."""
+        with pytest.raises(ValueError, match="Unknown parser"):
+            NetworkMonitor(network='192.168.1.0/24', use_persistence=False, parser='html')
+
+    def test_scan_with_xml_parser(self, mock_nmap_executable):
+        """Test that the XML backend asks nmap for XML and parses it."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False, parser='xml')
+
+        mock_result = MagicMock()
+        mock_result.returncode = 0
+        mock_result.stdout = """<?xml version="1.0"?>
+<nmaprun>
+<host><status state="up"/>
+<address addr="192.168.1.1" addrtype="ipv4"/>
+<address addr="AA:BB:CC:DD:EE:FF" addrtype="mac" vendor="Cisco Systems"/>
+<hostnames><hostname name="router.local" type="PTR"/></hostnames>
+</host>
+</nmaprun>"""
+        mock_result.stderr = ""
+
+        with patch('subprocess.run', return_value=mock_result) as mock_run:
+            monitor.scan()
+
+        assert mock_run.call_args[0][0][1:] == ['-sn', '-oX', '-', '192.168.1.0/24']
+        device = monitor.devices()[0]
+        assert device.mac_address == 'aa:bb:cc:dd:ee:ff'
+        assert device.hostname == 'router.local'
+        assert device.manufacturer == 'Cisco Systems'
+
+
+class TestSQLiteBackend:
+    """Test cases for NetworkMonitor with the SQLite backend."""
+
+    def test_parse_persists_and_reloads_lazily(self, mock_nmap_executable, tmp_path, sample_nmap_output):
+        """Test that scans are written to the database and read back on demand."""
+        db_file = tmp_path / "devices.db"
+        with patch('simple_scanner.scanner.get_database_file', return_value=db_file), \
+             patch('simple_scanner.scanner.get_core_data_file', return_value=tmp_path / "devices.json"):
+            monitor = NetworkMonitor(network='192.168.1.0/24', backend='sqlite')
+            monitor._parse(sample_nmap_output)
+
+            reloaded = NetworkMonitor(network='192.168.1.0/24', backend='sqlite')
+
+        assert reloaded._devices._cache == {}
+        assert len(reloaded.devices()) == 3
+        assert reloaded._devices['77:88:99:aa:bb:cc'].hostname == 'hostname.local'
+
+    def test_find_devices_pushes_down_to_database(self, mock_nmap_executable, tmp_path, sample_nmap_output):
+        """Test that find_devices queries the store and returns tracked instances."""
+        with patch('simple_scanner.scanner.get_database_file', return_value=tmp_path / "devices.db"), \
+             patch('simple_scanner.scanner.get_core_data_file', return_value=tmp_path / "devices.json"):
+            monitor = NetworkMonitor(network='192.168.1.0/24', backend='sqlite')
+            monitor._parse(sample_nmap_output)
+
+        with patch.object(monitor._store, 'query', wraps=monitor._store.query) as mock_query:
+            found = monitor.find_devices(search='router')
+
+        mock_query.assert_called_once()
+        assert [d.ip_address for d in found] == ['192.168.1.1']
+        assert found[0] is monitor._devices['aa:bb:cc:dd:ee:ff']
+
+    def test_find_devices_holds_lock_against_background_writer(self, mock_nmap_executable, tmp_path,
+                                                               sample_nmap_output):
+        """Test that the flush and query in find_devices can't interleave with a background save."""
+        with patch('simple_scanner.scanner.get_database_file', return_value=tmp_path / "devices.db"), \
+             patch('simple_scanner.scanner.get_core_data_file', return_value=tmp_path / "devices.json"):
+            monitor = NetworkMonitor(network='192.168.1.0/24', backend='sqlite', save_interval=60)
+            monitor._parse(sample_nmap_output)
+            monitor.flush()
+            monitor._parse(sample_nmap_output)  # Left for the writer's next interval
+
+        def query(**filters):
+            # Another thread, like the background writer, must not get the lock now
+            blocked = []
+            thread = threading.Thread(target=lambda: blocked.append(not monitor._lock.acquire(timeout=0)))
+            thread.start()
+            thread.join()
+            assert blocked == [True]
+            return []
+
+        with patch.object(monitor._store, 'query', side_effect=query):
+            assert monitor.find_devices(search='router') == []
+        assert not monitor._dirty
+        monitor.close()
+
+    def test_imports_existing_json_inventory(self, mock_nmap_executable, tmp_path):
+        """Test that an empty database is seeded from devices.json."""
+        json_file = tmp_path / "devices.json"
+        json_file.write_text(json.dumps([{
+            'mac_address': 'aa:bb:cc:dd:ee:ff',
+            'ip_address': '192.168.1.100',
+            'date_added': '2023-01-01T10:00:00+00:00',
+            'last_seen': '2023-01-01T11:00:00+00:00'
+        }]), encoding='utf-8')
+
+        with patch('simple_scanner.scanner.get_database_file', return_value=tmp_path / "devices.db"), \
+             patch('simple_scanner.scanner.get_core_data_file', return_value=json_file):
+            monitor = NetworkMonitor(network='192.168.1.0/24', backend='sqlite')
+
+        assert [d.ip_address for d in monitor.devices()] == ['192.168.1.100']
+
+    def test_find_devices_without_store(self, mock_nmap_executable, sample_nmap_output):
+        """Test that the in-memory fallback applies the same filters."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        monitor._parse(sample_nmap_output)
+
+        assert [d.ip_address for d in monitor.find_devices(search='MANUFACTURER')] == [
+            '192.168.1.1', '192.168.1.100', '192.168.1.50'
+        ]
+        assert [d.ip_address for d in monitor.find_devices(hostname_prefix='HOST')] == ['192.168.1.50']
+        assert [d.ip_address for d in monitor.find_devices(manufacturer='router manufacturer')] == ['192.168.1.1']
+
+
+class TestSightingHistoryTracking:
+    """Test cases for NetworkMonitor's sighting history."""
+
+    def test_scans_are_recorded_and_saved(self, mock_nmap_executable, tmp_path, sample_nmap_output):
+        """Test that each parsed scan lands in the history and is saved to disk."""
+        history_file = tmp_path / "history.bin"
+        with patch('simple_scanner.scanner.get_core_data_file', return_value=tmp_path / "devices.json"), \
+             patch('simple_scanner.scanner.get_history_file', return_value=history_file):
+            monitor = NetworkMonitor(network='192.168.1.0/24', track_history=True)
+            monitor._parse(sample_nmap_output)
+
+            reloaded = NetworkMonitor(network='192.168.1.0/24', track_history=True)
+
+        sighting = reloaded.history.where_was('77:88:99:aa:bb:cc', datetime.datetime.now(datetime.timezone.utc))
+        assert sighting.ip_address == '192.168.1.50'
+        assert sighting.hostname == 'hostname.local'
+        assert reloaded.history.uptime('aa:bb:cc:dd:ee:ff') == 1.0
+
+    def test_clock_step_back_keeps_scan(self, mock_nmap_executable, sample_nmap_output):
+        """Test that a scan after the clock stepped back still updates devices."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False, track_history=True)
+        future = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+        monitor.history.record_scan(future, [])
+
+        monitor._parse(sample_nmap_output)
+
+        assert len(monitor.devices()) == 3
+        assert monitor.history.where_was('aa:bb:cc:dd:ee:ff', future) is None
+
+    def test_history_disabled_by_default(self, mock_nmap_executable, sample_nmap_output):
+        """Test that no history is kept unless requested."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        monitor._parse(sample_nmap_output)
+
+        assert monitor.history is None
+
+
+class TestChangeEvents:
+    """Test cases for the change events published by scans."""
+
+    def test_first_scan_reports_new_devices(self, mock_nmap_executable, sample_nmap_output):
+        """Test that every device of the first scan joins as a first sighting."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        received = []
+        monitor.subscribe(received.append)
+
+        monitor._parse(sample_nmap_output)
+
+        assert [type(e) for e in received] == [DeviceJoined] * 3
+        assert all(e.first_seen for e in received)
+        assert list(monitor.events()) == received
+
+    def test_unchanged_scan_has_no_events(self, mock_nmap_executable, sample_nmap_output):
+        """Test that repeating the same scan publishes nothing."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        monitor._parse(sample_nmap_output)
+        monitor._parse(sample_nmap_output)
+
+        assert list(monitor.events()) == []
+
+    def test_changes_and_departures(self, mock_nmap_executable, sample_nmap_output):
+        """Test that IP, hostname and vendor changes and departures are reported."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        monitor._parse(sample_nmap_output)
+
+        monitor._parse(
+            "Nmap scan report for router.lan (192.168.1.2)\n"
+            "Host is up (0.001s latency).\n"
+            "MAC Address: AA:BB:CC:DD:EE:FF (New Vendor)\n"
+        )
+        events = {type(e): e for e in monitor.events()}
+
+        assert set(events) == {IpChanged, HostnameChanged, VendorChanged, DeviceLeft}
+        assert (events[IpChanged].old_ip, events[IpChanged].new_ip) == ('192.168.1.1', '192.168.1.2')
+        assert events[HostnameChanged].new_hostname == 'router.lan'
+        assert events[VendorChanged].old_manufacturer == 'Router Manufacturer'
+        left = [e.device.mac_address for e in monitor.events() if isinstance(e, DeviceLeft)]
+        assert left == ['11:22:33:44:55:66', '77:88:99:aa:bb:cc']
+
+    def test_returning_device_is_not_first_seen(self, mock_nmap_executable, sample_nmap_output):
+        """Test that a known device coming back joins without first_seen."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        monitor._parse(sample_nmap_output)
+        monitor._parse("")
+        monitor._parse(sample_nmap_output)
+
+        joined = list(monitor.events())
+        assert len(joined) == 3
+        assert not any(e.first_seen for e in joined)
+
+    def test_failing_subscriber_does_not_abort_scan(self, mock_nmap_executable, sample_nmap_output):
+        """Test that an exception in a subscriber does not stop other subscribers."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        received = []
+        monitor.subscribe(MagicMock(side_effect=RuntimeError("boom")))
+        monitor.subscribe(received.append)
+
+        monitor._parse(sample_nmap_output)
+
+        assert len(received) == 3
+        assert len(monitor.devices()) == 3
+
+
+class TestSearchIndex:
+    """Test cases for NetworkMonitor's indexed search."""
+
+    def test_index_follows_scans(self, mock_nmap_executable, sample_nmap_output):
+        """Test that searches see devices added, changed and pruned by later scans."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False, remove_stale=True)
+        monitor._parse(sample_nmap_output)
+        assert monitor.search_macs('hostname') == {'77:88:99:aa:bb:cc'}
+
+        monitor._parse(
+            "Nmap scan report for renamed.local (192.168.1.50)\n"
+            "MAC Address: 77:88:99:AA:BB:CC (Another Manufacturer)\n"
+        )
+
+        assert monitor.search_macs('hostname') == set()
+        assert monitor.search_macs('renamed') == {'77:88:99:aa:bb:cc'}
+        assert monitor.search_macs('manufacturer') == {'77:88:99:aa:bb:cc'}
+
+    def test_find_devices_uses_index(self, mock_nmap_executable, sample_nmap_output):
+        """Test that find_devices answers search from the index."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        monitor._parse(sample_nmap_output)
+
+        with patch.object(monitor, 'devices', side_effect=AssertionError("full scan")):
+            found = monitor.find_devices(search='ROUTER')
+
+        assert [d.ip_address for d in found] == ['192.168.1.1']
+
+
+class TestSweepEngine:
+    """Test cases for NetworkMonitor with the in-process sweep engine."""
+
+    def test_sweep_engine_does_not_need_nmap(self):
+        """Test that the sweep engine works without nmap installed."""
+        with patch('shutil.which', return_value=None):
+            monitor = NetworkMonitor(network='192.168.1.0/30', use_persistence=False, engine='sweep')
+
+        records = [HostRecord('192.168.1.1', 'aa:bb:cc:dd:ee:01', latency=0.002)]
+        with patch.object(monitor.sweeper, 'sweep', return_value=records) as sweep:
+            monitor.scan()
+
+        sweep.assert_called_once_with(['192.168.1.0/30'])
+        assert [d.mac_address for d in monitor.devices()] == ['aa:bb:cc:dd:ee:01']
+
+    def test_unknown_engine(self, mock_nmap_executable):
+        """Test that an unknown engine is rejected."""
+        with pytest.raises(ValueError):
+            NetworkMonitor(network='192.168.1.0/24', use_persistence=False, engine='masscan')
+
+
+class TestPassiveDiscovery:
+    """Test cases for sightings from the kernel neighbor table."""
+
+    def test_refresh_updates_last_seen_without_departures(self, mock_nmap_executable, sample_nmap_output):
+        """Test that neighbor sightings refresh devices but never mark others as gone."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False, remove_stale=True)
+        monitor._parse(sample_nmap_output)
+        router = monitor._devices['aa:bb:cc:dd:ee:ff']
+        router.last_seen = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        neighbors = [
+            Neighbor('192.168.1.1', 'aa:bb:cc:dd:ee:ff', 'eth0', NUD_REACHABLE),
+            Neighbor('192.168.1.60', '02:00:00:00:00:60', 'eth0', NUD_REACHABLE),
+            Neighbor('192.168.1.61', '02:00:00:00:00:61', 'eth0', NUD_STALE),  # Not fresh
+            Neighbor('10.9.9.9', '02:00:00:00:00:99', 'eth1', NUD_REACHABLE),  # Other network
+        ]
+
+        with patch('simple_scanner.scanner.read_neighbors', return_value=neighbors):
+            refreshed = monitor.refresh_neighbors()
+
+        assert [d.mac_address for d in refreshed] == ['aa:bb:cc:dd:ee:ff', '02:00:00:00:00:60']
+        assert router.last_seen.year > 2024
+        assert len(monitor.devices()) == 4  # Nothing pruned despite remove_stale
+        assert [type(e) for e in monitor.events()] == [DeviceJoined]
+        assert monitor.last_events[0].first_seen
+
+
+class TestTargetedProbe:
+    """Test cases for probing a subset of addresses."""
+
+    def test_probe_only_marks_probed_addresses_departed(self, mock_nmap_executable, sample_nmap_output):
+        """Test that silence at a probed address is a departure and elsewhere is not."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False, remove_stale=True)
+        monitor._parse(sample_nmap_output)
+        reply = (
+            "Nmap scan report for 192.168.1.1\n"
+            "MAC Address: AA:BB:CC:DD:EE:FF (Router Manufacturer)\n"
+        )
+
+        with patch.object(monitor, '_run_command', return_value=reply) as run:
+            answered = monitor.probe(['192.168.1.1', '192.168.1.100'])
+
+        run.assert_called_once_with('192.168.1.1 192.168.1.100')
+        assert answered == {'192.168.1.1'}
+        assert [(type(e), e.device.ip_address) for e in monitor.events()] == [(DeviceLeft, '192.168.1.100')]
+        assert len(monitor.devices()) == 3  # Nothing pruned by a partial probe
+
+
+class TestSnapshot:
+    """Test cases for reading devices while scans run on other threads."""
+
+    def test_snapshot_is_detached(self, mock_nmap_executable, sample_nmap_output):
+        """Test that snapshot copies are not changed by later scans."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        monitor._parse(sample_nmap_output)
+        snapshot = {d.mac_address: d for d in monitor.snapshot()}
+
+        monitor._parse(
+            "Nmap scan report for 192.168.1.77\n"
+            "MAC Address: AA:BB:CC:DD:EE:FF (Router Manufacturer)\n"
+        )
+
+        assert snapshot['aa:bb:cc:dd:ee:ff'].ip_address == '192.168.1.1'
+        assert monitor._devices['aa:bb:cc:dd:ee:ff'].ip_address == '192.168.1.77'
+
+    def test_reads_during_scan_wait_for_consistent_state(self, mock_nmap_executable, sample_nmap_output):
+        """Test that devices() can run while a scan thread is merging records."""
+        import threading
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        errors = []
+
+        def read():
+            try:
+                for _ in range(2000):
+                    monitor.devices()
+                    monitor.search_macs('192')
+            except Exception as e:  # "dictionary changed size during iteration"
+                errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(200):
+            monitor._parse(f"Nmap scan report for 10.0.{i // 250}.{i % 250}\nMAC Address: 02:00:00:00:{i // 256:02x}:{i % 256:02x}\n")
+        reader.join()
+
+        assert errors == []
+
+
+class TestNetworkScopedScan:
+    """Test cases for scanning one of several monitored networks."""
+
+    OTHER = "Nmap scan report for 10.0.0.5\nMAC Address: 02:00:00:00:00:05 (Other)\n"
+
+    def test_devices_are_tagged_with_their_network(self, mock_nmap_executable, sample_nmap_output):
+        """Test that each device records which monitored network it was seen on."""
+        monitor = NetworkMonitor(network='192.168.1.0/24,10.0.0.0/24', use_persistence=False)
+        monitor._parse(self.OTHER + sample_nmap_output)
+
+        assert {d.ip_address: d.network for d in monitor.devices()} == {
+            '192.168.1.1': '192.168.1.0/24',
+            '192.168.1.100': '192.168.1.0/24',
+            '192.168.1.50': '192.168.1.0/24',
+            '10.0.0.5': '10.0.0.0/24',
+        }
+
+    def test_scan_of_one_network_leaves_others_alone(self, mock_nmap_executable, sample_nmap_output):
+        """Test that departures and pruning are limited to the scanned network."""
+        monitor = NetworkMonitor(network='192.168.1.0/24,10.0.0.0/24', use_persistence=False, remove_stale=True)
+        monitor._parse(self.OTHER + sample_nmap_output)
+        reply = "Nmap scan report for 192.168.1.1\nMAC Address: AA:BB:CC:DD:EE:FF (Router Manufacturer)\n"
+
+        with patch.object(monitor, '_run_command', return_value=reply) as run:
+            monitor.scan(network='192.168.1.0/24')
+
+        run.assert_called_once_with('192.168.1.0/24')
+        assert sorted(d.ip_address for d in monitor.devices()) == ['10.0.0.5', '192.168.1.1']
+        assert sorted(e.device.ip_address for e in monitor.events()) == ['192.168.1.100', '192.168.1.50']
+
+        # The other network's device is still present: a later empty scan of it reports it gone
+        with patch.object(monitor, '_run_command', return_value=""):
+            monitor.scan(network='10.0.0.0/24')
+        assert [e.device.ip_address for e in monitor.events()] == ['10.0.0.5']
+
+    def test_autodetect_networks_skips_unwanted(self):
+        """Test that every interface subnet is returned except loopback and host-only ones."""
+        routes = [('lo', '127.0.0.0/8'), ('eth0', '192.168.1.0/24'), ('vboxnet0', '192.168.56.0/24'),
+                  ('wlan0', '10.0.0.0/22')]
+        with patch('simple_scanner.scanner.connected_networks', return_value=routes):
+            assert autodetect_networks() == ['192.168.1.0/24', '10.0.0.0/22']
+
+        with patch('simple_scanner.scanner.connected_networks', return_value=[]), \
+             patch('simple_scanner.scanner.autodetect_network', return_value='192.168.0.0/24'):
+            assert autodetect_networks() == ['192.168.0.0/24']
+
+
+class TestMacVendorLookup:
+    """Test cases for filling in vendors from the offline OUI table."""
+
+    OUTPUT = ("Nmap scan report for 192.168.1.7\nMAC Address: B8:27:EB:00:00:07 (Unknown)\n"
+              "Nmap scan report for 192.168.1.1\nMAC Address: AA:BB:CC:DD:EE:FF (Router Manufacturer)\n")
+
+    @pytest.fixture
+    def oui_file(self, tmp_path):
+        from simple_scanner.oui import compile_database
+        source = tmp_path / "nmap-mac-prefixes"
+        source.write_text("B827EB Raspberry Pi Foundation\nAABBCC Table Vendor\n")
+        path = tmp_path / "oui.bin"
+        compile_database([source], path)
+        return path
+
+    def test_lookup_fills_missing_vendor(self, mock_nmap_executable, oui_file):
+        """Test that only vendors nmap didn't report come from the table."""
+        monitor = NetworkMonitor(use_persistence=False, mac_lookup=True)
+        with patch('simple_scanner.scanner.get_oui_file', return_value=oui_file):
+            monitor._parse(self.OUTPUT)
+
+        vendors = {d.mac_address: d.manufacturer for d in monitor.devices()}
+        assert vendors == {'b8:27:eb:00:00:07': 'Raspberry Pi Foundation',
+                           'aa:bb:cc:dd:ee:ff': 'Router Manufacturer'}
+
+    def test_lookup_is_off_by_default(self, mock_nmap_executable, oui_file):
+        """Test that the table isn't consulted unless asked for."""
+        monitor = NetworkMonitor(use_persistence=False)
+        with patch('simple_scanner.scanner.get_oui_file', return_value=oui_file):
+            monitor._parse(self.OUTPUT)
+
+        assert monitor._devices['b8:27:eb:00:00:07'].manufacturer == 'Unknown'
+
+    def test_unreadable_table_disables_lookup(self, mock_nmap_executable, tmp_path):
+        """Test that a corrupt table is reported once and lookups stop."""
+        bad = tmp_path / "oui.bin"
+        bad.write_bytes(b"\x02\x00\x00\x00{}")
+        monitor = NetworkMonitor(use_persistence=False, mac_lookup=True)
+        with patch('simple_scanner.scanner.get_oui_file', return_value=bad):
+            monitor._parse(self.OUTPUT)
+
+        assert monitor.mac_lookup is False
+        assert monitor._devices['b8:27:eb:00:00:07'].manufacturer == 'Unknown'
+
+
+class TestHostnameResolution:
+    """Test cases for resolving hostnames after the scan instead of in nmap."""
+
+    def test_nmap_skips_reverse_dns(self, mock_nmap_executable):
+        """Test that nmap is run with -n when hostnames are resolved separately."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False, resolve_hostnames=True)
+        assert monitor._nmap_args() == ['-sn', '-n']
+        monitor.parser = 'xml'
+        assert monitor._nmap_args() == ['-sn', '-n', '-oX', '-']
+
+    def test_resolved_names_fill_devices(self, mock_nmap_executable, sample_nmap_output):
+        """Test that only hosts without a name are resolved, and changes are published."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False, resolve_hostnames=True)
+        with patch.object(monitor.resolver, 'resolve', return_value={'aa:bb:cc:dd:ee:ff': 'router.lan'}) as resolve:
+            monitor._parse(sample_nmap_output)
+
+        resolve.assert_called_once_with([('192.168.1.1', 'aa:bb:cc:dd:ee:ff'),
+                                         ('192.168.1.100', '11:22:33:44:55:66')])
+        hostnames = {d.mac_address: d.hostname for d in monitor.devices()}
+        assert hostnames == {'aa:bb:cc:dd:ee:ff': 'router.lan', '11:22:33:44:55:66': None,
+                             '77:88:99:aa:bb:cc': 'hostname.local'}
+        changes = [e for e in monitor.events() if isinstance(e, HostnameChanged)]
+        assert [(e.old_hostname, e.new_hostname) for e in changes] == [(None, 'router.lan')]
+
+    def test_resolution_is_off_by_default(self, mock_nmap_executable, sample_nmap_output):
+        """Test that the resolver isn't used unless enabled."""
+        monitor = NetworkMonitor(network='192.168.1.0/24', use_persistence=False)
+        with patch.object(monitor.resolver, 'resolve') as resolve:
+            monitor._parse(sample_nmap_output)
+
+        resolve.assert_not_called()
+        assert monitor._nmap_args() == ['-sn']
+
+
+class TestBackgroundPersistence:
+    """Test cases for background saves and corrupt inventories."""
+
+    def test_corrupt_inventory_is_kept(self, mock_nmap_executable, tmp_path, sample_nmap_output):
+        """Test that an unreadable devices.json is moved aside, not overwritten by the next save."""
+        data_file = tmp_path / "devices.json"
+        data_file.write_text('[{"mac_address": "aa:bb', encoding='utf-8')
+
+        with patch('simple_scanner.scanner.get_core_data_file', return_value=data_file):
+            monitor = NetworkMonitor(network='192.168.1.0/24')
+            monitor._parse(sample_nmap_output)
+
+        corrupt = list(tmp_path.glob("devices.json.*.corrupt"))
+        assert [p.read_text(encoding='utf-8') for p in corrupt] == ['[{"mac_address": "aa:bb']
+        assert len(json.loads(data_file.read_text(encoding='utf-8'))) == 3
+
+    def test_scans_are_saved_in_background(self, mock_nmap_executable, tmp_path, sample_nmap_output):
+        """Test that with save_interval scans only queue a save, and close() writes it."""
+        data_file = tmp_path / "devices.json"
+        with patch('simple_scanner.scanner.get_core_data_file', return_value=data_file):
+            monitor = NetworkMonitor(network='192.168.1.0/24', save_interval=60)
+            with patch.object(monitor, '_save_core_data', wraps=monitor._save_core_data) as save:
+                monitor._parse(sample_nmap_output)
+                monitor.flush()
+                for _ in range(3):
+                    monitor._parse(sample_nmap_output)
+                assert save.call_count == 1  # The later scans wait for the interval
+                monitor.close()
+
+            assert save.call_count == 2
+            assert not monitor._dirty
+            reloaded = NetworkMonitor(network='192.168.1.0/24')
+
+        assert len(reloaded.devices()) == 3
+
+    def test_unknown_fsync_policy(self, mock_nmap_executable):
+        """Test that an unknown fsync policy is rejected."""
+        with pytest.raises(ValueError, match="Unknown fsync policy"):
+            NetworkMonitor(network='192.168.1.0/24', use_persistence=False, fsync='sometimes')
+
+
+class TestLazyJsonInventory:
+    """Test cases for opening the JSON inventory without parsing it."""
+
+    def test_scan_reads_only_seen_devices(self, mock_nmap_executable, tmp_path, sample_nmap_output):
+        """Test that startup parses nothing and a scan parses only the devices it saw."""
+        data_file = tmp_path / "devices.json"
+        stamp = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        known = [Device('aa:bb:cc:dd:ee:ff', '192.168.1.1', None, None, stamp, stamp)]
+        known += [Device(f'02:00:00:00:00:{n:02x}', f'192.168.1.{n + 150}', None, None, stamp, stamp)
+                  for n in range(50)]
+        with patch('simple_scanner.scanner.get_core_data_file', return_value=data_file):
+            seed = NetworkMonitor(network='192.168.1.0/24')
+            seed._devices.update((d.mac_address, d) for d in known)
+            seed._dirty.update(d.mac_address for d in known)
+            seed._save_core_data()
+
+            with patch('simple_scanner.storage.Device.from_dict', wraps=Device.from_dict) as from_dict:
+                monitor = NetworkMonitor(network='192.168.1.0/24')
+                assert from_dict.call_count == 0
+                monitor._parse(sample_nmap_output)
+                assert from_dict.call_count == 1  # The router; the other two are new
+
+        assert monitor._devices['aa:bb:cc:dd:ee:ff'].date_added == stamp
+        assert len(monitor.devices()) == 53
+
+        # Later listings come from memory and return the tracked instances
+        with patch('simple_scanner.storage.Device.from_dict', wraps=Device.from_dict) as from_dict:
+            devices = monitor.devices()
+            assert from_dict.call_count == 0
+        assert all(a is b for a, b in zip(devices, monitor.devices()))
+        assert any(d is monitor._devices['02:00:00:00:00:00'] for d in devices)
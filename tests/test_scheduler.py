@@ -0,0 +1,89 @@
+"""Tests for the adaptive probe scheduler."""
+
+import datetime
+
+import pytest
+
+from simple_scanner.models import Device
+from simple_scanner.scheduler import AdaptiveScheduler, parse_ranges
+
+T0 = 1_700_000_000.0
+
+
+def _device(ip, seen):
+    when = datetime.datetime.fromtimestamp(seen, datetime.timezone.utc)
+    return Device(mac_address=f"02:00:00:00:00:{ip.rsplit('.', 1)[1].zfill(2)}", ip_address=ip,
+                  date_added=when, last_seen=when)
+
+
+class TestParseRanges:
+    """Test cases for DHCP pool range parsing."""
+
+    def test_ranges_and_cidrs(self):
+        """Test that dashed ranges and CIDRs become inclusive bounds."""
+        assert parse_ranges(["10.0.0.10-10.0.0.20", "10.0.1.0/30"]) == [
+            (167772170, 167772180), (167772416, 167772419)
+        ]
+
+    def test_invalid(self):
+        """Test that malformed and reversed ranges are rejected."""
+        with pytest.raises(ValueError):
+            parse_ranges(["10.0.0.20-10.0.0.10"])
+        with pytest.raises(ValueError):
+            parse_ranges(["dhcp"])
+
+
+class TestAdaptiveScheduler:
+    """Test cases for choosing which addresses to probe."""
+
+    def test_unseeded_sweep_respects_budget(self):
+        """Test that a fresh scheduler sweeps everything at the budget's pace."""
+        scheduler = AdaptiveScheduler("10.0.0.0/28", probe_budget=5)
+
+        assert scheduler.next_batch(T0) == ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4", "10.0.0.5"]
+        assert len(scheduler.next_batch(T0 + 1)) == 5
+        assert len(scheduler.next_batch(T0 + 2)) == 4  # Only 14 hosts
+        assert scheduler.next_batch(T0 + 3) == []
+
+    def test_online_hosts_are_probed_before_they_age_out(self):
+        """Test that answering hosts come due at the online margin, cold space much later."""
+        scheduler = AdaptiveScheduler("10.0.0.0/29", probe_budget=100, online_seconds=120, cold_seconds=900)
+        scheduler.seed([_device("10.0.0.2", T0 - 10)], now=T0)
+
+        assert scheduler.next_batch(T0 + 60) == []
+        assert scheduler.next_batch(T0 + 80) == ["10.0.0.2"]  # Seen at T0-10, due at +80
+        scheduler.record(["10.0.0.2"], ["10.0.0.2"], now=T0 + 80)
+        assert scheduler.next_batch(T0 + 169) == []
+        assert scheduler.next_batch(T0 + 170) == ["10.0.0.2"]
+        assert sorted(scheduler.next_batch(T0 + 900)) == [
+            "10.0.0.1", "10.0.0.3", "10.0.0.4", "10.0.0.5", "10.0.0.6"
+        ]
+
+    def test_churn_and_pools_are_hot(self):
+        """Test that changed addresses and DHCP pools are probed more often than cold space."""
+        scheduler = AdaptiveScheduler("10.0.0.0/29", probe_budget=100, dhcp_ranges=["10.0.0.5-10.0.0.6"],
+                                      hot_seconds=15, pool_seconds=120, cold_seconds=900)
+        scheduler.seed([_device("10.0.0.2", T0)], now=T0)
+
+        # 10.0.0.2 stops answering and 10.0.0.3 appears
+        scheduler.record(["10.0.0.2", "10.0.0.3"], ["10.0.0.3"], now=T0 + 30)
+
+        assert scheduler.next_batch(T0 + 45) == ["10.0.0.2"]
+        # The new host is re-probed before it ages out, alongside the pool
+        assert scheduler.next_batch(T0 + 120) == ["10.0.0.3", "10.0.0.5", "10.0.0.6"]
+        assert scheduler.probes_per_second() < 2  # A full /29 sweep every 30 s would be 0.2/s per host
+
+    def test_failed_probes_are_requeued(self):
+        """Test that a batch whose probe failed is handed out again."""
+        scheduler = AdaptiveScheduler("10.0.0.0/30", probe_budget=10)
+        batch = scheduler.next_batch(T0)
+        assert scheduler.next_batch(T0 + 1) == []
+
+        scheduler.requeue(batch)
+
+        assert scheduler.next_batch(T0 + 2) == batch
+
+    def test_large_networks_rejected(self):
+        """Test that networks too large to track per address are refused."""
+        with pytest.raises(ValueError, match="up to"):
+            AdaptiveScheduler("10.0.0.0/8")
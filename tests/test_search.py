@@ -0,0 +1,75 @@
+"""Tests for the device search index."""
+
+from simple_scanner.models import Device
+from simple_scanner.search import DeviceSearchIndex
+
+
+def make_index(*devices: Device) -> DeviceSearchIndex:
+    index = DeviceSearchIndex()
+    for device in devices:
+        index.update(device)
+    return index
+
+
+ROUTER = Device("aa:bb:cc:dd:ee:ff", "192.168.1.1", hostname="Router.local", manufacturer="Netgear")
+LAPTOP = Device("11:22:33:44:55:66", "192.168.1.100", hostname="laptop", manufacturer="Apple")
+
+
+class TestDeviceSearchIndex:
+    """Test cases for trigram substring search."""
+
+    def test_substring_in_any_field(self):
+        """Test that queries match any field, case-insensitively."""
+        index = make_index(ROUTER, LAPTOP)
+
+        assert index.search("ROUTER") == {ROUTER.mac_address}
+        assert index.search("apple") == {LAPTOP.mac_address}
+        assert index.search("192.168.1.1") == {ROUTER.mac_address, LAPTOP.mac_address}
+        assert index.search("33:44") == {LAPTOP.mac_address}
+        assert index.search("nomatch") == set()
+
+    def test_short_queries(self):
+        """Test that queries shorter than a trigram still match."""
+        index = make_index(ROUTER, LAPTOP)
+
+        assert index.search("ap") == {LAPTOP.mac_address}
+        assert index.search("e") == {ROUTER.mac_address, LAPTOP.mac_address}
+
+    def test_matches_do_not_span_fields(self):
+        """Test that a query cannot match across the boundary of two fields."""
+        index = make_index(LAPTOP)
+
+        assert index.search("laptopapple") == set()
+
+    def test_update_reindexes_changed_device(self):
+        """Test that changed fields are searchable and old values are not."""
+        device = Device("aa:bb:cc:dd:ee:01", "10.0.0.1", hostname="printer")
+        index = make_index(device)
+
+        device.update_hostname("scanner")
+        index.update(device)
+
+        assert index.search("printer") == set()
+        assert index.search("scanner") == {device.mac_address}
+
+    def test_remove(self):
+        """Test that removed devices no longer match."""
+        index = make_index(ROUTER, LAPTOP)
+
+        index.remove(ROUTER.mac_address)
+
+        assert index.search("192.168") == {LAPTOP.mac_address}
+        assert ROUTER.mac_address not in index
+        assert len(index) == 1
+
+    def test_result_reused_until_index_changes(self):
+        """Test that repeating a query returns the cached result until an update."""
+        index = make_index(ROUTER)
+        first = index.search("router")
+
+        assert index.search("router") is first
+        index.update(ROUTER)  # Unchanged fields do not invalidate
+        assert index.search("router") is first
+
+        index.update(Device("00:00:00:00:00:01", "10.0.0.2", hostname="router2"))
+        assert len(index.search("router")) == 2
@@ -0,0 +1,491 @@
+"""Tests for device persistence backends."""
+
+import datetime
+import json
+import threading
+import time
+
+import pytest
+
+from simple_scanner.models import Device
+from simple_scanner.storage import (
+    BackgroundWriter,
+    JsonDeviceStore,
+    LazyDeviceMap,
+    SQLiteDeviceStore,
+    atomic_write,
+)
+
+
+def make_device(n: int, **kwargs) -> Device:
+    stamp = datetime.datetime(2023, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+    return Device(f'aa:bb:cc:dd:ee:{n:02x}', f'192.168.1.{n}',
+                  date_added=stamp, last_seen=stamp, **kwargs)
+
+
+class TestJsonDeviceStore:
+    """Test cases for the snapshot + journal store."""
+
+    def test_first_save_writes_snapshot(self, tmp_path):
+        """Test that the first save creates a plain JSON snapshot."""
+        store = JsonDeviceStore(tmp_path / "devices.json")
+        devices = {d.mac_address: d for d in [make_device(1), make_device(2)]}
+
+        store.save(devices, changed=devices.keys())
+
+        with open(store.path, 'r', encoding='utf-8') as f:
+            assert len(json.load(f)) == 2
+        assert not store.journal_path.exists()
+
+    def test_changes_are_appended_to_journal(self, tmp_path):
+        """Test that later saves only append the changed devices."""
+        store = JsonDeviceStore(tmp_path / "devices.json")
+        devices = {d.mac_address: d for d in [make_device(1), make_device(2)]}
+        store.save(devices, changed=devices.keys())
+        snapshot = store.path.read_text(encoding='utf-8')
+
+        devices['aa:bb:cc:dd:ee:01'].update_ip_address('192.168.1.200')
+        store.save(devices, changed=['aa:bb:cc:dd:ee:01'])
+
+        assert store.path.read_text(encoding='utf-8') == snapshot
+        lines = store.journal_path.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])['ip_address'] == '192.168.1.200'
+
+    def test_load_replays_journal(self, tmp_path):
+        """Test that loading applies journaled updates and removals."""
+        store = JsonDeviceStore(tmp_path / "devices.json")
+        devices = {d.mac_address: d for d in [make_device(1), make_device(2)]}
+        store.save(devices, changed=devices.keys())
+
+        devices['aa:bb:cc:dd:ee:01'].update_hostname('printer')
+        del devices['aa:bb:cc:dd:ee:02']
+        store.save(devices, changed=['aa:bb:cc:dd:ee:01'], removed=['aa:bb:cc:dd:ee:02'])
+
+        loaded = JsonDeviceStore(tmp_path / "devices.json").load()
+        assert list(loaded) == ['aa:bb:cc:dd:ee:01']
+        assert loaded['aa:bb:cc:dd:ee:01'].hostname == 'printer'
+
+    def test_load_ignores_torn_journal_line(self, tmp_path):
+        """Test that a partially written final journal line is skipped."""
+        store = JsonDeviceStore(tmp_path / "devices.json")
+        devices = {d.mac_address: d for d in [make_device(1)]}
+        store.save(devices, changed=devices.keys())
+        with open(store.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"mac_address": "aa:bb:cc:dd:ee:01", "ip_ad')
+
+        assert list(store.load()) == ['aa:bb:cc:dd:ee:01']
+
+    def test_journal_is_compacted(self, tmp_path, monkeypatch):
+        """Test that an oversized journal is folded back into the snapshot."""
+        monkeypatch.setattr(JsonDeviceStore, 'COMPACT_MIN_RECORDS', 2)
+        store = JsonDeviceStore(tmp_path / "devices.json")
+        devices = {d.mac_address: d for d in [make_device(1), make_device(2)]}
+        store.save(devices, changed=devices.keys())
+
+        store.save(devices, changed=['aa:bb:cc:dd:ee:01'])
+        store.save(devices, changed=['aa:bb:cc:dd:ee:02'])
+        assert store.journal_path.exists()
+
+        store.save(devices, changed=['aa:bb:cc:dd:ee:01'])
+        assert not store.journal_path.exists()
+        assert set(store.load()) == set(devices)
+
+    def test_load_missing_snapshot(self, tmp_path):
+        """Test that a missing snapshot yields an empty inventory."""
+        assert JsonDeviceStore(tmp_path / "devices.json").load() == {}
+
+    def test_load_invalid_snapshot_raises(self, tmp_path):
+        """Test that a corrupt snapshot raises for the caller to handle."""
+        path = tmp_path / "devices.json"
+        path.write_text("invalid json content", encoding='utf-8')
+
+        with pytest.raises(json.JSONDecodeError):
+            JsonDeviceStore(path).load()
+
+
+class TestLazyJsonDeviceStore:
+    """Test cases for reading the JSON snapshot through its MAC index."""
+
+    @staticmethod
+    def _saved(tmp_path, count=5):
+        store = JsonDeviceStore(tmp_path / "devices.json")
+        devices = {d.mac_address: d for d in (make_device(n, hostname=f"host-{n}") for n in range(1, count + 1))}
+        store.save(devices, devices.keys())
+        return store, devices
+
+    def test_snapshot_format_is_unchanged(self, tmp_path):
+        """Test that compaction still writes json.dump(..., indent=2) and adds an index."""
+        store, devices = self._saved(tmp_path)
+
+        expected = json.dumps([d.to_dict() for d in devices.values()], indent=2)
+        assert store.path.read_text(encoding='utf-8') == expected
+        assert store.index_path.exists()
+
+    def test_open_reads_only_requested_devices(self, tmp_path, monkeypatch):
+        """Test that opening parses nothing and get() parses one device."""
+        store, devices = self._saved(tmp_path)
+        parsed = []
+        real_from_dict = Device.from_dict.__func__
+        monkeypatch.setattr(Device, "from_dict", classmethod(lambda cls, data: parsed.append(data) or real_from_dict(cls, data)))
+
+        lazy = JsonDeviceStore(store.path)
+        lazy.open()
+        assert parsed == []
+
+        assert lazy.get('aa:bb:cc:dd:ee:03').to_dict() == devices['aa:bb:cc:dd:ee:03'].to_dict()
+        assert lazy.get('aa:bb:cc:dd:ee:ff') is None
+        assert len(parsed) == 1
+        assert lazy.contains('aa:bb:cc:dd:ee:05') and not lazy.contains('aa:bb:cc:dd:ee:06')
+
+    def test_journal_is_applied_on_top(self, tmp_path):
+        """Test that lazy reads agree with load() after journaled changes."""
+        store, devices = self._saved(tmp_path)
+        devices['aa:bb:cc:dd:ee:02'].update_ip_address('192.168.1.222')
+        devices[make_device(9).mac_address] = make_device(9)
+        del devices['aa:bb:cc:dd:ee:04']
+        store.save(devices, ['aa:bb:cc:dd:ee:02', 'aa:bb:cc:dd:ee:09'], ['aa:bb:cc:dd:ee:04'])
+
+        lazy = JsonDeviceStore(store.path)
+        lazy.open()
+
+        expected = store.load()
+        assert lazy.macs() == list(expected)
+        assert lazy.count() == 5
+        assert [d.to_dict() for d in lazy.iter_devices()] == [d.to_dict() for d in expected.values()]
+        assert lazy.get('aa:bb:cc:dd:ee:02').ip_address == '192.168.1.222'
+        assert lazy.get('aa:bb:cc:dd:ee:04') is None
+
+    def test_lazy_map_round_trip(self, tmp_path):
+        """Test saving through a LazyDeviceMap, including a compaction."""
+        store, _ = self._saved(tmp_path)
+        store.open()
+        lazy = LazyDeviceMap(store)
+        lazy['aa:bb:cc:dd:ee:01'].update_ip_address('192.168.1.101')
+        del lazy['aa:bb:cc:dd:ee:05']
+        store.save(lazy, ['aa:bb:cc:dd:ee:01'], ['aa:bb:cc:dd:ee:05'])
+        store.compact(lazy)
+
+        reopened = JsonDeviceStore(store.path)
+        reopened.open()
+        assert reopened.macs() == [f'aa:bb:cc:dd:ee:{n:02x}' for n in range(1, 5)]
+        assert reopened.get('aa:bb:cc:dd:ee:01').ip_address == '192.168.1.101'
+        assert not store.journal_path.exists()
+
+    def test_missing_or_stale_index_is_rebuilt(self, tmp_path):
+        """Test that a snapshot written elsewhere (non-ASCII, no index) is indexed on open."""
+        store, _ = self._saved(tmp_path)
+        records = [make_device(1, hostname="Zoë's iPad").to_dict(), make_device(2).to_dict()]
+        store.path.write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+
+        lazy = JsonDeviceStore(store.path)
+        lazy.open()
+
+        assert lazy.get('aa:bb:cc:dd:ee:01').hostname == "Zoë's iPad"
+        assert lazy.get('aa:bb:cc:dd:ee:02').ip_address == '192.168.1.2'
+        assert lazy.macs() == ['aa:bb:cc:dd:ee:01', 'aa:bb:cc:dd:ee:02']
+        assert [d.hostname for d in lazy.iter_devices()] == ["Zoë's iPad", None]
+
+    def test_many_lookups_and_small_reads(self, tmp_path, monkeypatch):
+        """Test that the in-memory table and chunked iteration return the same devices."""
+        from simple_scanner.storage import _SnapshotIndex
+        monkeypatch.setattr(_SnapshotIndex, "TABLE_AFTER_LOOKUPS", 2)
+        monkeypatch.setattr(JsonDeviceStore, "READ_CHUNK", 64)
+        store, devices = self._saved(tmp_path, count=20)
+        store.open()
+
+        assert all(store.get(mac).to_dict() == d.to_dict() for mac, d in devices.items())
+        assert store.get('aa:bb:cc:dd:ee:ff') is None
+        assert [d.to_dict() for d in store.iter_devices()] == [d.to_dict() for d in devices.values()]
+
+    def test_corrupt_snapshot(self, tmp_path):
+        """Test that an unreadable snapshot is reported by open()."""
+        store, _ = self._saved(tmp_path)
+        store.path.write_text('[{"mac_address": "aa:bb:cc:dd:ee:01"}, {"mac', encoding='utf-8')
+
+        with pytest.raises(ValueError):
+            JsonDeviceStore(store.path).open()
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    store = SQLiteDeviceStore(tmp_path / "devices.db")
+    yield store
+    store.close()
+
+
+class TestSQLiteDeviceStore:
+    """Test cases for the SQLite store."""
+
+    def test_save_and_get_round_trip(self, sqlite_store):
+        """Test that devices survive a round trip with their timestamps."""
+        device = make_device(1, hostname='printer', manufacturer='Canon Inc.')
+        sqlite_store.save({device.mac_address: device}, [device.mac_address])
+
+        loaded = sqlite_store.get(device.mac_address)
+        assert loaded == device
+        assert sqlite_store.get('00:00:00:00:00:00') is None
+
+    def test_save_upserts_and_deletes(self, sqlite_store):
+        """Test that one save applies both updates and removals."""
+        devices = {d.mac_address: d for d in [make_device(1), make_device(2)]}
+        sqlite_store.save(devices, devices.keys())
+
+        devices['aa:bb:cc:dd:ee:01'].update_ip_address('192.168.1.200')
+        sqlite_store.save(devices, ['aa:bb:cc:dd:ee:01'], removed=['aa:bb:cc:dd:ee:02'])
+
+        assert sqlite_store.count() == 1
+        assert sqlite_store.get('aa:bb:cc:dd:ee:01').ip_address == '192.168.1.200'
+
+    def test_query_filters(self, sqlite_store):
+        """Test that each query filter is applied by the database."""
+        devices = [
+            make_device(1, hostname='Printer.office', manufacturer='Canon Inc.'),
+            make_device(2, hostname='laptop', manufacturer='Apple, Inc.'),
+            make_device(3, manufacturer='apple, inc.'),
+        ]
+        devices[2].update_last_seen(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc))
+        sqlite_store.save({d.mac_address: d for d in devices}, [d.mac_address for d in devices])
+
+        def macs(**filters):
+            return [d.mac_address[-2:] for d in sqlite_store.query(**filters)]
+
+        assert macs(search='PRINT') == ['01']
+        assert macs(search='192.168.1.') == ['01', '02', '03']
+        assert macs(manufacturer='APPLE, INC.') == ['02', '03']
+        assert macs(hostname_prefix='printer') == ['01']
+        assert macs(ip_address='192.168.1.2') == ['02']
+        assert macs(seen_since=datetime.datetime(2023, 6, 1, tzinfo=datetime.timezone.utc)) == ['03']
+        assert macs(search='100%') == []
+
+    def test_hostname_prefix_uses_index(self, sqlite_store):
+        """Test that hostname prefix lookups are served by the hostname index."""
+        plan = sqlite_store._fetch(
+            "EXPLAIN QUERY PLAN SELECT * FROM devices "
+            "WHERE hostname >= ? COLLATE NOCASE AND hostname < ? COLLATE NOCASE",
+            ('abc', 'abc\U0010ffff'),
+        )
+        assert any('idx_devices_hostname' in row[-1] for row in plan)
+
+    def test_old_database_gains_network_column(self, tmp_path):
+        """Test that a database without the network column is migrated in place."""
+        import sqlite3
+        path = tmp_path / "devices.db"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE devices (mac_address TEXT PRIMARY KEY, ip_address TEXT NOT NULL, hostname TEXT, "
+            "manufacturer TEXT, date_added REAL NOT NULL, last_seen REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO devices VALUES ('aa:bb:cc:dd:ee:01', '192.168.1.1', NULL, NULL, 0, 0)")
+        conn.commit()
+        conn.close()
+
+        store = SQLiteDeviceStore(path)
+        try:
+            assert store.get('aa:bb:cc:dd:ee:01').network is None
+            device = make_device(2, network='192.168.1.0/24')
+            store.save({device.mac_address: device}, [device.mac_address])
+            assert store.get(device.mac_address).network == '192.168.1.0/24'
+        finally:
+            store.close()
+
+
+class TestLazyDeviceMap:
+    """Test cases for the lazily materialized device mapping."""
+
+    def test_devices_are_loaded_on_demand(self, sqlite_store):
+        """Test that only accessed devices are cached."""
+        devices = {d.mac_address: d for d in [make_device(1), make_device(2)]}
+        sqlite_store.save(devices, devices.keys())
+        lazy = LazyDeviceMap(sqlite_store)
+
+        assert len(lazy) == 2
+        assert lazy._cache == {}
+        device = lazy['aa:bb:cc:dd:ee:01']
+        assert lazy['aa:bb:cc:dd:ee:01'] is device
+        assert list(lazy._cache) == ['aa:bb:cc:dd:ee:01']
+
+    def test_set_and_delete(self, sqlite_store):
+        """Test that new and deleted devices are visible before they are saved."""
+        devices = {d.mac_address: d for d in [make_device(1)]}
+        sqlite_store.save(devices, devices.keys())
+        lazy = LazyDeviceMap(sqlite_store)
+
+        lazy['aa:bb:cc:dd:ee:02'] = make_device(2)
+        del lazy['aa:bb:cc:dd:ee:01']
+
+        assert 'aa:bb:cc:dd:ee:01' not in lazy
+        assert list(lazy) == ['aa:bb:cc:dd:ee:02']
+        assert [d.mac_address for d in lazy.values()] == ['aa:bb:cc:dd:ee:02']
+        with pytest.raises(KeyError):
+            lazy['aa:bb:cc:dd:ee:01']
+
+
+    def test_full_pass_is_cached_as_live_instances(self, tmp_path):
+        """Test that values() reads the store once and then returns the same objects."""
+        store, _ = TestLazyJsonDeviceStore._saved(tmp_path)
+        store.open()
+        lazy = LazyDeviceMap(store)
+        touched = lazy['aa:bb:cc:dd:ee:02']
+
+        first = lazy.values()
+        store.iter_devices = None  # A second pass must not read the store again
+        second = lazy.values()
+
+        assert [d.mac_address for d in first] == [f'aa:bb:cc:dd:ee:{n:02x}' for n in range(1, 6)]
+        assert all(a is b for a, b in zip(first, second))
+        assert first[1] is touched
+        del lazy['aa:bb:cc:dd:ee:03']
+        lazy['aa:bb:cc:dd:ee:09'] = make_device(9)
+        assert len(lazy) == 5 and 'aa:bb:cc:dd:ee:03' not in lazy
+        assert lazy['aa:bb:cc:dd:ee:09'] is lazy.values()[-1]
+
+    def test_length_is_kept_without_rereading(self, tmp_path):
+        """Test that len() is tracked through adds and deletes, and the store counts its journal."""
+        store, devices = TestLazyJsonDeviceStore._saved(tmp_path)
+        store.open()
+        lazy = LazyDeviceMap(store)
+        assert len(lazy) == 5
+
+        store.macs = None  # Counting must not list every MAC
+        lazy['aa:bb:cc:dd:ee:09'] = make_device(9)
+        lazy['aa:bb:cc:dd:ee:09'] = make_device(9)
+        del lazy['aa:bb:cc:dd:ee:01']
+        assert len(lazy) == 5
+
+        store.save(lazy, ['aa:bb:cc:dd:ee:09'], ['aa:bb:cc:dd:ee:01'])
+        assert store.count() == 5
+        del store.macs
+        reopened = JsonDeviceStore(store.path)
+        reopened.open()
+        assert reopened.count() == len(reopened.macs()) == 5
+
+
+class TestAtomicWrite:
+    """Test cases for write-to-temp-then-rename."""
+
+    def test_replaces_file(self, tmp_path):
+        """Test that the new content appears only under the final name."""
+        path = tmp_path / "out" / "devices.json"
+        with atomic_write(path, encoding="utf-8", fsync=True) as f:
+            f.write("new")
+            assert not path.exists()
+
+        assert path.read_text(encoding="utf-8") == "new"
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        """Test that an exception leaves the previous file and no temp file behind."""
+        path = tmp_path / "devices.json"
+        path.write_text("old", encoding="utf-8")
+
+        with pytest.raises(RuntimeError):
+            with atomic_write(path, encoding="utf-8") as f:
+                f.write("half")
+                raise RuntimeError("disk full")
+
+        assert path.read_text(encoding="utf-8") == "old"
+        assert list(tmp_path.iterdir()) == [path]
+
+
+class TestJsonStoreDurability:
+    """Test cases for fsync policies and corrupt snapshots."""
+
+    def test_unknown_fsync_policy(self, tmp_path):
+        """Test that a misspelt policy is rejected."""
+        with pytest.raises(ValueError, match="Unknown fsync policy"):
+            JsonDeviceStore(tmp_path / "devices.json", fsync="sometimes")
+
+    def test_always_fsyncs_journal_appends(self, tmp_path, monkeypatch):
+        """Test that only the "always" policy fsyncs journal appends."""
+        import os
+        synced = []
+        monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd))
+        devices = {d.mac_address: d for d in [make_device(1)]}
+        for policy, expected in (("snapshot", 0), ("always", 1)):
+            store = JsonDeviceStore(tmp_path / f"{policy}.json", fsync=policy)
+            store.save(devices, devices.keys())
+            synced.clear()
+            store.save(devices, devices.keys())
+            assert len(synced) == expected
+
+    def test_quarantine_moves_files_aside(self, tmp_path):
+        """Test that a corrupt snapshot and its journal are kept under new names."""
+        store = JsonDeviceStore(tmp_path / "devices.json")
+        store.path.write_text("[{", encoding="utf-8")
+        store.journal_path.write_text("{}\n", encoding="utf-8")
+
+        moved = store.quarantine()
+
+        assert moved.read_text(encoding="utf-8") == "[{"
+        assert moved.name.startswith("devices.json.") and moved.suffix == ".corrupt"
+        assert not store.path.exists() and not store.journal_path.exists()
+        assert len(list(tmp_path.glob("devices.json.journal.*.corrupt"))) == 1
+        assert store.quarantine() is None
+
+
+class TestBackgroundWriter:
+    """Test cases for the coalescing background writer."""
+
+    def test_burst_is_coalesced(self):
+        """Test that requests during the throttle interval become one more save."""
+        calls = []
+        writer = BackgroundWriter(lambda: calls.append(time.monotonic()), interval=0.2)
+        writer.request()
+        writer.flush()
+        for _ in range(50):
+            writer.request()
+
+        writer.flush()
+        writer.close()
+
+        assert len(calls) == 2
+
+    def test_interval_is_respected(self):
+        """Test that the second save waits out the interval."""
+        calls = []
+        done = threading.Event()
+        writer = BackgroundWriter(lambda: (calls.append(time.monotonic()), done.set()), interval=0.2)
+        writer.request()
+        assert done.wait(1)
+        done.clear()
+        writer.request()
+        assert done.wait(1)
+        writer.close()
+
+        assert calls[1] - calls[0] >= 0.19
+
+    def test_close_saves_pending_request(self):
+        """Test that shutdown doesn't wait for the interval or drop the last request."""
+        calls = []
+        writer = BackgroundWriter(lambda: calls.append(1), interval=60)
+        writer.request()
+        writer.flush()
+        writer.request()
+        assert writer.pending
+
+        started = time.monotonic()
+        writer.close()
+
+        assert len(calls) == 2 and not writer.pending
+        assert time.monotonic() - started < 5
+        writer.request()  # After close the save runs right away
+        assert len(calls) == 3
+
+    def test_errors_are_reported_and_writer_continues(self):
+        """Test that a failing save goes to on_error and later saves still run."""
+        errors, calls = [], []
+
+        def save():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError("disk full")
+
+        writer = BackgroundWriter(save, interval=0, on_error=errors.append)
+        writer.request()
+        writer.flush()
+        writer.request()
+        writer.close()
+
+        assert [str(e) for e in errors] == ["disk full"]
+        assert len(calls) == 2
@@ -0,0 +1,300 @@
+"""Tests for the in-process sweep engine."""
+
+import asyncio
+import errno
+import socket
+from unittest.mock import patch
+
+import pytest
+
+from simple_scanner.parsers import HostRecord
+from simple_scanner.sweep import (
+    SweepEngine,
+    arp_request,
+    arp_sweep,
+    expand_targets,
+    local_interface,
+    parse_arp_reply,
+    read_arp_table,
+)
+
+LOCAL_MAC = bytes.fromhex("020000000001")
+LOCAL_IP = socket.inet_aton("10.0.0.1")
+
+
+class FakeArpSocket:
+    """Packet socket that answers ARP requests for a fixed set of hosts."""
+
+    def __init__(self, hosts):
+        self.hosts = hosts  # ip -> mac
+        self.replies = []
+        self.sent = []
+
+    def bind(self, address):
+        self.bound = address
+
+    def setblocking(self, flag):
+        pass
+
+    def send(self, frame):
+        self.sent.append(frame)
+        target = socket.inet_ntoa(frame[38:42])
+        if target in self.hosts:
+            mac = bytes.fromhex(self.hosts[target].replace(":", ""))
+            reply = bytearray(arp_request(mac, socket.inet_aton(target), LOCAL_IP))
+            reply[20:22] = (2).to_bytes(2, "big")  # op = reply
+            self.replies.append(bytes(reply))
+        return len(frame)
+
+    def recv(self, size):
+        if not self.replies:
+            raise BlockingIOError
+        return self.replies.pop(0)
+
+    def fileno(self):
+        return -1
+
+    def close(self):
+        pass
+
+
+class TestHelpers:
+    """Test cases for target expansion and kernel table parsing."""
+
+    def test_expand_targets(self):
+        """Test that CIDRs expand to host addresses without duplicates."""
+        assert expand_targets(["10.0.0.0/30", "10.0.0.2", "10.0.0.9/32"]) == [
+            "10.0.0.1", "10.0.0.2", "10.0.0.9"
+        ]
+        with pytest.raises(ValueError):
+            expand_targets(["router.local"])
+
+    def test_read_arp_table(self, tmp_path):
+        """Test that only complete entries are returned, with lowercase MACs."""
+        table = tmp_path / "arp"
+        table.write_text(
+            "IP address       HW type     Flags       HW address            Mask     Device\n"
+            "192.168.1.1      0x1         0x2         AA:BB:CC:DD:EE:FF     *        eth0\n"
+            "192.168.1.7      0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+        )
+
+        assert read_arp_table(table) == {"192.168.1.1": ("aa:bb:cc:dd:ee:ff", "eth0")}
+        assert read_arp_table(tmp_path / "missing") == {}
+
+    def test_local_interface(self, tmp_path):
+        """Test that only directly connected routes count, longest mask first."""
+        routes = tmp_path / "route"
+        routes.write_text(
+            "Iface\tDestination\tGateway\tFlags\tRefCnt\tUse\tMetric\tMask\tMTU\tWindow\tIRTT\n"
+            "eth0\t00000000\t0101A8C0\t0003\t0\t0\t0\t00000000\t0\t0\t0\n"
+            "eth0\t0000A8C0\t00000000\t0001\t0\t0\t0\t0000FFFF\t0\t0\t0\n"
+            "wlan0\t0001A8C0\t00000000\t0001\t0\t0\t0\t00FFFFFF\t0\t0\t0\n"
+        )
+
+        assert local_interface("192.168.1.20", routes) == "wlan0"
+        assert local_interface("192.168.5.20", routes) == "eth0"
+        assert local_interface("8.8.8.8", routes) is None
+
+    def test_arp_frame_round_trip(self):
+        """Test that a reply frame yields the sender's address and MAC."""
+        frame = bytearray(arp_request(bytes.fromhex("aabbccddeeff"), socket.inet_aton("10.0.0.5"), LOCAL_IP))
+        assert parse_arp_reply(bytes(frame)) is None  # A request, not a reply
+
+        frame[20:22] = (2).to_bytes(2, "big")
+        assert parse_arp_reply(bytes(frame)) == ("10.0.0.5", "aa:bb:cc:dd:ee:ff")
+
+
+class TestArpSweep:
+    """Test cases for the raw-socket ARP sweep against a fake responder."""
+
+    def test_collects_replies(self):
+        """Test that hosts answering the fake responder are returned."""
+        fake = FakeArpSocket({"10.0.0.5": "aa:bb:cc:dd:ee:05", "10.0.0.9": "aa:bb:cc:dd:ee:09"})
+        with patch("simple_scanner.sweep._interface_addresses", return_value=(LOCAL_MAC, LOCAL_IP)), \
+             patch("simple_scanner.sweep._packet_socket", return_value=fake), \
+             patch("simple_scanner.sweep.select.select", side_effect=lambda r, w, x, t: (r, [], [])):
+            results = arp_sweep("eth0", expand_targets(["10.0.0.0/28"]), timeout=0.05)
+
+        assert len(fake.sent) == 14
+        assert {ip: mac for ip, (mac, _) in results.items()} == {
+            "10.0.0.5": "aa:bb:cc:dd:ee:05", "10.0.0.9": "aa:bb:cc:dd:ee:09"
+        }
+
+    def test_full_send_buffer_waits_for_writability(self):
+        """Test that a full socket buffer is waited out in select instead of busy-polling."""
+        fake = FakeArpSocket({"10.0.0.5": "aa:bb:cc:dd:ee:05"})
+        send, full = fake.send, [True]  # The first send finds the buffer full
+
+        def send_once_full(frame):
+            if full:
+                full.pop()
+                raise BlockingIOError
+            return send(frame)
+
+        waits = []
+
+        def fake_select(r, w, x, t):
+            waits.append((w, t))
+            return r, w, []
+
+        fake.send = send_once_full
+        with patch("simple_scanner.sweep._interface_addresses", return_value=(LOCAL_MAC, LOCAL_IP)), \
+             patch("simple_scanner.sweep._packet_socket", return_value=fake), \
+             patch("simple_scanner.sweep.select.select", side_effect=fake_select):
+            results = arp_sweep("eth0", ["10.0.0.5"], timeout=0.05)
+
+        assert waits[0] == ([fake], 0.05)
+        assert list(results) == ["10.0.0.5"]
+
+    def test_route_table_read_once_per_sweep(self):
+        """Test that the ARP phase reads the route table once, not once per address."""
+        engine = SweepEngine(method="arp", timeout=0.05)
+        with patch("simple_scanner.sweep.read_routes", return_value=[]) as read:
+            engine.sweep(["10.0.0.0/28"])
+
+        read.assert_called_once_with()
+
+    def test_sweep_uses_arp_for_on_link_hosts(self):
+        """Test that the engine returns HostRecords for ARP replies."""
+        fake = FakeArpSocket({"10.0.0.5": "aa:bb:cc:dd:ee:05"})
+        with patch("simple_scanner.sweep._interface_addresses", return_value=(LOCAL_MAC, LOCAL_IP)), \
+             patch("simple_scanner.sweep._packet_socket", return_value=fake), \
+             patch("simple_scanner.sweep.select.select", side_effect=lambda r, w, x, t: (r, [], [])), \
+             patch("simple_scanner.sweep.local_interface", return_value="eth0"):
+            records = SweepEngine(method="arp", timeout=0.05).sweep(["10.0.0.0/29"])
+
+        assert [(r.ip_address, r.mac_address) for r in records] == [("10.0.0.5", "aa:bb:cc:dd:ee:05")]
+
+    def test_arp_without_privileges_raises(self):
+        """Test that a forced ARP sweep reports missing raw socket access."""
+        with patch("simple_scanner.sweep.local_interface", return_value="eth0"), \
+             patch("simple_scanner.sweep.arp_sweep", side_effect=PermissionError("denied")):
+            with pytest.raises(RuntimeError, match="raw sockets"):
+                SweepEngine(method="arp").sweep(["10.0.0.1"])
+
+
+class FakePingTransport:
+    """Datagram transport that answers echo requests from ``hosts`` at once."""
+
+    def __init__(self, protocol, hosts):
+        self.protocol = protocol
+        self.hosts = hosts
+        self.closed = False
+
+    def sendto(self, packet, address):
+        assert packet[0] == 8  # Echo request
+        if address[0] in self.hosts:
+            self.protocol.datagram_received(b"\x00" + packet[1:], address)
+        else:
+            self.protocol.error_received(OSError(errno.EHOSTUNREACH, "No route to host"))
+
+    def close(self):
+        self.closed = True
+
+
+class TestIcmpSweep:
+    """Test cases for ICMP echo probing over a datagram endpoint."""
+
+    def test_echo_replies_mean_alive(self):
+        """Test that hosts answering an echo request are alive and the others are not."""
+        engine = SweepEngine(method="icmp", timeout=0.05)
+        transports = []
+
+        async def endpoint(protocol_factory, sock):
+            transports.append(FakePingTransport(protocol_factory(), {"10.0.0.5"}))
+            return transports[0], transports[0].protocol
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            with patch("simple_scanner.sweep._ping_socket"), \
+                 patch.object(loop, "create_datagram_endpoint", side_effect=endpoint):
+                return await engine._icmp_sweep(["10.0.0.5", "10.0.0.6"])
+
+        assert list(asyncio.run(run())) == ["10.0.0.5"]
+        assert transports[0].closed
+
+    def test_falls_back_to_tcp_without_ping_sockets(self):
+        """Test that auto mode probes by TCP when ping sockets aren't permitted."""
+        engine = SweepEngine(method="auto")
+        with patch("simple_scanner.sweep._ping_socket", side_effect=PermissionError(errno.EACCES, "denied")), \
+             patch("simple_scanner.sweep.local_interface", return_value=None), \
+             patch.object(engine, "_tcp_sweep", return_value={"10.0.0.5": 0.001}) as tcp, \
+             patch("simple_scanner.sweep.read_arp_table", return_value={"10.0.0.5": ("aa:bb:cc:dd:ee:05", "eth0")}):
+            records = engine.sweep(["10.0.0.5"])
+
+        tcp.assert_called_once_with(["10.0.0.5"])
+        assert records == [HostRecord("10.0.0.5", "aa:bb:cc:dd:ee:05", latency=0.001)]
+
+    def test_icmp_method_without_ping_sockets_raises(self):
+        """Test that an explicit ICMP sweep reports missing permissions."""
+        engine = SweepEngine(method="icmp")
+        with patch("simple_scanner.sweep._ping_socket", side_effect=PermissionError(errno.EACCES, "denied")):
+            with pytest.raises(RuntimeError, match="ping_group_range"):
+                engine.sweep(["10.0.0.5"])
+
+
+class TestTcpSweep:
+    """Test cases for TCP-connect probing against local listeners."""
+
+    def test_open_and_refused_ports_mean_alive(self):
+        """Test that both an accepting and a refusing port prove a host is up."""
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        open_port = listener.getsockname()[1]
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        closed_port = closed.getsockname()[1]
+        closed.close()
+        try:
+            for port in (open_port, closed_port):
+                # Windows retries a refused connect for about 2 s before failing it
+                engine = SweepEngine(method="tcp", tcp_ports=(port,), timeout=5)
+                alive = asyncio.run(engine._tcp_sweep(["127.0.0.1"]))
+                assert list(alive) == ["127.0.0.1"]
+        finally:
+            listener.close()
+
+    def test_concurrency_bounds_connections(self):
+        """Test that ``concurrency`` limits open connection attempts, not hosts."""
+        engine = SweepEngine(method="tcp", concurrency=3, timeout=0.05)
+        in_flight = peak = 0
+
+        async def open_connection(ip, port):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await asyncio.sleep(1)
+            finally:
+                in_flight -= 1
+
+        with patch("simple_scanner.sweep.asyncio.open_connection", side_effect=open_connection):
+            alive = asyncio.run(engine._tcp_sweep([f"10.0.0.{i}" for i in range(1, 5)]))
+
+        assert alive == {}
+        assert peak == 3
+
+    def test_out_of_descriptors_is_not_a_down_host(self):
+        """Test that EMFILE fails the sweep instead of reporting hosts offline."""
+        engine = SweepEngine(method="tcp", timeout=0.05)
+        error = OSError(errno.EMFILE, "Too many open files")
+        with patch("simple_scanner.sweep.asyncio.open_connection", side_effect=error):
+            with pytest.raises(RuntimeError, match="file descriptors"):
+                asyncio.run(engine._tcp_sweep(["10.0.0.1", "10.0.0.2"]))
+
+    def test_macs_come_from_arp_table(self):
+        """Test that alive hosts get their MAC from the kernel ARP table."""
+        engine = SweepEngine(method="tcp")
+        with patch.object(engine, "_tcp_sweep", return_value={"10.0.0.5": 0.001, "10.0.0.6": 0.002}), \
+             patch("simple_scanner.sweep.read_arp_table", return_value={"10.0.0.5": ("aa:bb:cc:dd:ee:05", "eth0")}):
+            records = engine.sweep(["10.0.0.5", "10.0.0.6"])
+
+        # 10.0.0.6 answered but has no MAC (e.g. off-link) and is dropped, as with nmap
+        assert records == [HostRecord("10.0.0.5", "aa:bb:cc:dd:ee:05", latency=0.001)]
+
+    def test_unknown_method(self):
+        """Test that an unknown method is rejected."""
+        with pytest.raises(ValueError):
+            SweepEngine(method="udp")
+